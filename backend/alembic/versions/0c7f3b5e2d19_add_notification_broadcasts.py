@@ -0,0 +1,47 @@
+"""add notification broadcasts
+
+Revision ID: 0c7f3b5e2d19
+Revises: b61d0e4f9a83
+Create Date: 2026-10-19 17:48:30.102957
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c7f3b5e2d19'
+down_revision: Union[str, Sequence[str], None] = 'b61d0e4f9a83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_broadcasts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=True),
+    sa.Column('params', sa.JSON(), nullable=False),
+    sa.Column('templates', sa.JSON(), nullable=True),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'CANCELLED', name='broadcaststatus'), nullable=False),
+    sa.Column('last_user_id', sa.Integer(), nullable=False),
+    sa.Column('sent_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notification_broadcasts_id'), 'notification_broadcasts', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_notification_broadcasts_id'), table_name='notification_broadcasts')
+    op.drop_table('notification_broadcasts')
+    sa.Enum(name='broadcaststatus').drop(op.get_bind(), checkfirst=True)
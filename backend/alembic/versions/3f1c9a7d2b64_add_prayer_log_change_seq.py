@@ -0,0 +1,66 @@
+"""add prayer log change sequence and tombstones for delta sync
+
+Revision ID: 3f1c9a7d2b64
+Revises: eb28986c54c2
+Create Date: 2026-10-19 09:12:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, Sequence[str], None] = 'eb28986c54c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE SEQUENCE IF NOT EXISTS prayer_log_change_seq")
+
+    # 1) Add nullable, 2) backfill in update order, 3) enforce NOT NULL + default
+    op.add_column('prayer_logs', sa.Column('change_seq', sa.BigInteger(), nullable=True))
+    op.execute(
+        """
+        UPDATE prayer_logs p
+        SET change_seq = s.seq
+        FROM (
+            SELECT id, nextval('prayer_log_change_seq') AS seq
+            FROM (SELECT id FROM prayer_logs ORDER BY updated_at, id) ordered
+        ) s
+        WHERE p.id = s.id
+        """
+    )
+    op.alter_column(
+        'prayer_logs', 'change_seq',
+        nullable=False,
+        server_default=sa.text("nextval('prayer_log_change_seq')")
+    )
+    op.create_index('idx_prayer_logs_user_change_seq', 'prayer_logs', ['user_id', 'change_seq'], unique=False)
+
+    op.create_table(
+        'prayer_log_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('log_id', sa.Integer(), nullable=False),
+        sa.Column('prayer_name', sa.String(length=20), nullable=False),
+        sa.Column('prayer_date', sa.String(length=10), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), server_default=sa.text("nextval('prayer_log_change_seq')"), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_tombstones_user_change_seq', 'prayer_log_tombstones', ['user_id', 'change_seq'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_tombstones_user_change_seq', table_name='prayer_log_tombstones')
+    op.drop_table('prayer_log_tombstones')
+    op.drop_index('idx_prayer_logs_user_change_seq', table_name='prayer_logs')
+    op.drop_column('prayer_logs', 'change_seq')
+    op.execute("DROP SEQUENCE IF EXISTS prayer_log_change_seq")
@@ -0,0 +1,72 @@
+"""add prayer circles with daily progress aggregates
+
+Revision ID: 4e6a2d8c1b57
+Revises: 8d5b3f0a6c21
+Create Date: 2026-10-19 16:22:47.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e6a2d8c1b57'
+down_revision: Union[str, Sequence[str], None] = '8d5b3f0a6c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('prayer_groups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.String(length=500), nullable=True),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('invite_code', sa.String(length=16), nullable=False),
+    sa.Column('member_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_prayer_groups_id'), 'prayer_groups', ['id'], unique=False)
+    op.create_index(op.f('ix_prayer_groups_invite_code'), 'prayer_groups', ['invite_code'], unique=True)
+
+    op.create_table('prayer_group_members',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.Enum('OWNER', 'ADMIN', 'MEMBER', name='grouprole'), nullable=False),
+    sa.Column('joined_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['prayer_groups.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('group_id', 'user_id', name='uq_group_member')
+    )
+    op.create_index(op.f('ix_prayer_group_members_id'), 'prayer_group_members', ['id'], unique=False)
+    op.create_index('idx_group_members_user', 'prayer_group_members', ['user_id'], unique=False)
+
+    op.create_table('prayer_group_daily_progress',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('prayer_date', sa.String(length=10), nullable=False),
+    sa.Column('completed_prayers', sa.Integer(), nullable=False),
+    sa.Column('members_completed_all', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['prayer_groups.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('group_id', 'prayer_date')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('prayer_group_daily_progress')
+    op.drop_index('idx_group_members_user', table_name='prayer_group_members')
+    op.drop_index(op.f('ix_prayer_group_members_id'), table_name='prayer_group_members')
+    op.drop_table('prayer_group_members')
+    op.drop_index(op.f('ix_prayer_groups_invite_code'), table_name='prayer_groups')
+    op.drop_index(op.f('ix_prayer_groups_id'), table_name='prayer_groups')
+    op.drop_table('prayer_groups')
+    sa.Enum(name='grouprole').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,56 @@
+"""add push devices registry
+
+Revision ID: 5a9e1c7d3f42
+Revises: 0c7f3b5e2d19
+Create Date: 2026-10-19 18:20:44.671203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9e1c7d3f42'
+down_revision: Union[str, Sequence[str], None] = '0c7f3b5e2d19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('push_devices',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(length=255), nullable=False),
+    sa.Column('platform', sa.String(length=20), nullable=True),
+    sa.Column('active', sa.Boolean(), nullable=False),
+    sa.Column('last_seen', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_push_devices_id'), 'push_devices', ['id'], unique=False)
+    op.create_index('uq_push_devices_token', 'push_devices', ['token'], unique=True)
+    op.create_index('idx_push_devices_user_active', 'push_devices', ['user_id', 'active'], unique=False)
+
+    # Existing single tokens become each user's first device.
+    # A token shared by several users stays with the most recent one.
+    op.execute(
+        """
+        INSERT INTO push_devices (user_id, token, active, last_seen, created_at)
+        SELECT DISTINCT ON (push_token) id, push_token, true, COALESCE(updated_at, now()), now()
+        FROM users
+        WHERE push_token IS NOT NULL
+        ORDER BY push_token, updated_at DESC NULLS LAST
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_push_devices_user_active', table_name='push_devices')
+    op.drop_index('uq_push_devices_token', table_name='push_devices')
+    op.drop_index(op.f('ix_push_devices_id'), table_name='push_devices')
+    op.drop_table('push_devices')
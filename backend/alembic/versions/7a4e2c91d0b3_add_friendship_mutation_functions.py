@@ -0,0 +1,186 @@
+"""add stored functions for atomic friend request send/accept
+
+Revision ID: 7a4e2c91d0b3
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-19 14:03:27.561904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4e2c91d0b3'
+down_revision: Union[str, Sequence[str], None] = '3f1c9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Both functions take transaction-scoped advisory locks on the two user ids
+# (lowest id first), so concurrent sends/accepts touching the same user are
+# serialized and the friend-limit counts below always see committed rows.
+# Outcome codes are mapped to HTTP errors in app/api/v1/endpoints/friends.py.
+
+SEND_FUNCTION = """
+CREATE OR REPLACE FUNCTION friendship_send_request(
+    p_sender_id INTEGER,
+    p_friend_email VARCHAR,
+    p_max_friends INTEGER
+)
+RETURNS TABLE (
+    outcome TEXT,
+    friendship_id INTEGER,
+    friend_id INTEGER,
+    friend_push_token VARCHAR,
+    friend_language VARCHAR,
+    friend_preferences JSON
+)
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_friend users%ROWTYPE;
+    v_existing friendships%ROWTYPE;
+    v_id INTEGER;
+BEGIN
+    SELECT * INTO v_friend FROM users u WHERE u.email = p_friend_email;
+
+    IF FOUND AND v_friend.id <> p_sender_id THEN
+        PERFORM pg_advisory_xact_lock(hashtext('friendships'), LEAST(p_sender_id, v_friend.id));
+        PERFORM pg_advisory_xact_lock(hashtext('friendships'), GREATEST(p_sender_id, v_friend.id));
+    ELSE
+        PERFORM pg_advisory_xact_lock(hashtext('friendships'), p_sender_id);
+    END IF;
+
+    IF (SELECT COUNT(*) FROM friendships f
+        WHERE (f.user_id = p_sender_id OR f.friend_id = p_sender_id)
+          AND f.status = 'ACCEPTED') >= p_max_friends THEN
+        RETURN QUERY SELECT 'sender_limit'::TEXT, NULL::INTEGER, NULL::INTEGER, NULL::VARCHAR, NULL::VARCHAR, NULL::JSON;
+        RETURN;
+    END IF;
+
+    IF v_friend.id IS NULL THEN
+        RETURN QUERY SELECT 'user_not_found'::TEXT, NULL::INTEGER, NULL::INTEGER, NULL::VARCHAR, NULL::VARCHAR, NULL::JSON;
+        RETURN;
+    END IF;
+
+    IF v_friend.id = p_sender_id THEN
+        RETURN QUERY SELECT 'self'::TEXT, NULL::INTEGER, NULL::INTEGER, NULL::VARCHAR, NULL::VARCHAR, NULL::JSON;
+        RETURN;
+    END IF;
+
+    IF (SELECT COUNT(*) FROM friendships f
+        WHERE (f.user_id = v_friend.id OR f.friend_id = v_friend.id)
+          AND f.status = 'ACCEPTED') >= p_max_friends THEN
+        RETURN QUERY SELECT 'friend_limit'::TEXT, NULL::INTEGER, v_friend.id, NULL::VARCHAR, NULL::VARCHAR, NULL::JSON;
+        RETURN;
+    END IF;
+
+    SELECT * INTO v_existing FROM friendships f
+    WHERE (f.user_id = p_sender_id AND f.friend_id = v_friend.id)
+       OR (f.user_id = v_friend.id AND f.friend_id = p_sender_id)
+    LIMIT 1;
+
+    IF FOUND THEN
+        IF v_existing.status = 'ACCEPTED' THEN
+            RETURN QUERY SELECT 'already_friends'::TEXT, v_existing.id, v_friend.id, NULL::VARCHAR, NULL::VARCHAR, NULL::JSON;
+            RETURN;
+        ELSIF v_existing.status = 'PENDING' THEN
+            IF v_existing.requester_id = p_sender_id THEN
+                RETURN QUERY SELECT 'already_sent'::TEXT, v_existing.id, v_friend.id, NULL::VARCHAR, NULL::VARCHAR, NULL::JSON;
+            ELSE
+                RETURN QUERY SELECT 'already_received'::TEXT, v_existing.id, v_friend.id, NULL::VARCHAR, NULL::VARCHAR, NULL::JSON;
+            END IF;
+            RETURN;
+        END IF;
+        -- A rejected row would block the unique (user_id, friend_id) pair
+        DELETE FROM friendships f WHERE f.id = v_existing.id;
+    END IF;
+
+    INSERT INTO friendships (user_id, friend_id, requester_id, status)
+    VALUES (p_sender_id, v_friend.id, p_sender_id, 'PENDING')
+    RETURNING id INTO v_id;
+
+    RETURN QUERY SELECT
+        'created'::TEXT, v_id, v_friend.id,
+        v_friend.push_token, v_friend.preferred_language, v_friend.notification_preferences;
+END;
+$$;
+"""
+
+ACCEPT_FUNCTION = """
+CREATE OR REPLACE FUNCTION friendship_accept_request(
+    p_request_id INTEGER,
+    p_accepter_id INTEGER,
+    p_max_friends INTEGER
+)
+RETURNS TABLE (
+    outcome TEXT,
+    requester_id INTEGER,
+    requester_push_token VARCHAR,
+    requester_language VARCHAR,
+    requester_preferences JSON
+)
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_requester_id INTEGER;
+    v_requester users%ROWTYPE;
+BEGIN
+    SELECT f.user_id INTO v_requester_id FROM friendships f
+    WHERE f.id = p_request_id AND f.friend_id = p_accepter_id AND f.status = 'PENDING';
+
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT 'not_found'::TEXT, NULL::INTEGER, NULL::VARCHAR, NULL::VARCHAR, NULL::JSON;
+        RETURN;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('friendships'), LEAST(p_accepter_id, v_requester_id));
+    PERFORM pg_advisory_xact_lock(hashtext('friendships'), GREATEST(p_accepter_id, v_requester_id));
+
+    -- Re-check under the lock: the request may have been cancelled meanwhile
+    PERFORM 1 FROM friendships f
+    WHERE f.id = p_request_id AND f.status = 'PENDING'
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT 'not_found'::TEXT, NULL::INTEGER, NULL::VARCHAR, NULL::VARCHAR, NULL::JSON;
+        RETURN;
+    END IF;
+
+    IF (SELECT COUNT(*) FROM friendships f
+        WHERE (f.user_id = p_accepter_id OR f.friend_id = p_accepter_id)
+          AND f.status = 'ACCEPTED') >= p_max_friends THEN
+        RETURN QUERY SELECT 'accepter_limit'::TEXT, v_requester_id, NULL::VARCHAR, NULL::VARCHAR, NULL::JSON;
+        RETURN;
+    END IF;
+
+    IF (SELECT COUNT(*) FROM friendships f
+        WHERE (f.user_id = v_requester_id OR f.friend_id = v_requester_id)
+          AND f.status = 'ACCEPTED') >= p_max_friends THEN
+        RETURN QUERY SELECT 'requester_limit'::TEXT, v_requester_id, NULL::VARCHAR, NULL::VARCHAR, NULL::JSON;
+        RETURN;
+    END IF;
+
+    UPDATE friendships f SET status = 'ACCEPTED', updated_at = now()
+    WHERE f.id = p_request_id;
+
+    SELECT * INTO v_requester FROM users u WHERE u.id = v_requester_id;
+
+    RETURN QUERY SELECT
+        'accepted'::TEXT, v_requester_id,
+        v_requester.push_token, v_requester.preferred_language, v_requester.notification_preferences;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(SEND_FUNCTION)
+    op.execute(ACCEPT_FUNCTION)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION IF EXISTS friendship_accept_request(INTEGER, INTEGER, INTEGER)")
+    op.execute("DROP FUNCTION IF EXISTS friendship_send_request(INTEGER, VARCHAR, INTEGER)")
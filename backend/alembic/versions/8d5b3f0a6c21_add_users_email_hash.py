@@ -0,0 +1,42 @@
+"""add salted email hash to users for contact discovery
+
+Revision ID: 8d5b3f0a6c21
+Revises: 7a4e2c91d0b3
+Create Date: 2026-10-19 15:41:08.227315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d5b3f0a6c21'
+down_revision: Union[str, Sequence[str], None] = '7a4e2c91d0b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('email_hash', sa.String(length=64), nullable=True))
+
+    # Same formula as app.core.security.hash_email_for_discovery
+    op.execute(
+        sa.text(
+            """
+            UPDATE users
+            SET email_hash = encode(sha256(convert_to(:salt || ':' || lower(trim(email)), 'UTF8')), 'hex')
+            """
+        ).bindparams(salt=settings.CONTACT_DISCOVERY_SALT)
+    )
+    op.create_index(op.f('ix_users_email_hash'), 'users', ['email_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_email_hash'), table_name='users')
+    op.drop_column('users', 'email_hash')
@@ -10,10 +10,10 @@ from typing import Optional
 import logging
 
 from app.core.database import get_db
-from app.core.security import decode_token
-from app.core.redis import redis_client
+from app.core.security import decode_token, is_token_blacklisted, forget_verified_token
 from app.core.config import settings
 from app.models.user import User
+from app.services.user_cache import get_user_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -32,13 +32,20 @@ async def get_current_user(
     Get current authenticated user from JWT access token.
     Checks JTI blacklist in Redis.
     """
+    return await authenticate_access_token(credentials.credentials, db)
+
+
+async def authenticate_access_token(token: str, db: AsyncSession) -> User:
+    """
+    Resolve an access token to an active user (raises HTTPException).
+    Shared by get_current_user and transports without an Authorization
+    header (e.g. the /friends/stream WebSocket).
+    """
     try:
-        token = credentials.credentials
-        
         # 1. Decode token (Centralized function handles blacklist check logic internally)
         # Note: We pass check_blacklist=False here because we want to handle the specific
         # Redis error/fail-closed logic explicitly in this dependency for better HTTP errors.
-        payload = decode_token(token, check_blacklist=False)
+        payload = await decode_token(token, check_blacklist=False)
         
         if payload is None:
             raise HTTPException(
@@ -58,9 +65,10 @@ async def get_current_user(
             )
             
         try:
-            # Check Redis for JTI
-            if redis_client.exists(f"blacklist:jti:{jti}"):
+            # Revocation filter, confirmed in Redis (raises if Redis is down and we fail closed)
+            if await is_token_blacklisted(jti):
                 logger.warning(f"🚫 Blocked blacklisted token JTI: {jti[:8]}...")
+                forget_verified_token(token)
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Token has been revoked",
@@ -95,9 +103,8 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"}
             )
             
-        # ✅ CHANGED: Async Database Query
-        result = await db.execute(select(User).filter(User.id == user_id_int))
-        user = result.scalars().first()
+        # Snapshot cache (LRU + Redis); falls back to one SELECT
+        user = await get_user_snapshot(db, user_id_int)
         
         if user is None:
             raise HTTPException(
@@ -135,7 +142,7 @@ async def validate_refresh_token(
     """Validate refresh token with JTI blacklist check."""
     try:
         # Decode without internal check to handle explicitly
-        payload = decode_token(refresh_token, check_blacklist=False)
+        payload = await decode_token(refresh_token, check_blacklist=False)
         
         if payload is None:
             raise HTTPException(
@@ -147,7 +154,7 @@ async def validate_refresh_token(
         # Check JTI Blacklist
         jti = payload.get("jti")
         if jti:
-            if redis_client.exists(f"blacklist:jti:{jti}"):
+            if await is_token_blacklisted(jti):
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Refresh token has been revoked",
@@ -193,18 +200,16 @@ async def get_current_user_optional(
         token = credentials.credentials
         
         # Decode and verify blacklist internally
-        payload = decode_token(token, check_blacklist=True)
+        payload = await decode_token(token, check_blacklist=True)
         
         if payload is None:
             return None
         
         user_id = payload.get("sub")
         
-        # ✅ CHANGED: Async Database Query
-        result = await db.execute(select(User).filter(User.id == int(user_id), User.is_active == True))
-        user = result.scalars().first()
+        user = await get_user_snapshot(db, int(user_id))
         
-        return user
+        return user if user and user.is_active else None
     
     except Exception:
         return None
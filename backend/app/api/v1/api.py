@@ -2,7 +2,7 @@
 # FILE: backend/app/api/v1/api.py (UPDATED)
 # ============================================================================
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, prayers, prayer_times, friends, password_reset
+from app.api.v1.endpoints import auth, users, prayers, prayer_times, friends, password_reset, groups, broadcasts
 
 api_router = APIRouter()
 
@@ -48,6 +48,24 @@ api_router.include_router(
     tags=["friends"]
 )
 
+# ============================================================================
+# PRAYER CIRCLES
+# ============================================================================
+api_router.include_router(
+    groups.router,
+    prefix="/groups",
+    tags=["groups"]
+)
+
+# ============================================================================
+# ADMIN: ALL-USER ANNOUNCEMENTS
+# ============================================================================
+api_router.include_router(
+    broadcasts.router,
+    prefix="/admin/broadcasts",
+    tags=["admin"]
+)
+
 # ============================================================================
 # PRAYER TIMES ENDPOINTS (NEW)
 # ============================================================================
@@ -13,17 +13,21 @@ from typing import Any
 
 from app.core.database import get_db
 from app.core.config import settings
-from app.core.redis import redis_client 
 from app.core.rate_limiter import rate_limit 
 
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    hash_email_for_discovery,
     create_access_token,
     create_refresh_token,
     decode_token,
+    is_token_blacklisted,
+    blacklist_token_jti,
+    forget_verified_token,
 )
 from app.api.deps import get_current_user
+from app.services.user_cache import invalidate_user_snapshot
 from app.models.user import User
 from app.schemas.user import (
     UserCreate,
@@ -72,7 +76,8 @@ async def register(
         # Create new user
         new_user = User(
             email=email,
-            hashed_password=get_password_hash(user_data.password),
+            email_hash=hash_email_for_discovery(email),
+            hashed_password=await get_password_hash_async(user_data.password),
             full_name=user_data.full_name,
             preferred_language=user_data.preferred_language,
             is_active=True,
@@ -129,8 +134,8 @@ async def login(
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
-        # Verify password (CPU-bound, but fast enough for now)
-        if not verify_password(credentials.password, user.hashed_password):
+        # Verify password (bcrypt runs in the password hasher's process pool)
+        if not await verify_password_async(credentials.password, user.hashed_password):
             logger.warning(f"Failed login attempt for: {email}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -148,6 +153,7 @@ async def login(
         # ✅ CHANGED: Async Update
         user.last_login = func.now()
         await db.commit()
+        await invalidate_user_snapshot(user.id)
         
         # Generate tokens
         access_token = create_access_token(data={"sub": str(user.id)})
@@ -187,7 +193,7 @@ async def refresh_access_token(
     """Refresh access token using refresh token."""
     try:
         # 1. Decode token
-        payload = decode_token(token_request.refresh_token)
+        payload = await decode_token(token_request.refresh_token)
         if not payload:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -195,9 +201,9 @@ async def refresh_access_token(
                 headers={"WWW-Authenticate": "Bearer"}
             )
             
-        # 2. Check JTI Blacklist (Redis is sync, but fast)
+        # 2. Check JTI Blacklist
         jti = payload.get("jti")
-        if jti and redis_client.exists(f"blacklist:jti:{jti}"):
+        if jti and await is_token_blacklisted(jti):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Refresh token has been revoked",
@@ -273,7 +279,7 @@ async def logout(
 ):
     """Logout by blacklisting token's JTI."""
     try:
-        payload = decode_token(token, check_blacklist=False)
+        payload = await decode_token(token, check_blacklist=False)
         
         if not payload:
             return {"message": "Already logged out or invalid token"}
@@ -287,12 +293,9 @@ async def logout(
         ttl = int(exp_timestamp - current_timestamp)
         
         if ttl > 0:
-            redis_client.setex(
-                f"blacklist:jti:{jti}",
-                ttl,
-                str(current_user.id)
-            )
-            logger.info(f"Token JTI blacklisted for user {current_user.id}")
+            if not await blacklist_token_jti(jti, ttl, current_user.id):
+                raise RuntimeError("Token blacklist write failed")
+            forget_verified_token(token)
         
         return {
             "message": "Successfully logged out",
@@ -0,0 +1,148 @@
+# ============================================================================
+# FILE: backend/app/api/v1/endpoints/broadcasts.py (ADMIN ANNOUNCEMENTS)
+# ============================================================================
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+import logging
+
+from app.core.database import get_db
+from app.api.deps import get_current_admin_user
+from app.models.user import User
+from app.models.notification import NotificationBroadcast, BroadcastStatus
+from app.schemas.broadcast import BroadcastCreate, BroadcastResponse
+from app.services.broadcast import start_broadcast
+from app.services.push_notification_service import TRANSLATIONS, get_translation
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def broadcast_to_response(broadcast: NotificationBroadcast) -> BroadcastResponse:
+    return BroadcastResponse(
+        id=broadcast.id,
+        kind=broadcast.kind,
+        status=broadcast.status.value,
+        last_user_id=broadcast.last_user_id,
+        sent_count=broadcast.sent_count,
+        failed_count=broadcast.failed_count,
+        created_at=broadcast.created_at,
+        finished_at=broadcast.finished_at,
+    )
+
+
+async def get_broadcast_or_404(
+    db: AsyncSession, broadcast_id: int, for_update: bool = False
+) -> NotificationBroadcast:
+    query = select(NotificationBroadcast).filter(NotificationBroadcast.id == broadcast_id)
+    if for_update:
+        query = query.with_for_update()
+    result = await db.execute(query)
+    broadcast = result.scalars().first()
+    if not broadcast:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Broadcast not found")
+    return broadcast
+
+
+# ============================================================================
+# START BROADCAST
+# ============================================================================
+@router.post("", response_model=BroadcastResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_broadcast(
+    broadcast_data: BroadcastCreate,
+    background_tasks: BackgroundTasks,
+    admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Send an announcement to every active user, in their own language."""
+    if not broadcast_data.templates and broadcast_data.kind not in TRANSLATIONS['en']:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Unknown notification kind")
+
+    if not broadcast_data.templates:
+        # Render every language up front so a missing param fails here, not in the worker
+        try:
+            for lang in TRANSLATIONS:
+                get_translation(broadcast_data.kind, lang, **broadcast_data.params)
+        except (KeyError, IndexError) as e:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=f"Missing template parameter: {e}")
+
+    try:
+        broadcast = NotificationBroadcast(
+            kind=broadcast_data.kind,
+            params=broadcast_data.params,
+            templates={
+                lang: template.model_dump() for lang, template in broadcast_data.templates.items()
+            } if broadcast_data.templates else None,
+            data=broadcast_data.data,
+            created_by=admin.id
+        )
+        db.add(broadcast)
+        await db.commit()
+        await db.refresh(broadcast)
+
+        await start_broadcast(background_tasks, broadcast.id)
+        logger.info(f"📢 Broadcast {broadcast.id} queued by admin {admin.id}")
+        return broadcast_to_response(broadcast)
+
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error creating broadcast: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create broadcast"
+        )
+
+
+# ============================================================================
+# PROGRESS / CANCEL / RESUME
+# ============================================================================
+@router.get("/{broadcast_id}", response_model=BroadcastResponse)
+async def get_broadcast(
+    broadcast_id: int,
+    admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Progress of a broadcast (checkpoint and counters)."""
+    return broadcast_to_response(await get_broadcast_or_404(db, broadcast_id))
+
+
+@router.post("/{broadcast_id}/cancel", response_model=BroadcastResponse)
+async def cancel_broadcast(
+    broadcast_id: int,
+    admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stop a broadcast after the page currently being sent."""
+    broadcast = await get_broadcast_or_404(db, broadcast_id)
+    if broadcast.status == BroadcastStatus.COMPLETED:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Broadcast already completed")
+
+    broadcast.status = BroadcastStatus.CANCELLED
+    await db.commit()
+    return broadcast_to_response(broadcast)
+
+
+@router.post("/{broadcast_id}/resume", response_model=BroadcastResponse)
+async def resume_broadcast(
+    broadcast_id: int,
+    background_tasks: BackgroundTasks,
+    admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Continue a cancelled broadcast from its checkpoint (or re-kick a pending
+    one). A running broadcast already has its job chain: a second one would
+    double the send rate, so it is rejected.
+    """
+    # Row lock: two concurrent resumes must not both start a chain
+    broadcast = await get_broadcast_or_404(db, broadcast_id, for_update=True)
+    if broadcast.status not in (BroadcastStatus.CANCELLED, BroadcastStatus.PENDING):
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            detail=f"Broadcast is {broadcast.status.value}; only cancelled or pending broadcasts can be resumed"
+        )
+
+    broadcast.status = BroadcastStatus.RUNNING
+    await db.commit()
+    await start_broadcast(background_tasks, broadcast.id)
+    return broadcast_to_response(broadcast)
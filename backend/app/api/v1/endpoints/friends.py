@@ -1,16 +1,21 @@
 # ============================================================================
 # FILE: backend/app/api/v1/endpoints/friends.py (FIXED IMPORT)
 # ============================================================================
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, or_, func, delete
-from typing import List
+from sqlalchemy import and_, or_, func, delete, case, text
+from typing import List, Optional
+import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 
-from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.database import get_db, AsyncSessionLocal
+from app.core.realtime import friend_event_hub
+from app.api.deps import get_current_user, authenticate_access_token
+from app.core.security import decode_token
 from app.models.user import User
 from app.models.friendship import Friendship, FriendshipStatus
 from app.models.prayer import PrayerLog, PrayerStreak
@@ -18,16 +23,24 @@ from app.schemas.friend import (
     FriendRequestCreate,
     FriendshipResponse,
     FriendWeekPrayersResponse,
+    FriendsFeedResponse,
+    ContactDiscoveryRequest,
+    ContactDiscoveryResponse,
     MessageResponse
 )
 from app.schemas.prayer import StreakResponse
 
-from app.services.push_notification_service import push_service, get_translation
+from app.services.streak_cache import get_streak_snapshot
+from app.services.notification_outbox import add_outbox_notification, schedule_outbox_relay
+from app.services.friend_graph import (
+    get_friend_ids,
+    are_friends,
+    count_friends,
+    add_friend_edge,
+    remove_friend_edge,
+)
 from app.core.rate_limiter import rate_limit
 
-# ✅ CRITICAL FIX: Import the missing function from prayers.py
-from app.api.v1.endpoints.prayers import calculate_prayer_streak_optimized
-
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
@@ -39,36 +52,29 @@ MAX_FRIENDS_LIMIT = 5
 # HELPER FUNCTIONS (ASYNC)
 # ============================================================================
 async def get_accepted_friends_count(db: AsyncSession, user_id: int) -> int:
-    """Get count of accepted friends for a user (Async)."""
-    query = select(func.count(Friendship.id)).filter(
-        and_(
-            or_(
-                Friendship.user_id == user_id,
-                Friendship.friend_id == user_id
-            ),
-            Friendship.status == FriendshipStatus.ACCEPTED
-        )
-    )
-    result = await db.execute(query)
-    return result.scalar() or 0
+    """Get count of accepted friends for a user (Redis friend set, Async)."""
+    return await count_friends(db, user_id)
 
 
-async def check_friendship_exists(db: AsyncSession, user_id: int, friend_id: int) -> Friendship:
-    """Check if friendship exists in either direction (Async)."""
-    query = select(Friendship).filter(
-        or_(
-            and_(
-                Friendship.user_id == user_id,
-                Friendship.friend_id == friend_id
-            ),
-            and_(
-                Friendship.user_id == friend_id,
-                Friendship.friend_id == user_id
-            )
-        )
-    )
-    result = await db.execute(query)
-    return result.scalars().first()
+def build_week_days(start, completed_by_date: dict) -> List[dict]:
+    """Build the 7-day completion grid starting at `start`."""
+    days = []
+    current_date = start
+    today_str = datetime.now().strftime("%Y-%m-%d")
+    
+    for _ in range(7):
+        date_str = current_date.strftime("%Y-%m-%d")
+        completed = completed_by_date.get(date_str, 0)
+        
+        days.append({
+            "date": date_str,
+            "completion_percentage": round((completed / 5) * 100, 1),
+            "is_today": date_str == today_str,
+            "completed_count": completed
+        })
+        current_date += timedelta(days=1)
+    
+    return days
 
 
 # ============================================================================
@@ -81,6 +87,10 @@ async def get_friends(
 ):
     """Get all accepted friends for current user."""
     try:
+        # Most users have no friends yet: skip the join entirely
+        if not await get_friend_ids(db, current_user.id):
+            return []
+        
         query = select(Friendship).filter(
             and_(
                 or_(
@@ -128,6 +138,221 @@ async def get_friends(
         )
 
 
+# ============================================================================
+# FRIENDS FEED - ALL FRIENDS' WEEKS IN ONE QUERY (ASYNC)
+# ============================================================================
+@router.get("/feed", response_model=FriendsFeedResponse)
+async def get_friends_feed(
+    start_date: str = Query(..., description="YYYY-MM-DD"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get week grids and streaks for all accepted friends.
+    
+    Replaces one /{friend_id}/prayers/week call per friend with a single
+    join: friendships -> users -> prayer_streaks -> prayer_logs (week range),
+    aggregated to one row per (friend, day).
+    """
+    try:
+        try:
+            start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        except ValueError:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Invalid date format. Use YYYY-MM-DD")
+        end = start + timedelta(days=6)
+        
+        friend_id_col = case(
+            (Friendship.user_id == current_user.id, Friendship.friend_id),
+            else_=Friendship.user_id
+        )
+        
+        query = (
+            select(
+                Friendship.id.label("friendship_id"),
+                User.id.label("friend_id"),
+                User.full_name,
+                User.email,
+                PrayerStreak.current_streak,
+                PrayerStreak.best_streak,
+                PrayerLog.prayer_date,
+                func.count(PrayerLog.id).label("completed"),
+            )
+            .select_from(Friendship)
+            .join(User, User.id == friend_id_col)
+            .outerjoin(PrayerStreak, PrayerStreak.user_id == User.id)
+            .outerjoin(
+                PrayerLog,
+                and_(
+                    PrayerLog.user_id == User.id,
+                    PrayerLog.prayer_date >= start.strftime("%Y-%m-%d"),
+                    PrayerLog.prayer_date <= end.strftime("%Y-%m-%d"),
+                    PrayerLog.completed == True
+                )
+            )
+            .filter(
+                and_(
+                    or_(
+                        Friendship.user_id == current_user.id,
+                        Friendship.friend_id == current_user.id
+                    ),
+                    Friendship.status == FriendshipStatus.ACCEPTED
+                )
+            )
+            .group_by(
+                Friendship.id,
+                User.id,
+                User.full_name,
+                User.email,
+                PrayerStreak.current_streak,
+                PrayerStreak.best_streak,
+                PrayerLog.prayer_date
+            )
+            .order_by(Friendship.id)
+        )
+        result = await db.execute(query)
+        
+        # Rows arrive grouped per friend: fold the per-day counts into grids
+        friends = {}
+        for row in result.all():
+            entry = friends.get(row.friendship_id)
+            if entry is None:
+                entry = friends[row.friendship_id] = {
+                    "friendship_id": row.friendship_id,
+                    "friend_id": row.friend_id,
+                    "friend_name": row.full_name or row.email.split('@')[0],
+                    "current_streak": row.current_streak or 0,
+                    "best_streak": row.best_streak or 0,
+                    "completed_by_date": {},
+                }
+            if row.prayer_date:
+                entry["completed_by_date"][row.prayer_date] = row.completed
+        
+        feed = []
+        for entry in friends.values():
+            completed_by_date = entry.pop("completed_by_date")
+            feed.append({**entry, "days": build_week_days(start, completed_by_date)})
+        
+        return FriendsFeedResponse(
+            start_date=start_date,
+            end_date=end.strftime("%Y-%m-%d"),
+            friends=feed
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting friends feed for user {current_user.id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get friends feed"
+        )
+
+
+# ============================================================================
+# REAL-TIME FRIEND ACTIVITY STREAM (WEBSOCKET)
+# ============================================================================
+# Close codes (4000-4999 are application-defined)
+WS_CLOSE_UNAUTHORIZED = 4401
+WS_CLOSE_IDLE = 4408
+WS_CLOSE_TRY_AGAIN = 1013
+
+
+async def _stream_close_code(token: str) -> Optional[int]:
+    """None while the token and its user are still valid, else the close code."""
+    try:
+        async with AsyncSessionLocal() as db:
+            await authenticate_access_token(token, db)
+        return None
+    except HTTPException as e:
+        if e.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+            return WS_CLOSE_TRY_AGAIN
+        return WS_CLOSE_UNAUTHORIZED
+
+
+@router.websocket("/stream")
+async def friends_stream(websocket: WebSocket, token: str = Query(...)):
+    """
+    Push friends' prayer and streak events as they happen.
+    
+    Connect with ?token=<access token>. The server sends JSON events:
+    - {"type": "friend_prayer", "friend_id", "prayer_name", "prayer_date", "completed", "current_streak"}
+    - {"type": "ping"} every REALTIME_HEARTBEAT_INTERVAL seconds; any client message counts as a pong
+    - {"type": "resync"} when events were dropped; refetch /friends/feed
+    
+    No DB session or Redis connection is held per client, so idle
+    connections cost one small queue each.
+    
+    The socket is closed with WS_CLOSE_UNAUTHORIZED when the token expires,
+    and the token (revocation) and user (active) are checked again every
+    heartbeat. Events only reach current friends: they are routed through
+    the friend graph when published.
+    """
+    if not settings.REALTIME_ENABLED:
+        await websocket.close(code=WS_CLOSE_TRY_AGAIN)
+        return
+    
+    try:
+        async with AsyncSessionLocal() as db:
+            user = await authenticate_access_token(token, db)
+        token_expires_at = float((await decode_token(token, check_blacklist=False))["exp"])
+    except HTTPException:
+        await websocket.close(code=WS_CLOSE_UNAUTHORIZED)
+        return
+    
+    if friend_event_hub.connection_count >= settings.REALTIME_MAX_CONNECTIONS:
+        logger.warning("Friend stream connection refused: node at capacity")
+        await websocket.close(code=WS_CLOSE_TRY_AGAIN)
+        return
+    
+    await websocket.accept()
+    subscription = await friend_event_hub.subscribe(user.id)
+    last_seen = time.monotonic()
+    
+    async def receive_loop():
+        nonlocal last_seen
+        while True:
+            await websocket.receive_text()
+            last_seen = time.monotonic()
+    
+    async def send_loop():
+        next_auth_check = time.monotonic() + settings.REALTIME_HEARTBEAT_INTERVAL
+        while True:
+            # Wake up no later than the token expiry
+            timeout = min(settings.REALTIME_HEARTBEAT_INTERVAL, token_expires_at - time.time())
+            event = await subscription.next_event(max(timeout, 0))
+            if time.time() >= token_expires_at:
+                await websocket.close(code=WS_CLOSE_UNAUTHORIZED)
+                return
+            if time.monotonic() >= next_auth_check:
+                # Logout / revocation, deactivation
+                close_code = await _stream_close_code(token)
+                if close_code is not None:
+                    await websocket.close(code=close_code)
+                    return
+                next_auth_check = time.monotonic() + settings.REALTIME_HEARTBEAT_INTERVAL
+            if time.monotonic() - last_seen > settings.REALTIME_IDLE_TIMEOUT:
+                await websocket.close(code=WS_CLOSE_IDLE)
+                return
+            # A client that cannot keep up with sends is dropped, not buffered
+            await asyncio.wait_for(
+                websocket.send_json(event or {"type": "ping"}),
+                settings.REALTIME_SEND_TIMEOUT
+            )
+    
+    tasks = [asyncio.create_task(receive_loop()), asyncio.create_task(send_loop())]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error and not isinstance(error, WebSocketDisconnect):
+                logger.warning(f"Friend stream for user {user.id} closed: {error!r}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await friend_event_hub.unsubscribe(subscription)
+
+
 # ============================================================================
 # GET FRIENDS COUNT (ASYNC)
 # ============================================================================
@@ -235,9 +460,101 @@ async def get_sent_requests(
         )
 
 
+# ============================================================================
+# CONTACT DISCOVERY (ASYNC)
+# ============================================================================
+@router.post(
+    "/discover",
+    response_model=ContactDiscoveryResponse,
+    dependencies=[Depends(rate_limit(20, 3600, by_user=True))]
+)
+async def discover_contacts(
+    request_data: ContactDiscoveryRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Find which address-book contacts are registered.
+    
+    The app sends salted email hashes (see hash_email_for_discovery); they
+    are matched in one query against the indexed users.email_hash column,
+    together with any existing friendship with the current user.
+    """
+    # At most CONTACT_DISCOVERY_MAX_HASHES, enforced by the schema
+    hashes = {h.strip().lower() for h in request_data.hashes}
+    hashes = {h for h in hashes if len(h) == 64 and all(c in "0123456789abcdef" for c in h)}
+    if not hashes:
+        return ContactDiscoveryResponse(matches=[])
+    
+    try:
+        query = (
+            select(
+                User.id,
+                User.email_hash,
+                User.full_name,
+                User.email,
+                Friendship.status,
+                Friendship.requester_id,
+            )
+            .outerjoin(
+                Friendship,
+                or_(
+                    and_(Friendship.user_id == current_user.id, Friendship.friend_id == User.id),
+                    and_(Friendship.user_id == User.id, Friendship.friend_id == current_user.id)
+                )
+            )
+            .filter(
+                and_(
+                    User.email_hash.in_(hashes),
+                    User.is_active == True,
+                    User.id != current_user.id
+                )
+            )
+        )
+        result = await db.execute(query)
+        
+        matches = [
+            {
+                "hash": row.email_hash,
+                "user_id": row.id,
+                "name": row.full_name or row.email.split('@')[0],
+                "friendship_status": row.status.value if row.status else None,
+                "is_requester": (row.requester_id == current_user.id) if row.status else None,
+            }
+            for row in result.all()
+        ]
+        
+        logger.info(f"Contact discovery for user {current_user.id}: {len(matches)}/{len(hashes)} matched")
+        return ContactDiscoveryResponse(matches=matches)
+        
+    except Exception as e:
+        logger.error(f"Error discovering contacts for user {current_user.id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to discover contacts"
+        )
+
+
 # ============================================================================
 # SEND FRIEND REQUEST (ASYNC)
 # ============================================================================
+# Limit checks, duplicate checks and the insert run atomically inside the
+# friendship_send_request() stored function (see migrations 7a4e2c91d0b3 and 2d8f6b1e4c73).
+SEND_REQUEST_SQL = text(
+    "SELECT * FROM friendship_send_request(:sender_id, :friend_email, :max_friends)"
+)
+
+SEND_REQUEST_ERRORS = {
+    "sender_limit": (status.HTTP_400_BAD_REQUEST, f"You have reached the maximum limit of {MAX_FRIENDS_LIMIT} friends."),
+    "user_not_found": (status.HTTP_404_NOT_FOUND, "User not found with this email"),
+    "self": (status.HTTP_400_BAD_REQUEST, "You cannot add yourself as a friend"),
+    "friend_limit": (status.HTTP_400_BAD_REQUEST, f"This user has reached their maximum limit of {MAX_FRIENDS_LIMIT} friends"),
+    "already_friends": (status.HTTP_400_BAD_REQUEST, "Already friends with this user"),
+    "already_sent": (status.HTTP_400_BAD_REQUEST, "Request already sent"),
+    "already_received": (status.HTTP_400_BAD_REQUEST, "This user already sent you a request"),
+}
+
+
 @router.post(
     "/request",
     response_model=MessageResponse,
@@ -245,88 +562,42 @@ async def get_sent_requests(
 )
 async def send_friend_request(
     request_data: FriendRequestCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Send a friend request to another user by email."""
     try:
-        current_friends_count = await get_accepted_friends_count(db, current_user.id)
-        if current_friends_count >= MAX_FRIENDS_LIMIT:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"You have reached the maximum limit of {MAX_FRIENDS_LIMIT} friends."
-            )
-        
-        result = await db.execute(select(User).filter(User.email == request_data.friend_email.lower()))
-        friend = result.scalars().first()
-        
-        if not friend:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found with this email"
-            )
-        
-        if friend.id == current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="You cannot add yourself as a friend"
-            )
-        
-        friend_count = await get_accepted_friends_count(db, friend.id)
-        if friend_count >= MAX_FRIENDS_LIMIT:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"This user has reached their maximum limit of {MAX_FRIENDS_LIMIT} friends"
-            )
-        
-        existing = await check_friendship_exists(db, current_user.id, friend.id)
-        
-        if existing:
-            if existing.status == FriendshipStatus.ACCEPTED:
-                raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Already friends with this user")
-            elif existing.status == FriendshipStatus.PENDING:
-                if existing.requester_id == current_user.id:
-                    raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Request already sent")
-                else:
-                    raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="This user already sent you a request")
-        
-        friendship = Friendship(
-            user_id=current_user.id,
-            friend_id=friend.id,
-            requester_id=current_user.id,
-            status=FriendshipStatus.PENDING
+        result = await db.execute(SEND_REQUEST_SQL, {
+            "sender_id": current_user.id,
+            "friend_email": request_data.friend_email.lower(),
+            "max_friends": MAX_FRIENDS_LIMIT,
+        })
+        outcome = result.mappings().one()
+        
+        if outcome["outcome"] in SEND_REQUEST_ERRORS:
+            await db.rollback()
+            status_code, detail = SEND_REQUEST_ERRORS[outcome["outcome"]]
+            raise HTTPException(status_code=status_code, detail=detail)
+        
+        # Stored with the request itself; relayed to Expo after commit
+        add_outbox_notification(
+            db,
+            recipient_id=outcome["friend_id"],
+            kind='friend_request',
+            params={'name': current_user.full_name or 'Someone'},
+            data={
+                'type': 'friend_request',
+                'friendship_id': outcome["friendship_id"],
+                'sender_id': current_user.id,
+                'sender_name': current_user.full_name,
+            },
+            preference='friend_requests'
         )
-        
-        db.add(friendship)
         await db.commit()
-        await db.refresh(friendship)
+        schedule_outbox_relay(background_tasks)
         
-        logger.info(f"Friend request sent: {current_user.id} -> {friend.id}")
-
-        try:
-            if friend.push_token and friend.notification_preferences.get('friend_requests', True):
-                lang = friend.preferred_language or 'en'
-                
-                content = get_translation(
-                    'friend_request',
-                    lang,
-                    name=current_user.full_name or 'Someone'
-                )
-                
-                await push_service.send_notification(
-                    push_token=friend.push_token,
-                    title=content['title'],
-                    body=content['body'],
-                    data={
-                        'type': 'friend_request',
-                        'friendship_id': friendship.id,
-                        'sender_id': current_user.id,
-                        'sender_name': current_user.full_name,
-                    },
-                    sound="default",
-                )
-        except Exception as notif_error:
-            logger.error(f"Failed to send notification: {notif_error}")
+        logger.info(f"Friend request sent: {current_user.id} -> {outcome['friend_id']}")
 
         return MessageResponse(message="Friend request sent successfully")
         
@@ -344,6 +615,19 @@ async def send_friend_request(
 # ============================================================================
 # ACCEPT FRIEND REQUEST (ASYNC)
 # ============================================================================
+# Same pattern: friendship_accept_request() re-checks the request and both
+# users' limits under lock, then flips the status in one round trip.
+ACCEPT_REQUEST_SQL = text(
+    "SELECT * FROM friendship_accept_request(:request_id, :accepter_id, :max_friends)"
+)
+
+ACCEPT_REQUEST_ERRORS = {
+    "not_found": (status.HTTP_404_NOT_FOUND, "Friend request not found"),
+    "accepter_limit": (status.HTTP_400_BAD_REQUEST, f"You have reached the maximum limit of {MAX_FRIENDS_LIMIT} friends."),
+    "requester_limit": (status.HTTP_400_BAD_REQUEST, "The requester has reached their friend limit"),
+}
+
+
 @router.post(
     "/request/{request_id}/accept",
     response_model=MessageResponse,
@@ -351,70 +635,43 @@ async def send_friend_request(
 )
 async def accept_friend_request(
     request_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Accept a pending friend request."""
     try:
-        current_friends_count = await get_accepted_friends_count(db, current_user.id)
-        if current_friends_count >= MAX_FRIENDS_LIMIT:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"You have reached the maximum limit of {MAX_FRIENDS_LIMIT} friends."
-            )
-        
-        from sqlalchemy.orm import selectinload
-        query = select(Friendship).options(selectinload(Friendship.user)).filter(
-            and_(
-                Friendship.id == request_id,
-                Friendship.friend_id == current_user.id,
-                Friendship.status == FriendshipStatus.PENDING
-            )
+        result = await db.execute(ACCEPT_REQUEST_SQL, {
+            "request_id": request_id,
+            "accepter_id": current_user.id,
+            "max_friends": MAX_FRIENDS_LIMIT,
+        })
+        outcome = result.mappings().one()
+        
+        if outcome["outcome"] in ACCEPT_REQUEST_ERRORS:
+            await db.rollback()
+            status_code, detail = ACCEPT_REQUEST_ERRORS[outcome["outcome"]]
+            raise HTTPException(status_code=status_code, detail=detail)
+        
+        add_outbox_notification(
+            db,
+            recipient_id=outcome["requester_id"],
+            kind='friend_request_accepted',
+            params={'name': current_user.full_name or 'Someone'},
+            data={
+                'type': 'friend_request_accepted',
+                'friendship_id': request_id,
+                'accepter_id': current_user.id,
+                'accepter_name': current_user.full_name,
+            },
+            preference='friend_requests'
         )
-        result = await db.execute(query)
-        friendship = result.scalars().first()
-        
-        if not friendship:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Friend request not found")
-        
-        requester_count = await get_accepted_friends_count(db, friendship.user_id)
-        if requester_count >= MAX_FRIENDS_LIMIT:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="The requester has reached their friend limit"
-            )
-        
-        friendship.status = FriendshipStatus.ACCEPTED
         await db.commit()
+        await add_friend_edge(outcome["requester_id"], current_user.id)
+        schedule_outbox_relay(background_tasks)
         
         logger.info(f"Friend request accepted: {request_id} by user {current_user.id}")
 
-        try:
-            requester = friendship.user
-            if requester.push_token and requester.notification_preferences.get('friend_requests', True):
-                lang = requester.preferred_language or 'en'
-                
-                content = get_translation(
-                    'friend_request_accepted',
-                    lang,
-                    name=current_user.full_name or 'Someone'
-                )
-                
-                await push_service.send_notification(
-                    push_token=requester.push_token,
-                    title=content['title'],
-                    body=content['body'],
-                    data={
-                        'type': 'friend_request_accepted',
-                        'friendship_id': friendship.id,
-                        'accepter_id': current_user.id,
-                        'accepter_name': current_user.full_name,
-                    },
-                    sound="default",
-                )
-        except Exception as notif_error:
-            logger.error(f"Failed to send acceptance notification: {notif_error}")
-
         return MessageResponse(message="Friend request accepted")
         
     except HTTPException:
@@ -458,6 +715,7 @@ async def reject_friend_request(
         
         await db.delete(friendship)
         await db.commit()
+        await remove_friend_edge(friendship.user_id, friendship.friend_id)
         
         return MessageResponse(message="Friend request rejected")
         
@@ -495,6 +753,7 @@ async def cancel_sent_request(
         
         await db.delete(friendship)
         await db.commit()
+        await remove_friend_edge(friendship.user_id, friendship.friend_id)
         
         return MessageResponse(message="Friend request cancelled")
         
@@ -535,6 +794,7 @@ async def remove_friend(
         
         await db.delete(friendship)
         await db.commit()
+        await remove_friend_edge(friendship.user_id, friendship.friend_id)
         
         return MessageResponse(message="Friend removed successfully")
         
@@ -558,8 +818,7 @@ async def get_friend_week_prayers(
 ):
     """Get a friend's prayer completion for a week."""
     try:
-        friendship = await check_friendship_exists(db, current_user.id, friend_id)
-        if not friendship or friendship.status != FriendshipStatus.ACCEPTED:
+        if not await are_friends(db, current_user.id, friend_id):
             raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Not accepted friends")
         
         from sqlalchemy.orm import selectinload
@@ -585,26 +844,10 @@ async def get_friend_week_prayers(
         
         days_data = {}
         for log in logs:
-            if log.prayer_date not in days_data:
-                days_data[log.prayer_date] = {"completed": 0}
             if log.completed:
-                days_data[log.prayer_date]["completed"] += 1
-        
-        days = []
-        current_date = start
-        today_str = datetime.now().strftime("%Y-%m-%d")
+                days_data[log.prayer_date] = days_data.get(log.prayer_date, 0) + 1
         
-        for _ in range(7):
-            date_str = current_date.strftime("%Y-%m-%d")
-            completed = days_data.get(date_str, {}).get("completed", 0)
-            
-            days.append({
-                "date": date_str,
-                "completion_percentage": round((completed / 5) * 100, 1),
-                "is_today": date_str == today_str,
-                "completed_count": completed
-            })
-            current_date += timedelta(days=1)
+        days = build_week_days(start, days_data)
         
         return FriendWeekPrayersResponse(
             friend_id=friend_id,
@@ -626,7 +869,7 @@ async def get_friend_week_prayers(
     
 
 # ============================================================================
-# GET FRIEND STREAK (FIXED - NOW WORKS!)
+# GET FRIEND STREAK (READ-ONLY, CACHED)
 # ============================================================================
 @router.get(
     "/{friend_id}/streak",
@@ -635,68 +878,32 @@ async def get_friend_week_prayers(
 )
 async def get_friend_streak(
     friend_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get a friend's current streak."""
+    """
+    Get a friend's current streak.
+    Served from the friend's maintained PrayerStreak row (via a short-lived
+    Redis snapshot); never recomputes or writes the friend's row. Stale rows
+    are repaired by a background job.
+    """
     try:
         # 1. Verify friendship
-        query = select(Friendship).filter(
-            and_(
-                or_(
-                    and_(
-                        Friendship.user_id == current_user.id,
-                        Friendship.friend_id == friend_id
-                    ),
-                    and_(
-                        Friendship.user_id == friend_id,
-                        Friendship.friend_id == current_user.id
-                    )
-                ),
-                Friendship.status == FriendshipStatus.ACCEPTED
-            )
-        )
-        result = await db.execute(query)
-        friendship = result.scalars().first()
-        
-        if not friendship:
+        if not await are_friends(db, current_user.id, friend_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Friendship not found"
             )
         
-        # 2. ✅ Calculate friend's streak using imported function
-        friend_streak = await calculate_prayer_streak_optimized(friend_id, db)
-        
-        # 3. Get or update streak record
-        query = select(PrayerStreak).filter(
-            PrayerStreak.user_id == friend_id
-        )
-        result = await db.execute(query)
-        streak_record = result.scalars().first()
-        
-        if not streak_record:
-            return StreakResponse(
-                current_streak=friend_streak,
-                best_streak=friend_streak,
-                last_prayer_date=datetime.utcnow().strftime("%Y-%m-%d"),
-                updated_at=datetime.utcnow()
-            )
-        
-        # Update if needed
-        if friend_streak != streak_record.current_streak:
-            streak_record.current_streak = friend_streak
-            if friend_streak > streak_record.best_streak:
-                streak_record.best_streak = friend_streak
-            db.add(streak_record)
-            await db.commit()
-            await db.refresh(streak_record)
+        # 2. Cached snapshot of the maintained streak row
+        snapshot = await get_streak_snapshot(friend_id, db, background_tasks)
         
         return StreakResponse(
-            current_streak=streak_record.current_streak,
-            best_streak=streak_record.best_streak,
-            last_prayer_date=streak_record.last_prayer_date,
-            updated_at=streak_record.updated_at
+            current_streak=snapshot['current_streak'],
+            best_streak=snapshot['best_streak'],
+            last_prayer_date=snapshot['last_prayer_date'],
+            updated_at=snapshot['updated_at'] or datetime.utcnow()
         )
         
     except HTTPException:
@@ -706,4 +913,4 @@ async def get_friend_streak(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to get friend streak"
-        )
\ No newline at end of file
+        )
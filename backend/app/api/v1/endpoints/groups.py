@@ -0,0 +1,424 @@
+# ============================================================================
+# FILE: backend/app/api/v1/endpoints/groups.py (PRAYER CIRCLES)
+# ============================================================================
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import and_, func
+from typing import List, Optional
+import logging
+import secrets
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.models.group import PrayerGroup, GroupMember, GroupDailyProgress, GroupRole
+from app.schemas.group import (
+    GroupCreate,
+    GroupJoin,
+    GroupResponse,
+    GroupMembersResponse,
+    GroupDashboardResponse,
+)
+from app.schemas.friend import MessageResponse
+from app.services.prayer_groups import refresh_today_progress
+from app.core.rate_limiter import rate_limit
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+INVITE_CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+INVITE_CODE_LENGTH = 8
+MEMBERS_PAGE_SIZE = 50
+MEMBERS_MAX_PAGE_SIZE = 200
+DASHBOARD_MAX_DAYS = 31
+
+
+# ============================================================================
+# HELPER FUNCTIONS (ASYNC)
+# ============================================================================
+def generate_invite_code() -> str:
+    return "".join(secrets.choice(INVITE_CODE_ALPHABET) for _ in range(INVITE_CODE_LENGTH))
+
+
+async def get_membership(db: AsyncSession, group_id: int, user_id: int) -> Optional[GroupMember]:
+    """Membership of a user in a group, or None."""
+    result = await db.execute(
+        select(GroupMember).filter(
+            and_(GroupMember.group_id == group_id, GroupMember.user_id == user_id)
+        )
+    )
+    return result.scalars().first()
+
+
+async def require_membership(db: AsyncSession, group_id: int, user_id: int) -> GroupMember:
+    membership = await get_membership(db, group_id, user_id)
+    if not membership:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Group not found")
+    return membership
+
+
+async def count_user_groups(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(
+        select(func.count(GroupMember.id)).filter(GroupMember.user_id == user_id)
+    )
+    return result.scalar() or 0
+
+
+def group_to_response(group: PrayerGroup, role: GroupRole) -> GroupResponse:
+    can_invite = role in (GroupRole.OWNER, GroupRole.ADMIN)
+    return GroupResponse(
+        id=group.id,
+        name=group.name,
+        description=group.description,
+        member_count=group.member_count,
+        role=role.value,
+        invite_code=group.invite_code if can_invite else None,
+        created_at=group.created_at,
+    )
+
+
+# ============================================================================
+# CREATE GROUP (ASYNC)
+# ============================================================================
+@router.post(
+    "",
+    response_model=GroupResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit(10, 86400, by_user=True))]
+)
+async def create_group(
+    group_data: GroupCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a prayer circle; the creator becomes its owner."""
+    try:
+        if await count_user_groups(db, current_user.id) >= settings.GROUP_MAX_PER_USER:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=f"You can be in at most {settings.GROUP_MAX_PER_USER} groups"
+            )
+
+        group = PrayerGroup(
+            name=group_data.name.strip(),
+            description=group_data.description,
+            owner_id=current_user.id,
+            invite_code=generate_invite_code(),
+            member_count=1
+        )
+        db.add(group)
+        await db.flush()
+
+        db.add(GroupMember(group_id=group.id, user_id=current_user.id, role=GroupRole.OWNER))
+        await db.flush()
+        await refresh_today_progress(db, group.id)
+        await db.commit()
+        await db.refresh(group)
+
+        logger.info(f"Group created: {group.id} by user {current_user.id}")
+        return group_to_response(group, GroupRole.OWNER)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error creating group: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create group"
+        )
+
+
+# ============================================================================
+# LIST MY GROUPS (ASYNC)
+# ============================================================================
+@router.get("", response_model=List[GroupResponse])
+async def get_my_groups(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get all circles the current user belongs to."""
+    try:
+        query = (
+            select(PrayerGroup, GroupMember.role)
+            .join(GroupMember, GroupMember.group_id == PrayerGroup.id)
+            .filter(GroupMember.user_id == current_user.id)
+            .order_by(PrayerGroup.name)
+        )
+        result = await db.execute(query)
+        return [group_to_response(group, role) for group, role in result.all()]
+
+    except Exception as e:
+        logger.error(f"Error getting groups for user {current_user.id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get groups"
+        )
+
+
+# ============================================================================
+# JOIN GROUP (ASYNC)
+# ============================================================================
+@router.post(
+    "/join",
+    response_model=GroupResponse,
+    dependencies=[Depends(rate_limit(20, 3600, by_user=True))]
+)
+async def join_group(
+    join_data: GroupJoin,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Join a circle with its invite code."""
+    try:
+        # Lock the group row so member_count and the size cap stay exact
+        result = await db.execute(
+            select(PrayerGroup)
+            .filter(PrayerGroup.invite_code == join_data.invite_code.strip().upper())
+            .with_for_update()
+        )
+        group = result.scalars().first()
+
+        if not group:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Invalid invite code")
+
+        if await get_membership(db, group.id, current_user.id):
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Already a member of this group")
+
+        if group.member_count >= settings.GROUP_MAX_MEMBERS:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="This group is full")
+
+        if await count_user_groups(db, current_user.id) >= settings.GROUP_MAX_PER_USER:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=f"You can be in at most {settings.GROUP_MAX_PER_USER} groups"
+            )
+
+        db.add(GroupMember(group_id=group.id, user_id=current_user.id, role=GroupRole.MEMBER))
+        group.member_count += 1
+        await db.flush()
+        await refresh_today_progress(db, group.id)
+        await db.commit()
+        await db.refresh(group)
+
+        logger.info(f"User {current_user.id} joined group {group.id}")
+        return group_to_response(group, GroupRole.MEMBER)
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error joining group: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to join group"
+        )
+
+
+# ============================================================================
+# LEAVE GROUP (ASYNC)
+# ============================================================================
+@router.delete("/{group_id}/leave", response_model=MessageResponse)
+async def leave_group(
+    group_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Leave a circle. Owners delete the circle instead."""
+    try:
+        result = await db.execute(
+            select(PrayerGroup).filter(PrayerGroup.id == group_id).with_for_update()
+        )
+        group = result.scalars().first()
+        membership = await get_membership(db, group_id, current_user.id) if group else None
+
+        if not membership:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Group not found")
+
+        if membership.role == GroupRole.OWNER:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail="The owner cannot leave the group; delete it instead"
+            )
+
+        await db.delete(membership)
+        group.member_count = max(group.member_count - 1, 0)
+        await db.flush()
+        await refresh_today_progress(db, group_id)
+        await db.commit()
+
+        return MessageResponse(message="Left group successfully")
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error leaving group: {str(e)}")
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to leave group")
+
+
+# ============================================================================
+# DELETE GROUP (ASYNC)
+# ============================================================================
+@router.delete("/{group_id}", response_model=MessageResponse)
+async def delete_group(
+    group_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a circle (owner only)."""
+    try:
+        result = await db.execute(
+            select(PrayerGroup).filter(
+                and_(PrayerGroup.id == group_id, PrayerGroup.owner_id == current_user.id)
+            )
+        )
+        group = result.scalars().first()
+
+        if not group:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Group not found")
+
+        await db.delete(group)
+        await db.commit()
+
+        logger.info(f"Group deleted: {group_id} by user {current_user.id}")
+        return MessageResponse(message="Group deleted successfully")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error deleting group: {str(e)}")
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete group")
+
+
+# ============================================================================
+# GROUP MEMBERS (KEYSET PAGINATED)
+# ============================================================================
+@router.get("/{group_id}/members", response_model=GroupMembersResponse)
+async def get_group_members(
+    group_id: int,
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(MEMBERS_PAGE_SIZE, ge=1, le=MEMBERS_MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List members of a circle, ordered by user id."""
+    try:
+        await require_membership(db, group_id, current_user.id)
+
+        query = (
+            select(User.id, User.full_name, User.email, GroupMember.role, GroupMember.joined_at)
+            .join(GroupMember, GroupMember.user_id == User.id)
+            .filter(GroupMember.group_id == group_id)
+        )
+        if cursor is not None:
+            query = query.filter(User.id > cursor)
+        query = query.order_by(User.id).limit(limit + 1)
+
+        rows = (await db.execute(query)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return GroupMembersResponse(
+            members=[
+                {
+                    "user_id": row.id,
+                    "name": row.full_name or row.email.split('@')[0],
+                    "role": row.role.value,
+                    "joined_at": row.joined_at,
+                }
+                for row in rows
+            ],
+            next_cursor=rows[-1].id if has_more else None
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting members of group {group_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get group members"
+        )
+
+
+# ============================================================================
+# GROUP DASHBOARD (PRE-AGGREGATED)
+# ============================================================================
+@router.get("/{group_id}/dashboard", response_model=GroupDashboardResponse)
+async def get_group_dashboard(
+    group_id: int,
+    start_date: str = Query(..., description="YYYY-MM-DD"),
+    days: int = Query(7, ge=1, le=DASHBOARD_MAX_DAYS),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Per-day completion of a circle.
+    Reads one pre-aggregated row per day (prayer_group_daily_progress),
+    independent of the number of members.
+    """
+    try:
+        try:
+            start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        except ValueError:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Invalid date format. Use YYYY-MM-DD")
+        end = start + timedelta(days=days - 1)
+
+        await require_membership(db, group_id, current_user.id)
+
+        group = (await db.execute(
+            select(PrayerGroup).filter(PrayerGroup.id == group_id)
+        )).scalars().first()
+
+        result = await db.execute(
+            select(GroupDailyProgress).filter(
+                and_(
+                    GroupDailyProgress.group_id == group_id,
+                    GroupDailyProgress.prayer_date >= start.strftime("%Y-%m-%d"),
+                    GroupDailyProgress.prayer_date <= end.strftime("%Y-%m-%d")
+                )
+            )
+        )
+        progress = {row.prayer_date: row for row in result.scalars().all()}
+
+        possible = max(group.member_count, 1) * 5
+        today_str = datetime.utcnow().strftime("%Y-%m-%d")
+        day_list = []
+        current_date = start
+        for _ in range(days):
+            date_str = current_date.strftime("%Y-%m-%d")
+            row = progress.get(date_str)
+            completed = row.completed_prayers if row else 0
+            day_list.append({
+                "date": date_str,
+                "completed_prayers": completed,
+                "completion_percentage": round(min(completed / possible, 1.0) * 100, 1),
+                "members_completed_all": row.members_completed_all if row else 0,
+                "is_today": date_str == today_str,
+            })
+            current_date += timedelta(days=1)
+
+        return GroupDashboardResponse(
+            group_id=group.id,
+            name=group.name,
+            member_count=group.member_count,
+            start_date=start.strftime("%Y-%m-%d"),
+            end_date=end.strftime("%Y-%m-%d"),
+            days=day_list
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting dashboard for group {group_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get group dashboard"
+        )
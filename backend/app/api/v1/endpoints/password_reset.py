@@ -10,7 +10,7 @@ import logging
 
 from app.core.database import get_db
 from app.core.redis import redis_client
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async, verify_password_async
 from app.core.rate_limiter import rate_limit
 from app.models.user import User
 from app.schemas.password_reset import (
@@ -20,6 +20,7 @@ from app.schemas.password_reset import (
     MessageResponse
 )
 from app.services.email_service import send_password_reset_email
+from app.services.user_cache import invalidate_user_snapshot
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -73,7 +74,7 @@ async def request_password_reset(
         
         # Store token in Redis with expiration
         redis_key = f"password_reset:{user.id}"
-        redis_client.setex(
+        await redis_client.setex(
             redis_key,
             RESET_TOKEN_EXPIRE_MINUTES * 60,
             reset_token
@@ -134,7 +135,7 @@ async def verify_reset_token(
         
         # Check token in Redis
         redis_key = f"password_reset:{user.id}"
-        stored_token = redis_client.get(redis_key)
+        stored_token = await redis_client.get(redis_key)
         
         if not stored_token or stored_token != verify_data.token:
             logger.warning(f"Invalid reset token attempt for user: {email}")
@@ -187,7 +188,7 @@ async def reset_password(
         
         # Verify token
         redis_key = f"password_reset:{user.id}"
-        stored_token = redis_client.get(redis_key)
+        stored_token = await redis_client.get(redis_key)
         
         if not stored_token or stored_token != reset_data.token:
             logger.warning(f"Invalid reset token for password change: {email}")
@@ -197,22 +198,22 @@ async def reset_password(
             )
         
         # Check if new password is same as old (optional security measure)
-        from app.core.security import verify_password
-        if verify_password(reset_data.new_password, user.hashed_password):
+        if await verify_password_async(reset_data.new_password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="New password must be different from current password"
             )
         
         # Update password
-        user.hashed_password = get_password_hash(reset_data.new_password)
+        user.hashed_password = await get_password_hash_async(reset_data.new_password)
         user.updated_at = datetime.utcnow()
         
         db.add(user)
         await db.commit()
+        await invalidate_user_snapshot(user.id)
         
         # Delete token from Redis
-        redis_client.delete(redis_key)
+        await redis_client.delete(redis_key)
         
         logger.info(f"Password reset completed for user: {email}")
         
@@ -255,7 +256,7 @@ async def cancel_password_reset(
         
         if user:
             redis_key = f"password_reset:{user.id}"
-            redis_client.delete(redis_key)
+            await redis_client.delete(redis_key)
             logger.info(f"Password reset cancelled for: {email}")
         
         return MessageResponse(message="Password reset request cancelled")
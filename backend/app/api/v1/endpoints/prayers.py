@@ -1,32 +1,54 @@
 # ============================================================================
 # FILE: backend/app/api/v1/endpoints/prayers.py (ASYNC + SAFE BACKGROUND TASKS)
 # ============================================================================
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy import func, and_, or_, text, desc
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator
 import logging
 import json
+import csv
+import io
+import zlib
 
 from app.core.database import get_db, AsyncSessionLocal
 from app.api.deps import get_current_user
 from app.models.user import User
-from app.models.prayer import PrayerLog, PrayerStreak
-from app.models.friendship import Friendship, FriendshipStatus
+from app.models.prayer import PrayerLog, PrayerLogTombstone, PrayerStreak, lock_user_log_changes
 from app.services.push_notification_service import push_service, get_translation
 from app.core.rate_limiter import rate_limit
+from app.core.job_queue import enqueue_job
+from app.services.streak_cache import invalidate_streak_cache
+from app.core.realtime import publish_friend_event
+from app.services.friend_graph import get_friend_ids
+from app.services.push_devices import get_push_tokens
+from app.services.prayer_groups import record_prayer_change, schedule_group_notifications
+from app.services.history_import import (
+    import_prayer_history,
+    open_import_lines,
+    ImportValidationError,
+)
+from app.services.notification_digest import (
+    claim_milestone,
+    release_milestone,
+    is_digest_available,
+    add_to_digest,
+)
 from app.schemas.prayer import (
     PrayerLogCreate,
     PrayerLogResponse,
     DayPrayerStatus,
     WeekPrayerStatus,
     PrayerStatsResponse,
+    PrayerChangesResponse,
+    PrayerImportResponse,
     MessageResponse,
 )
-from app.schemas.prayer import StreakResponse
+from app.schemas.prayer import StreakResponse, StreakRun, StreakHistoryResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -76,10 +98,11 @@ async def calculate_prayer_streak_optimized(user_id: int, db: AsyncSession) -> i
 # 2. BACKGROUND TASKS (FIXED: SELF-CONTAINED SESSIONS)
 # ============================================================================
 
-async def update_user_streak(user_id: int, db: AsyncSession):
+async def update_user_streak(user_id: int, db: AsyncSession) -> Optional[int]:
     """
     Update streak record using PESSIMISTIC LOCKING to prevent race conditions.
     This runs within the request's transaction scope.
+    Returns the freshly calculated streak (None if the update failed).
     """
     try:
         # Calculate streak first (read-only)
@@ -105,9 +128,11 @@ async def update_user_streak(user_id: int, db: AsyncSession):
             streak_record.last_prayer_date = datetime.utcnow().strftime("%Y-%m-%d")
             
         logger.info(f"✅ Streak updated for user {user_id}: {current_streak}")
+        return current_streak
         
     except Exception as e:
         logger.error(f"Error updating streak: {e}", exc_info=True)
+        return None
 
 
 async def check_and_notify_prayer_milestone(
@@ -116,8 +141,10 @@ async def check_and_notify_prayer_milestone(
     prayer_date: str
 ):
     """
-    Background task to notify friends (✅ WITH i18n).
+    Background job to notify friends (✅ WITH i18n).
+    Raises on failure so the job worker can retry it.
     """
+    claimed = False
     async with AsyncSessionLocal() as db:  # Independent session
         try:
             # 1. NEW CHECK: Prevent notifications for past dates
@@ -143,38 +170,46 @@ async def check_and_notify_prayer_milestone(
             if completed_count not in [3, 5]:
                 return
             
-            # 3. Fetch Friends
-            query = select(Friendship).options(
-                selectinload(Friendship.user),
-                selectinload(Friendship.friend)
-            ).filter(
-                and_(
-                    or_(Friendship.user_id == user_id, Friendship.friend_id == user_id),
-                    Friendship.status == FriendshipStatus.ACCEPTED
-                )
-            )
-            result = await db.execute(query)
-            friendships = result.scalars().all()
+            # Determine notification key
+            notif_key = 'friend_prayer_5' if completed_count == 5 else 'friend_prayer_3'
             
-            if not friendships:
+            # Dedup: toggling prayers or quick re-logs must not re-notify friends
+            if not await claim_milestone(user_id, notif_key, prayer_date):
+                logger.info(f"🔕 Skipping duplicate {notif_key} for user {user_id} on {prayer_date}")
                 return
+            claimed = True
+            
+            # 3. Fetch Friends (ids from the Redis friend set, then one IN query)
+            friend_ids = await get_friend_ids(db, user_id)
+            if not friend_ids:
+                return
+            
+            result = await db.execute(select(User).filter(User.id.in_(friend_ids)))
+            friend_users = result.scalars().all()
+            device_tokens = await get_push_tokens(db, friend_ids)
             
             # 4. Prepare Notifications (✅ WITH i18n)
             notifications = []
-            
-            # Determine notification key
-            notif_key = 'friend_prayer_5' if completed_count == 5 else 'friend_prayer_3'
+            use_digest = is_digest_available()
+            digest_event = {
+                'actor_id': user_id,
+                'actor_name': user_name or 'Your friend',
+                'completed_count': completed_count,
+            }
 
-            for friendship in friendships:
-                friend_user = friendship.friend if friendship.user_id == user_id else friendship.user
-                
-                if not friend_user.push_token:
+            for friend_user in friend_users:
+                tokens = device_tokens.get(friend_user.id)
+                if not tokens:
                     continue
                     
                 prefs = friend_user.notification_preferences or {}
                 if not prefs.get('friend_prayers', True):
                     continue
                 
+                # Buffer into the recipient's digest window when possible
+                if use_digest and await add_to_digest(friend_user.id, digest_event):
+                    continue
+                
                 # ✅ Get friend's language
                 lang = friend_user.preferred_language or 'en'
                 
@@ -185,8 +220,8 @@ async def check_and_notify_prayer_milestone(
                     name=user_name or 'Your friend'
                 )
                 
-                notifications.append({
-                    'push_token': friend_user.push_token,
+                notifications.extend({
+                    'push_token': token,
                     'title': content['title'],
                     'body': content['body'],
                     'data': {
@@ -194,7 +229,7 @@ async def check_and_notify_prayer_milestone(
                         'friend_id': user_id,
                         'completed_count': completed_count
                     },
-                })
+                } for token in tokens)
             
             # 5. Send (Sync but safe)
             if notifications:
@@ -203,24 +238,91 @@ async def check_and_notify_prayer_milestone(
 
         except Exception as e:
             logger.error(f"Notification task error: {e}", exc_info=True)
+            if claimed:
+                # Let the retried job claim the milestone again
+                await release_milestone(user_id, notif_key, prayer_date)
+            raise
 
-async def check_streak_and_notify(user_id: int, user_name: str):
+async def check_streak_and_notify(user_id: int, user_name: str, current_streak: Optional[int] = None):
     """
-    Background task to check streak milestones.
+    Background job to check streak milestones.
+    `current_streak` is the value already computed by update_user_streak in the
+    request; the streak CTE only runs again when it is missing.
     """
     async with AsyncSessionLocal() as db:  # ✅ Independent session
+        claimed = False
         try:
-            current_streak = await calculate_prayer_streak_optimized(user_id, db)
+            if current_streak is None:
+                current_streak = await calculate_prayer_streak_optimized(user_id, db)
             
             # ✅ Import and call the streak notification service
             from app.services.streak_service import notify_streak_milestone
             
             if current_streak in [7, 30, 100, 365]:
+                # Dedup: re-logging a prayer recomputes the same streak
+                milestone_key = f"friend_streak_{current_streak}"
+                today_str = datetime.utcnow().strftime("%Y-%m-%d")
+                if not await claim_milestone(user_id, milestone_key, today_str):
+                    return
+                claimed = True
+                
                 logger.info(f"🔥 Streak milestone reached: {current_streak} days for user {user_id}")
                 await notify_streak_milestone(user_id, user_name, current_streak, db)
 
         except Exception as e:
             logger.error(f"Streak notify error: {e}", exc_info=True)
+            if claimed:
+                # Let the retried job claim the milestone again
+                await release_milestone(user_id, milestone_key, today_str)
+            raise
+
+
+async def schedule_prayer_notifications(
+    background_tasks: BackgroundTasks,
+    user: User,
+    prayer_date: str,
+    current_streak: Optional[int]
+):
+    """
+    Hand friend notifications off to the durable job queue.
+    Falls back to in-process BackgroundTasks when the queue is unavailable.
+    """
+    if not await enqueue_job(
+        "prayer_milestone",
+        user_id=user.id,
+        user_name=user.full_name,
+        prayer_date=prayer_date
+    ):
+        background_tasks.add_task(
+            check_and_notify_prayer_milestone,
+            user.id,
+            user.full_name,
+            prayer_date
+        )
+
+    if not await enqueue_job(
+        "streak_milestone",
+        user_id=user.id,
+        user_name=user.full_name,
+        current_streak=current_streak
+    ):
+        background_tasks.add_task(
+            check_streak_and_notify,
+            user.id,
+            user.full_name,
+            current_streak
+        )
+
+
+def friend_prayer_event(prayer_data: PrayerLogCreate, current_streak: Optional[int]) -> Dict[str, Any]:
+    """Real-time event pushed to friends' /friends/stream connections."""
+    return {
+        "type": "friend_prayer",
+        "prayer_name": prayer_data.prayer_name,
+        "prayer_date": prayer_data.prayer_date,
+        "completed": prayer_data.completed,
+        "current_streak": current_streak,
+    }
 
 
 # ============================================================================
@@ -251,6 +353,9 @@ async def track_prayer(
         if prayer_date > today:
             raise HTTPException(status.HTTP_400_BAD_REQUEST, "Cannot track future prayers")
         
+        # Before any change_seq is drawn (delta-sync commit order)
+        await lock_user_log_changes(db, current_user.id)
+        
         # Check / Update / Create Log
         query = select(PrayerLog).filter(
             and_(
@@ -263,34 +368,42 @@ async def track_prayer(
         existing_log = result.scalars().first()
         
         if existing_log:
+            was_completed = existing_log.completed
             existing_log.completed = prayer_data.completed
             existing_log.on_time = prayer_data.on_time
             existing_log.prayer_time = prayer_data.prayer_time
             existing_log.completed_at = datetime.utcnow() if prayer_data.completed else None
+            existing_log.touch()
             
             # Flush changes so streak calculation sees the update
             await db.flush()
             
+            # 1. Update Streak IMMEDIATELY (in current transaction). Un-completing
+            # a prayer can break the streak too, and friends read this row.
+            current_streak = await update_user_streak(current_user.id, db)
+            group_milestones = await record_prayer_change(
+                db, current_user.id, prayer_data.prayer_date,
+                was_completed, existing_log.completed
+            )
+            
+            await db.commit()
+            await invalidate_streak_cache(current_user.id)
+            await publish_friend_event(
+                db, current_user.id, friend_prayer_event(prayer_data, current_streak)
+            )
+            await schedule_group_notifications(background_tasks, group_milestones, prayer_data.prayer_date)
+            
             if existing_log.completed:
-                # 1. Update Streak IMMEDIATELY (in current transaction)
-                await update_user_streak(current_user.id, db)
-                
-                # 2. Send Notifications in BACKGROUND
+                # 2. Send Notifications via the job queue (only after commit,
+                # so workers never observe uncommitted logs)
                 # ✅ Pass only simple data, NOT the db session
-                background_tasks.add_task(
-                    check_and_notify_prayer_milestone,
-                    current_user.id,
-                    current_user.full_name,
-                    prayer_data.prayer_date
-                )
-                
-                background_tasks.add_task(
-                    check_streak_and_notify,
-                    current_user.id,
-                    current_user.full_name
+                await schedule_prayer_notifications(
+                    background_tasks,
+                    current_user,
+                    prayer_data.prayer_date,
+                    current_streak
                 )
             
-            await db.commit()
             await db.refresh(existing_log)
             return existing_log
         
@@ -307,23 +420,29 @@ async def track_prayer(
         db.add(prayer_log)
         await db.flush()
         
+        current_streak = None
         if prayer_log.completed:
-            await update_user_streak(current_user.id, db)
-            
-            background_tasks.add_task(
-                check_and_notify_prayer_milestone,
-                current_user.id,
-                current_user.full_name,
-                prayer_data.prayer_date
-            )
-            
-            background_tasks.add_task(
-                check_streak_and_notify,
-                current_user.id,
-                current_user.full_name
-            )
+            current_streak = await update_user_streak(current_user.id, db)
+        group_milestones = await record_prayer_change(
+            db, current_user.id, prayer_data.prayer_date, False, prayer_log.completed
+        )
         
         await db.commit()
+        if prayer_log.completed:
+            await invalidate_streak_cache(current_user.id)
+        await publish_friend_event(
+            db, current_user.id, friend_prayer_event(prayer_data, current_streak)
+        )
+        await schedule_group_notifications(background_tasks, group_milestones, prayer_data.prayer_date)
+        
+        if prayer_log.completed:
+            await schedule_prayer_notifications(
+                background_tasks,
+                current_user,
+                prayer_data.prayer_date,
+                current_streak
+            )
+
         await db.refresh(prayer_log)
         return prayer_log
         
@@ -412,7 +531,7 @@ async def get_week_prayers(
     dependencies=[Depends(rate_limit(60, 60, by_user=True))]
 )
 async def get_period_stats(
-    period: str = Query("month", regex="^(week|month|year)$"),
+    period: str = Query("month", pattern="^(week|month|year)$"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -548,8 +667,22 @@ async def delete_prayer_log(
         if not log:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Log not found")
             
+        # Tombstone lets delta-sync clients drop the log locally
+        await lock_user_log_changes(db, current_user.id)
+        db.add(PrayerLogTombstone(
+            user_id=log.user_id,
+            log_id=log.id,
+            prayer_name=log.prayer_name,
+            prayer_date=log.prayer_date
+        ))
+        was_completed = log.completed
+        prayer_date = log.prayer_date
         await db.delete(log)
+        await db.flush()
+        await update_user_streak(current_user.id, db)
+        await record_prayer_change(db, current_user.id, prayer_date, was_completed, False)
         await db.commit()
+        await invalidate_streak_cache(current_user.id)
         return MessageResponse(message="Deleted successfully")
     except HTTPException:
         raise
@@ -559,6 +692,206 @@ async def delete_prayer_log(
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Failed to delete")
     
 
+# ============================================================================
+# DELTA SYNC (changes since cursor)
+# ============================================================================
+CHANGES_PAGE_SIZE = 500
+CHANGES_MAX_PAGE_SIZE = 2000
+
+
+@router.get(
+    "/changes",
+    response_model=PrayerChangesResponse,
+    summary="Get prayer log changes since a cursor",
+    dependencies=[Depends(rate_limit(120, 60, by_user=True))]
+)
+async def get_prayer_changes(
+    since: int = Query(0, ge=0, description="Cursor from the previous sync (0 = full history)"),
+    limit: int = Query(CHANGES_PAGE_SIZE, ge=1, le=CHANGES_MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Return prayer logs written and deleted after `since`, ordered by change_seq.
+    Both lookups are index range scans on (user_id, change_seq), so cost is
+    proportional to the number of changes, not to the history size.
+    """
+    try:
+        # Both queries must see the same commits: a log committed between
+        # them would otherwise fall below a tombstone's cursor. End the auth
+        # transaction and read in one REPEATABLE READ snapshot.
+        user_id = current_user.id
+        await db.commit()
+        await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        
+        # Fetch limit + 1 from each source: the first `limit` rows of the
+        # merged stream are always within those, and the extra row tells us
+        # whether another page exists.
+        logs_result = await db.execute(
+            select(PrayerLog).filter(
+                and_(PrayerLog.user_id == user_id, PrayerLog.change_seq > since)
+            ).order_by(PrayerLog.change_seq).limit(limit + 1)
+        )
+        tombstones_result = await db.execute(
+            select(PrayerLogTombstone).filter(
+                and_(PrayerLogTombstone.user_id == user_id, PrayerLogTombstone.change_seq > since)
+            ).order_by(PrayerLogTombstone.change_seq).limit(limit + 1)
+        )
+
+        merged = sorted(
+            list(logs_result.scalars().all()) + list(tombstones_result.scalars().all()),
+            key=lambda row: row.change_seq
+        )
+        has_more = len(merged) > limit
+        page = merged[:limit]
+
+        return PrayerChangesResponse(
+            upserts=[row for row in page if isinstance(row, PrayerLog)],
+            deletes=[row for row in page if isinstance(row, PrayerLogTombstone)],
+            cursor=page[-1].change_seq if page else since,
+            has_more=has_more
+        )
+    except Exception as e:
+        logger.error(f"Error getting prayer changes: {e}", exc_info=True)
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Failed to get changes")
+
+
+# ============================================================================
+# STREAMING HISTORY EXPORT (NDJSON / CSV)
+# ============================================================================
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = [
+    "prayer_date", "prayer_name", "prayer_time", "completed", "on_time",
+    "completed_at", "created_at", "updated_at",
+]
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def _stream_prayer_export(user_id: int, fmt: str, compress: bool) -> AsyncIterator[bytes]:
+    """
+    Yield the user's prayer history batch by batch from a server-side cursor.
+    Plain column rows (no ORM identities) keep memory flat regardless of history size.
+    """
+    gzip_stream = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+
+    def emit(text_chunk: str) -> bytes:
+        data = text_chunk.encode("utf-8")
+        return gzip_stream.compress(data) if gzip_stream else data
+
+    # Own session: the request-scoped one may be closed before streaming ends
+    async with AsyncSessionLocal() as db:
+        query = select(
+            *[getattr(PrayerLog, column) for column in EXPORT_COLUMNS]
+        ).filter(
+            PrayerLog.user_id == user_id
+        ).order_by(
+            PrayerLog.prayer_date, PrayerLog.id
+        ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+        result = await db.stream(query)
+
+        if fmt == "csv":
+            header = io.StringIO()
+            csv.writer(header).writerow(EXPORT_COLUMNS)
+            yield emit(header.getvalue())
+
+        async for batch in result.partitions(EXPORT_BATCH_SIZE):
+            buffer = io.StringIO()
+            if fmt == "csv":
+                writer = csv.writer(buffer)
+                for row in batch:
+                    writer.writerow([_export_value(value) for value in row])
+            else:
+                for row in batch:
+                    buffer.write(json.dumps(
+                        {column: _export_value(value) for column, value in zip(EXPORT_COLUMNS, row)}
+                    ))
+                    buffer.write("\n")
+
+            chunk = emit(buffer.getvalue())
+            if chunk:
+                yield chunk
+
+    if gzip_stream:
+        yield gzip_stream.flush()
+
+
+@router.get(
+    "/export",
+    summary="Export full prayer history (streamed)",
+    dependencies=[Depends(rate_limit(5, 3600, by_user=True))]
+)
+async def export_prayer_history(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = Query(False, description="Compress the download on the fly"),
+    user_id: Optional[int] = Query(None, description="Admin/support only: export another user's history"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream the complete prayer history as NDJSON or CSV.
+    Rows are read through a server-side cursor and written in batches, so
+    memory use stays constant however many years of history exist.
+    """
+    target_user_id = current_user.id
+    if user_id is not None and user_id != current_user.id:
+        if not current_user.is_admin:
+            raise HTTPException(status.HTTP_403_FORBIDDEN, "Admin privileges required")
+        target_user_id = user_id
+        logger.info(f"Admin {current_user.id} exporting prayer history of user {user_id}")
+
+    filename = f"prayer-history-{target_user_id}.{format}"
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        _stream_prayer_export(target_user_id, format, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+# ============================================================================
+# BULK HISTORY IMPORT (COPY + set-based merge)
+# ============================================================================
+@router.post(
+    "/import",
+    response_model=PrayerImportResponse,
+    summary="Import prayer history from CSV/NDJSON",
+    dependencies=[Depends(rate_limit(5, 3600, by_user=True))]
+)
+async def import_prayer_history_file(
+    file: UploadFile = File(..., description="CSV or NDJSON (optionally .gz), same columns as /export"),
+    format: str = Query("csv", pattern="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Import years of history in one go (e.g. when migrating from another app).
+    Rows are validated while streaming, COPYed into a staging table and merged
+    into prayer_logs with a single upsert; streaks are recomputed once.
+    Imported prayers never trigger friend notifications.
+    """
+    try:
+        lines = open_import_lines(file.file, file.filename)
+        result = await import_prayer_history(current_user.id, lines, format, db)
+        return PrayerImportResponse(**result)
+    except ImportValidationError as e:
+        await db.rollback()
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+    except UnicodeDecodeError:
+        await db.rollback()
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "File must be UTF-8 encoded")
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error importing prayer history: {e}", exc_info=True)
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Failed to import history")
+
+
 # ============================================================================
 # NEW: GET CURRENT USER STREAK (Real-time)
 # ============================================================================
@@ -600,6 +933,7 @@ async def get_current_streak(
             )
             db.add(streak_record)
             await db.commit()
+            await invalidate_streak_cache(current_user.id)
             await db.refresh(streak_record)
         else:
             # Update if calculation differs from stored value
@@ -614,6 +948,7 @@ async def get_current_streak(
                 
                 db.add(streak_record)
                 await db.commit()
+                await invalidate_streak_cache(current_user.id)
                 await db.refresh(streak_record)
         
         return StreakResponse(
@@ -634,95 +969,134 @@ async def get_current_streak(
 # ============================================================================
 # NEW: GET STREAK HISTORY (for calendar visualization)
 # ============================================================================
+STREAK_HISTORY_PAGE_SIZE = 50
+STREAK_HISTORY_MAX_PAGE_SIZE = 200
+
+# Gaps-and-islands: consecutive perfect days share the same (day - row_number),
+# so grouping by that difference yields one row per streak run.
+STREAK_ISLANDS_SQL = """
+WITH perfect_days AS (
+    SELECT prayer_date::DATE AS day
+    FROM prayer_logs
+    WHERE user_id = :user_id
+      AND completed = true
+      AND prayer_date >= :start_date
+      AND prayer_date <= :end_date
+    GROUP BY prayer_date
+    HAVING COUNT(*) = 5
+),
+islands AS (
+    SELECT
+        day,
+        day - (ROW_NUMBER() OVER (ORDER BY day))::INT AS grp
+    FROM perfect_days
+),
+runs AS (
+    SELECT MIN(day) AS start_day, MAX(day) AS end_day, COUNT(*) AS length
+    FROM islands
+    GROUP BY grp
+),
+totals AS (
+    SELECT COUNT(*) AS total_streaks, COALESCE(SUM(length), 0)::INT AS total_perfect_days
+    FROM runs
+)
+SELECT t.total_streaks, t.total_perfect_days, page.start_day, page.end_day, page.length
+FROM totals t
+LEFT JOIN LATERAL (
+    SELECT start_day, end_day, length
+    FROM runs
+    {cursor_filter}
+    ORDER BY start_day
+    LIMIT :page_limit
+) page ON true
+ORDER BY page.start_day
+"""
+
+
 @router.get(
     "/streak/history",
+    response_model=StreakHistoryResponse,
     summary="Get streak history for date range",
     dependencies=[Depends(rate_limit(60, 60, by_user=True))]
 )
 async def get_streak_history(
     start_date: str = Query(..., description="YYYY-MM-DD"),
     end_date: str = Query(..., description="YYYY-MM-DD"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(STREAK_HISTORY_PAGE_SIZE, ge=1, le=STREAK_HISTORY_MAX_PAGE_SIZE),
+    include_dates: bool = Query(False, description="Expand every day inside each streak"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get detailed streak information for a date range.
-    Shows which days contributed to streaks.
+    Get streak runs (start, end, length) for a date range.
+    Runs are computed in SQL and paginated by start date, so payload size
+    is bounded by `limit` regardless of how long the range is.
     """
     try:
-        # Query all days with 5 completed prayers in range
-        query = select(
-            PrayerLog.prayer_date,
-            func.count(PrayerLog.id).label('completed_count')
-        ).filter(
-            and_(
-                PrayerLog.user_id == current_user.id,
-                PrayerLog.prayer_date >= start_date,
-                PrayerLog.prayer_date <= end_date,
-                PrayerLog.completed == True
-            )
-        ).group_by(
-            PrayerLog.prayer_date
-        ).having(
-            func.count(PrayerLog.id) == 5  # All 5 prayers completed
-        ).order_by(
-            PrayerLog.prayer_date
-        )
-        
-        result = await db.execute(query)
-        perfect_days = [row.prayer_date for row in result.all()]
-        
-        # Calculate streaks within this range
-        streaks = []
-        current_streak_days = []
-        
-        for i, date_str in enumerate(perfect_days):
-            current_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-            
-            if i == 0:
-                # First day starts a streak
-                current_streak_days.append(date_str)
-            else:
-                # Check if consecutive
-                prev_date = datetime.strptime(perfect_days[i-1], "%Y-%m-%d").date()
-                diff = (current_date - prev_date).days
-                
-                if diff == 1:
-                    # Continues streak
-                    current_streak_days.append(date_str)
-                else:
-                    # Streak broken, save previous streak
-                    if current_streak_days:
-                        streaks.append({
-                            "start_date": current_streak_days[0],
-                            "end_date": current_streak_days[-1],
-                            "length": len(current_streak_days),
-                            "dates": current_streak_days
-                        })
-                    # Start new streak
-                    current_streak_days = [date_str]
-        
-        # Don't forget the last streak
-        if current_streak_days:
-            streaks.append({
-                "start_date": current_streak_days[0],
-                "end_date": current_streak_days[-1],
-                "length": len(current_streak_days),
-                "dates": current_streak_days
-            })
-        
-        return {
+        try:
+            datetime.strptime(start_date, "%Y-%m-%d")
+            datetime.strptime(end_date, "%Y-%m-%d")
+            cursor_day = datetime.strptime(cursor, "%Y-%m-%d").date() if cursor else None
+        except ValueError:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Dates must be in YYYY-MM-DD format")
+
+        params = {
+            "user_id": current_user.id,
             "start_date": start_date,
             "end_date": end_date,
-            "perfect_days": perfect_days,
-            "streaks": streaks,
-            "total_perfect_days": len(perfect_days)
+            # Fetch one extra row to know whether another page exists
+            "page_limit": limit + 1,
         }
-        
+        cursor_filter = ""
+        if cursor_day:
+            cursor_filter = "WHERE start_day > :cursor"
+            params["cursor"] = cursor_day
+
+        result = await db.execute(
+            text(STREAK_ISLANDS_SQL.format(cursor_filter=cursor_filter)),
+            params
+        )
+        rows = result.all()
+
+        total_streaks = rows[0].total_streaks if rows else 0
+        total_perfect_days = rows[0].total_perfect_days if rows else 0
+        runs = [row for row in rows if row.start_day is not None]
+
+        next_cursor = None
+        if len(runs) > limit:
+            runs = runs[:limit]
+            next_cursor = runs[-1].start_day.isoformat()
+
+        streaks = []
+        for run in runs:
+            dates = None
+            if include_dates:
+                dates = [
+                    (run.start_day + timedelta(days=offset)).isoformat()
+                    for offset in range(run.length)
+                ]
+            streaks.append(StreakRun(
+                start_date=run.start_day.isoformat(),
+                end_date=run.end_day.isoformat(),
+                length=run.length,
+                dates=dates
+            ))
+
+        return StreakHistoryResponse(
+            start_date=start_date,
+            end_date=end_date,
+            streaks=streaks,
+            total_streaks=total_streaks,
+            total_perfect_days=total_perfect_days,
+            next_cursor=next_cursor
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting streak history: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to get streak history"
         )
-
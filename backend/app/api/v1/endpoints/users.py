@@ -4,13 +4,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession  
 from sqlalchemy.future import select             
-from typing import List
+from typing import List, Optional
 import logging
 
 from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash
+from app.core.security import verify_password_async, get_password_hash_async
 from app.api.deps import get_current_user
 from app.models.user import User
+from app.models.group import PrayerGroup, GroupMember
 from app.schemas.user import (
     UserResponse,
     UserUpdate,
@@ -18,6 +19,10 @@ from app.schemas.user import (
     MessageResponse
 )
 from app.services.push_notification_service import push_service
+from app.services.friend_graph import get_friend_ids, remove_friend_edge
+from app.services.prayer_groups import refresh_today_progress
+from app.services.push_devices import register_device, unregister_device
+from app.services.user_cache import invalidate_user_snapshot
 from app.core.rate_limiter import rate_limit
 
 router = APIRouter()
@@ -77,6 +82,7 @@ async def update_user_profile(
             # Need to merge/add to session to ensure it's tracked for async commit
             db.add(current_user)
             await db.commit()  # ✅ Async Commit
+            await invalidate_user_snapshot(current_user.id)
             await db.refresh(current_user)  # ✅ Async Refresh
             logger.info(f"User profile updated: {current_user.email}")
         
@@ -101,17 +107,20 @@ async def update_user_profile(
 )
 async def save_push_token(
     push_token: str,
+    platform: Optional[str] = Query(None, pattern="^(ios|android|web)$"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Save user's Expo push token."""
+    """Register (or refresh) the Expo push token of one of the user's devices."""
     try:
         if not push_token.startswith('ExponentPushToken['):
             raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Invalid push token format")
         
+        await register_device(db, current_user.id, push_token, platform)
         current_user.push_token = push_token
         db.add(current_user)
         await db.commit()
+        await invalidate_user_snapshot(current_user.id)
         
         logger.info(f"✅ Push token saved for user {current_user.id}")
         return {"message": "Push token saved successfully"}
@@ -124,6 +133,33 @@ async def save_push_token(
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to save push token")
 
 
+@router.delete(
+    "/me/push-token",
+    summary="Remove push token",
+    dependencies=[Depends(rate_limit(5, 60, by_user=True))]
+)
+async def delete_push_token(
+    push_token: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stop sending pushes to one device (e.g. on logout)."""
+    try:
+        await unregister_device(db, current_user.id, push_token)
+        if current_user.push_token == push_token:
+            current_user.push_token = None
+            db.add(current_user)
+        await db.commit()
+        await invalidate_user_snapshot(current_user.id)
+        
+        return {"message": "Push token removed successfully"}
+        
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error removing push token: {e}")
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to remove push token")
+
+
 # ============================================================================
 # CHANGE PASSWORD (ASYNC)
 # ============================================================================
@@ -140,23 +176,27 @@ async def change_password(
 ):
     """Change user's password."""
     try:
+        # The cached user snapshot never carries the hash: load it explicitly
+        await db.refresh(current_user, ["hashed_password"])
+        
         # Verify current password
-        if not verify_password(password_change.current_password, current_user.hashed_password):
+        if not await verify_password_async(password_change.current_password, current_user.hashed_password):
             logger.warning(f"Failed password change attempt: {current_user.email}")
             raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Current password is incorrect")
         
         # Check new password
-        if verify_password(password_change.new_password, current_user.hashed_password):
+        if await verify_password_async(password_change.new_password, current_user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="New password must be different from current password"
             )
         
         # Update password
-        current_user.hashed_password = get_password_hash(password_change.new_password)
+        current_user.hashed_password = await get_password_hash_async(password_change.new_password)
         
         db.add(current_user)
         await db.commit()
+        await invalidate_user_snapshot(current_user.id)
         
         logger.info(f"Password changed successfully for user: {current_user.email}")
         return MessageResponse(message="Password changed successfully")
@@ -234,8 +274,32 @@ async def delete_account(
     """Delete user account."""
     try:
         email = current_user.email
+        user_id = current_user.id
+        friend_ids = await get_friend_ids(db, user_id)
+        
+        # Memberships go with the cascade: keep member_count in step (owned
+        # circles are deleted with the user)
+        result = await db.execute(
+            select(PrayerGroup)
+            .join(GroupMember, GroupMember.group_id == PrayerGroup.id)
+            .filter(GroupMember.user_id == user_id, PrayerGroup.owner_id != user_id)
+            .order_by(PrayerGroup.id)
+            .with_for_update(of=PrayerGroup)
+        )
+        groups = result.scalars().all()
+        for group in groups:
+            group.member_count = max(group.member_count - 1, 0)
+        
         await db.delete(current_user)  # ✅ Async Delete
+        await db.flush()
+        for group in groups:
+            await refresh_today_progress(db, group.id)
         await db.commit()
+        await invalidate_user_snapshot(user_id)
+        
+        # Friendships were removed by the cascade; drop them from friend sets
+        for friend_id in friend_ids:
+            await remove_friend_edge(user_id, friend_id)
         
         logger.warning(f"User account permanently deleted: {email}")
         return MessageResponse(message="Account deleted successfully")
@@ -266,6 +330,7 @@ async def deactivate_account(
         current_user.is_active = False
         db.add(current_user)
         await db.commit()
+        await invalidate_user_snapshot(current_user.id)
         
         logger.info(f"User account deactivated: {current_user.email}")
         return MessageResponse(message="Account deactivated successfully")
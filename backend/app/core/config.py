@@ -45,6 +45,12 @@ class Settings(BaseSettings):
     MIN_PASSWORD_LENGTH: int = 8
     MAX_PASSWORD_LENGTH: int = 72  # bcrypt limitation
     
+    # bcrypt process pool (app/core/password_hasher.py)
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2  # Processes per API worker; each hash keeps one core busy ~250ms
+    PASSWORD_HASH_QUEUE_SIZE: int = 32  # Calls allowed to wait for a process before shedding with 503
+    PASSWORD_HASH_RETRY_AFTER: int = 2  # Retry-After seconds sent with the 503
+    
     # ========================================================================
     # CORS (CRITICAL SECURITY SETTINGS)
     # ========================================================================
@@ -76,6 +82,8 @@ class Settings(BaseSettings):
     # ========================================================================
     REDIS_URL: Optional[str] = None
     REDIS_CACHE_TTL: int = 3600  # 1 hour default
+    REDIS_MAX_CONNECTIONS: int = 50  # Async connection pool size per process
+    REDIS_SOCKET_TIMEOUT: float = 2.0  # Seconds before a slow command fails (and falls back)
     
     # New Setting: Fail closed ensures security if Redis is down (tokens aren't checked)
     REDIS_FAIL_CLOSED: bool = True
@@ -83,6 +91,108 @@ class Settings(BaseSettings):
     # Token blacklist settings
     TOKEN_BLACKLIST_ENABLED: bool = True
     
+    # Verified-token cache: claims of already checked JWTs, kept until their exp
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_SIZE: int = 10000  # Tokens per process (LRU)
+    
+    # In-process Bloom filter of revoked JTIs (app/core/revocation_filter.py)
+    REVOCATION_FILTER_ENABLED: bool = True
+    REVOCATION_FILTER_CAPACITY: int = 100000  # Revoked JTIs before the false-positive rate degrades
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001  # False positives cost one Redis lookup each
+    REVOCATION_FILTER_REBUILD_INTERVAL: int = 1800  # Seconds, capped at the access token lifetime; also drops expired JTIs
+    REVOCATION_FILTER_HEALTH_CHECK_INTERVAL: int = 10  # Seconds without a message or pong before the filter is distrusted
+    
+    # ========================================================================
+    # AUTHENTICATED USER SNAPSHOTS (app/services/user_cache.py)
+    # ========================================================================
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_TTL: int = 300  # Redis snapshot lifetime, in seconds
+    USER_CACHE_LOCAL_TTL: int = 15  # In-process copy; bounds staleness after another process invalidates
+    USER_CACHE_LOCAL_SIZE: int = 10000  # Users kept in the in-process LRU
+    USER_CACHE_TOMBSTONE_TTL: int = 10  # No refill for this long after an invalidation
+    
+    # ========================================================================
+    # BACKGROUND JOB QUEUE (Redis Streams, consumed by `python -m app.worker`)
+    # ========================================================================
+    JOB_QUEUE_ENABLED: bool = True  # Falls back to in-process BackgroundTasks when off or Redis is down
+    JOB_STREAM_MAXLEN: int = 100000  # Approximate cap on retained stream entries
+    JOB_WORKER_CONCURRENCY: int = 20  # Max jobs in flight per worker process
+    JOB_WORKER_BATCH_SIZE: int = 50  # Entries read per XREADGROUP call
+    JOB_MAX_ATTEMPTS: int = 5  # Attempts before a job is dead-lettered
+    JOB_RETRY_BASE_DELAY: int = 2  # Seconds; doubled on every retry
+    JOB_CLAIM_IDLE_MS: int = 60000  # Reclaim jobs left un-acked by a crashed worker after this
+    
+    # ========================================================================
+    # EXPO PUSH (async client, app/services/expo_push_client.py)
+    # ========================================================================
+    EXPO_API_BASE_URL: str = "https://exp.host/--/api/v2/push"
+    EXPO_ACCESS_TOKEN: Optional[str] = None  # Required only if enhanced push security is on
+    EXPO_PUSH_CHUNK_SIZE: int = 100  # Expo's per-request message limit
+    EXPO_PUSH_MAX_CONCURRENCY: int = 6  # Chunks in flight (and pooled connections) per process
+    EXPO_PUSH_MAX_RETRIES: int = 3  # Retries for 429 / 5xx / network errors
+    EXPO_PUSH_RETRY_BASE_DELAY: float = 0.5  # Seconds; doubled on every retry
+    EXPO_PUSH_TIMEOUT: float = 10.0  # Seconds per HTTP request
+    PUSH_RECEIPT_DELAY: int = 900  # Expo recommends waiting ~15 minutes before fetching receipts
+    PUSH_RECEIPT_POLL_INTERVAL: int = 600  # Seconds between receipt polling jobs
+    PUSH_RECEIPT_BATCH_SIZE: int = 1000  # Tickets per getReceipts request
+    PUSH_TICKET_TTL: int = 86400  # Receipts are kept by Expo for about a day
+    PUSH_MAX_DEVICES_PER_USER: int = 10  # Older devices are deactivated beyond this
+    
+    # ========================================================================
+    # NOTIFICATION OUTBOX (relayed by the job worker)
+    # ========================================================================
+    OUTBOX_BATCH_SIZE: int = 500  # Rows claimed (FOR UPDATE SKIP LOCKED) per relay transaction
+    OUTBOX_POLL_INTERVAL: float = 1.0  # Seconds the relay sleeps when the outbox is drained
+    OUTBOX_MAX_ATTEMPTS: int = 5  # Deliveries tried before a row is dropped
+    OUTBOX_RETRY_BASE_DELAY: int = 5  # Seconds; doubled on every retry
+    
+    # ========================================================================
+    # BROADCASTS (all-user announcements, app/services/broadcast.py)
+    # ========================================================================
+    BROADCAST_PAGE_SIZE: int = 5000  # Users loaded per keyset page (and per checkpoint)
+    BROADCAST_RATE_PER_SECOND: int = 600  # Global send rate (Expo's documented per-project limit)
+    BROADCAST_SLICE_SECONDS: int = 30  # Work per job before re-enqueueing; keep below JOB_CLAIM_IDLE_MS
+    
+    # ========================================================================
+    # NOTIFICATION COALESCING
+    # ========================================================================
+    NOTIFICATION_DEDUP_TTL: int = 172800  # 2 days; one push per (actor, milestone, date)
+    NOTIFICATION_DIGEST_ENABLED: bool = True  # Merge friends' milestones into one push per recipient
+    NOTIFICATION_DIGEST_WINDOW: int = 300  # Seconds events are collected before the digest is sent
+    
+    # ========================================================================
+    # FRIEND READ CACHES
+    # ========================================================================
+    STREAK_CACHE_TTL: int = 300  # Max staleness of a cached friend streak, in seconds
+    STREAK_REPAIR_INTERVAL: int = 3600  # Rows older than this get a background recompute
+    FRIEND_GRAPH_CACHE_TTL: int = 600  # Lifetime of a Redis friend-id set before it is reloaded (gates friend data access)
+    
+    # ========================================================================
+    # REAL-TIME FRIEND STREAM (/friends/stream WebSocket)
+    # ========================================================================
+    REALTIME_ENABLED: bool = True
+    REALTIME_MAX_CONNECTIONS: int = 50000  # Per process; further connections are refused
+    REALTIME_HEARTBEAT_INTERVAL: int = 25  # Seconds between server pings
+    REALTIME_IDLE_TIMEOUT: int = 75  # Close if the client sent nothing (pong) for this long
+    REALTIME_QUEUE_SIZE: int = 32  # Buffered events per connection before a resync is forced
+    REALTIME_SEND_TIMEOUT: int = 10  # Seconds a single send may block before the client is dropped
+    
+    # ========================================================================
+    # PRAYER CIRCLES (GROUPS)
+    # ========================================================================
+    GROUP_MAX_MEMBERS: int = 1000
+    GROUP_MAX_PER_USER: int = 20  # Circles a user can belong to
+    GROUP_FANOUT_BATCH_SIZE: int = 500  # Recipients loaded and pushed per batch
+    GROUP_NOTIFY_MIN_MEMBERS: int = 3  # Smaller circles get no group milestone pushes
+    
+    # ========================================================================
+    # CONTACT DISCOVERY (POST /friends/discover)
+    # ========================================================================
+    # Clients send sha256("<salt>:<lowercased email>") for address-book entries.
+    # Changing the salt requires re-hashing users.email_hash.
+    CONTACT_DISCOVERY_SALT: str = "prayer-tracker-contacts-v1"
+    CONTACT_DISCOVERY_MAX_HASHES: int = 1000  # Per request
+    
     # ========================================================================
     # EMAIL CONFIGURATION (NEW)
     # ========================================================================
@@ -141,6 +251,13 @@ class Settings(BaseSettings):
     RATE_LIMIT_PRAYER_TIMES: int = 60  # per hour
     RATE_LIMIT_API_DEFAULT: int = 60  # per minute
     
+    # Local token leases (each process reserves part of the budget in Redis)
+    RATE_LIMIT_LEASE_ENABLED: bool = True
+    RATE_LIMIT_LEASE_FRACTION: float = 0.2  # Share of the limit leased per Redis call
+    RATE_LIMIT_LEASE_MIN_LIMIT: int = 20  # Smaller (strict) limits always ask Redis
+    RATE_LIMIT_LEASE_TTL: int = 15  # Seconds before unused leased tokens are handed back
+    RATE_LIMIT_LEASE_MAX_KEYS: int = 10000  # Leases kept per process (LRU)
+    
     # ========================================================================
     # LOGGING
     # ========================================================================
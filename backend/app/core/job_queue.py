@@ -0,0 +1,88 @@
+# ============================================================================
+# FILE: backend/app/core/job_queue.py (DURABLE JOBS ON REDIS STREAMS)
+# ============================================================================
+"""
+Durable background job queue built on Redis Streams.
+
+The web process only appends jobs to a stream (XADD). A separate worker
+(`python -m app.worker`) consumes them through a consumer group, so jobs
+survive API restarts and push fan-out cost never lands on web workers.
+
+Stream layout:
+- jobs:notifications          -> pending jobs (consumer group: notification-workers)
+- jobs:notifications:delayed  -> sorted set of retries and delayed jobs, scored by due time
+- jobs:notifications:dead     -> jobs that exhausted JOB_MAX_ATTEMPTS
+"""
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+JOB_STREAM = "jobs:notifications"
+DELAYED_JOBS_KEY = "jobs:notifications:delayed"
+DEAD_LETTER_STREAM = "jobs:notifications:dead"
+CONSUMER_GROUP = "notification-workers"
+
+
+def encode_job(name: str, payload: Dict[str, Any], attempts: int = 0) -> Dict[str, str]:
+    """Encode a job into flat stream fields."""
+    return {
+        "job": name,
+        "payload": json.dumps(payload),
+        "attempts": str(attempts),
+    }
+
+
+def decode_job(fields: Dict[str, str]) -> tuple[str, Dict[str, Any], int]:
+    """Decode stream fields into (name, payload, attempts)."""
+    return (
+        fields["job"],
+        json.loads(fields.get("payload") or "{}"),
+        int(fields.get("attempts", 0)),
+    )
+
+
+def is_queue_available() -> bool:
+    """True when jobs can be handed to the worker (enabled and real Redis)."""
+    return settings.JOB_QUEUE_ENABLED and redis_client.is_connected()
+
+
+async def enqueue_job(name: str, **payload: Any) -> Optional[str]:
+    """
+    Append a job to the durable queue.
+
+    Returns the stream entry ID, or None if the queue is unavailable
+    (disabled, or Redis is using the in-memory fallback). Callers should
+    then run the job in-process instead.
+    """
+    if not is_queue_available():
+        return None
+
+    entry_id = await redis_client.xadd(
+        JOB_STREAM,
+        encode_job(name, payload),
+        maxlen=settings.JOB_STREAM_MAXLEN
+    )
+    if entry_id:
+        logger.debug(f"📥 Job enqueued: {name} ({entry_id})")
+    return entry_id
+
+
+async def enqueue_delayed_job(name: str, delay: int, **payload: Any) -> bool:
+    """
+    Schedule a job to enter the queue after `delay` seconds.
+    Uses the same delayed set as retries; the worker promotes due entries.
+    """
+    if not is_queue_available():
+        return False
+
+    added = await redis_client.zadd(
+        DELAYED_JOBS_KEY,
+        {json.dumps(encode_job(name, payload)): time.time() + delay}
+    )
+    return bool(added)
@@ -0,0 +1,168 @@
+# ============================================================================
+# FILE: backend/app/core/password_hasher.py (BCRYPT PROCESS POOL)
+# ============================================================================
+"""
+bcrypt off the event loop.
+
+One bcrypt call (12 rounds) costs ~250ms of CPU. Run inline in an async
+handler it freezes every other request on the worker, so hashing and
+verification are sent to a dedicated process pool instead:
+
+- PASSWORD_HASH_WORKERS processes compute hashes in parallel.
+- At most PASSWORD_HASH_QUEUE_SIZE further calls may wait for a process.
+  Beyond that the request is shed with 503 + Retry-After instead of
+  queueing without bound during a login storm.
+- A pool whose process died (OOM kill, segfault) is replaced and the call
+  retried once; if that fails too the request gets a 503, never a "wrong
+  password".
+- stats() reports queue depth, rejections and latency (exposed on /health).
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# WORK FUNCTIONS (run in the pool processes)
+# ============================================================================
+def _hash(password: str, rounds: int) -> Tuple[str, float]:
+    started = time.perf_counter()
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds))
+    return hashed.decode('utf-8'), time.perf_counter() - started
+
+
+def _check(plain_password: str, hashed_password: str) -> Tuple[bool, float]:
+    started = time.perf_counter()
+    matches = bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return matches, time.perf_counter() - started
+
+
+def _warm_up() -> bool:
+    return True
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+class PasswordHasher:
+    """Bounded front door to the bcrypt process pool (one per API process)."""
+
+    def __init__(self, workers: int, queue_size: int, latency_window: int = 1000):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.pool_restarts = 0
+        # (total latency incl. queue wait, bcrypt time) of the most recent calls
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=latency_window)
+
+    def start(self):
+        """Create the pool and spawn its processes (called on app startup)."""
+        if self._executor is not None:
+            return
+        # spawn, not fork: the API process already runs an event loop and threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        for _ in range(self.workers):
+            self._executor.submit(_warm_up)
+        logger.info(f"🔐 Password hasher started ({self.workers} processes, capacity {self.capacity})")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        """Drop a broken pool; the next start() spawns a fresh one."""
+        if self._executor is executor:
+            self._executor = None
+            self.pool_restarts += 1
+            logger.error("❌ Password hasher pool broken (worker process died): restarting it")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _unavailable() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy. Please try again shortly.",
+            headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)}
+        )
+
+    async def _run(self, fn: Callable[..., Tuple[Any, float]], *args) -> Any:
+        if self._pending >= self.capacity:
+            self.rejected += 1
+            logger.warning(f"⛔ Password hasher saturated ({self._pending} pending): shedding request")
+            raise self._unavailable()
+
+        self._pending += 1
+        submitted = time.perf_counter()
+        try:
+            for attempt in range(2):
+                self.start()
+                executor = self._executor
+                try:
+                    result, bcrypt_seconds = await asyncio.get_running_loop().run_in_executor(
+                        executor, fn, *args
+                    )
+                    break
+                except BrokenProcessPool:
+                    self._discard(executor)
+                    if attempt:
+                        raise self._unavailable()
+        finally:
+            self._pending -= 1
+        self.completed += 1
+        self._samples.append((time.perf_counter() - submitted, bcrypt_seconds))
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, settings.PASSWORD_HASH_ROUNDS)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_check, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, counters and latency percentiles (milliseconds)."""
+        totals = sorted(sample[0] for sample in self._samples)
+        bcrypt_times = [sample[1] for sample in self._samples]
+
+        def percentile(p: float) -> Optional[float]:
+            if not totals:
+                return None
+            return round(totals[min(len(totals) - 1, int(p * len(totals)))] * 1000, 1)
+
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": min(self._pending, self.workers),
+            "queue_depth": max(0, self._pending - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "pool_restarts": self.pool_restarts,
+            "latency_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(totals[-1] * 1000, 1) if totals else None,
+            },
+            "bcrypt_ms_avg": round(sum(bcrypt_times) / len(bcrypt_times) * 1000, 1) if bcrypt_times else None,
+        }
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE)
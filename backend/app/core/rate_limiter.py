@@ -1,9 +1,11 @@
 # ============================================================================
 # FILE: backend/app/core/rate_limiter.py
 # ============================================================================
+import math
 import time
-from typing import Optional, Tuple
-from fastapi import HTTPException, status, Request
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Depends, HTTPException, status, Request
 from app.core.redis import redis_client
 from app.core.config import settings
 import logging
@@ -11,21 +13,94 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# GCRA (generic cell rate algorithm): the only state per key is the
+# "theoretical arrival time" (TAT), a single string with a PX expiry.
+# Each admitted request advances TAT by window/limit; a request is rejected
+# if that would put TAT more than one window ahead of now. This allows
+# bursts of up to `limit` requests and at most `limit` per window on average.
+# Times come from the Redis server clock, so all API workers agree.
+#
+# ARGV[3] tokens are requested at once (a lease for the local tier, 1
+# otherwise) and ARGV[4] unused tokens of an expired lease are handed back.
+# Returns {granted, remaining, reset}; granted = 0 means rejected.
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2]) * 1000
+local requested = tonumber(ARGV[3])
+local refund = tonumber(ARGV[4])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local interval = window / limit
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+tat = tat - refund * interval
+if tat < now then
+    tat = now
+end
+
+-- Tokens available now; the 0.5ms tolerance absorbs float rounding of window / limit
+local available = math.floor((now + window - tat + 0.5) / interval)
+local granted = math.min(requested, available)
+if granted < 1 then
+    if refund > 0 then
+        redis.call('SET', KEYS[1], string.format('%.3f', tat), 'PX', math.ceil(tat - now) + 1)
+    end
+    return {0, 0, math.ceil((tat + interval - window) / 1000)}
+end
+
+local new_tat = tat + granted * interval
+redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+return {granted, available - granted, math.ceil(new_tat / 1000)}
+"""
+
+
+class _Lease:
+    """Tokens this process reserved in Redis for one key."""
+    __slots__ = ("tokens", "remaining", "reset_time", "expires_at", "blocked_until")
+
+    def __init__(self):
+        self.tokens = 0  # Reserved and not yet used
+        self.remaining = 0  # Redis-side remaining when the lease was taken
+        self.reset_time = 0
+        self.expires_at = 0.0  # time.monotonic()
+        self.blocked_until = 0  # Unix time before which Redis will refuse anyway
+
+
 class RateLimiter:
     """
-    Redis-based rate limiter with sliding window algorithm.
+    Two-tier rate limiter: local token leases in front of a Redis GCRA.
     
     Features:
     - Per-user rate limiting
     - Per-IP rate limiting
-    - Sliding window (more accurate than fixed window)
-    - Automatic cleanup
-    - Fallback support for InMemoryRedis (no pipeline)
+    - Redis tier: one atomic Lua call (EVALSHA), fixed-size state per key
+    - Local tier: for limits >= RATE_LIMIT_LEASE_MIN_LIMIT a process leases
+      RATE_LIMIT_LEASE_FRACTION of the limit at once and spends it without
+      Redis; unused tokens are handed back with the next lease after
+      RATE_LIMIT_LEASE_TTL seconds. A rejected key is also refused locally
+      until Redis' next-allowed time. Strict limits (login, register,
+      password reset) keep going to Redis on every request.
+    - Same algorithm in-process on InMemoryRedis (no leasing)
+    
+    Accuracy bound: leased tokens are taken from the global budget before
+    they are spent, so the total only drifts in time, never in amount.
+    With P processes holding a lease of L = limit * fraction tokens on one
+    key, admissions in any window differ from `limit` by at most P * L:
+    - over, when tokens leased late in one window are spent (within
+      RATE_LIMIT_LEASE_TTL) at the start of the next
+    - under, while other processes hold unused leased tokens
+    With the defaults (fraction 0.2, TTL 15s) a client spread over 4 workers
+    of a 60/min endpoint sees between 12 and 108 per minute in the worst
+    case, and exactly 60 when its requests stay on one worker long enough
+    to use its lease.
     """
     
     def __init__(self):
         self.enabled = settings.RATE_LIMIT_ENABLED
         self.redis = redis_client
+        self._leases: "OrderedDict[str, _Lease]" = OrderedDict()
+        self.redis_calls = 0
+        self.local_decisions = 0
     
     def _get_user_key(self, user_id: int, endpoint: str) -> str:
         """Generate Redis key for user rate limit"""
@@ -35,15 +110,40 @@ class RateLimiter:
         """Generate Redis key for IP rate limit"""
         return f"rate_limit:ip:{ip}:{endpoint}"
     
-    def check_rate_limit(
+    def _lease_size(self, limit: int) -> int:
+        if not settings.RATE_LIMIT_LEASE_ENABLED or limit < settings.RATE_LIMIT_LEASE_MIN_LIMIT:
+            return 1
+        return max(1, int(limit * settings.RATE_LIMIT_LEASE_FRACTION))
+    
+    def _get_lease(self, key: str) -> _Lease:
+        lease = self._leases.get(key)
+        if lease is None:
+            lease = self._leases[key] = _Lease()
+            # Evicted leases just lapse; their tokens come back with time
+            while len(self._leases) > settings.RATE_LIMIT_LEASE_MAX_KEYS:
+                self._leases.popitem(last=False)
+        else:
+            self._leases.move_to_end(key)
+        return lease
+    
+    def stats(self) -> Dict[str, Any]:
+        total = self.redis_calls + self.local_decisions
+        return {
+            "redis_calls": self.redis_calls,
+            "local_decisions": self.local_decisions,
+            "redis_call_ratio": round(self.redis_calls / total, 3) if total else None,
+            "leased_keys": len(self._leases),
+        }
+    
+    async def check_rate_limit(
         self,
         identifier: str,
         limit: int,
         window: int,
-        key_prefix: str = "rate_limit"
+        key_prefix: str = "gcra"
     ) -> Tuple[bool, int, int]:
         """
-        Check if request is within rate limit using sliding window.
+        Check (and consume) one request against the rate limit.
         
         Args:
             identifier: User ID or IP address
@@ -53,72 +153,97 @@ class RateLimiter:
             
         Returns:
             Tuple of (allowed, remaining, reset_time)
+            reset_time: when the quota is fully restored (allowed), or when
+            the next request will be accepted (rejected), as a Unix timestamp
         """
         if not self.enabled:
             return True, limit, 0
         
         try:
             key = f"{key_prefix}:{identifier}"
-            current_time = int(time.time())
-            window_start = current_time - window
-            
-            # ✅ FIXED: Check if real Redis with pipeline support
-            if self.redis.is_connected():
-                # Use Redis pipeline for atomic operations
-                pipe = self.redis._client.pipeline()
-                
-                # Remove old entries (outside window)
-                pipe.zremrangebyscore(key, 0, window_start)
-                
-                # Count requests in current window
-                pipe.zcard(key)
-                
-                # Add current request timestamp
-                pipe.zadd(key, {str(current_time): current_time})
-                
-                # Set expiry (cleanup)
-                pipe.expire(key, window + 10)
-                
-                # Execute pipeline
-                results = pipe.execute()
-                
-                # Get request count (before adding current)
-                # results[0] = removed count
-                # results[1] = cardinality (count)
-                request_count = results[1]
-                
-            else:
-                # ✅ FIXED: Fallback for InMemoryRedis (no pipeline support)
-                # We execute commands sequentially. Not atomic, but fine for dev/testing.
-                self.redis.zremrangebyscore(key, 0, window_start)
-                request_count = self.redis.zcard(key) or 0
-                self.redis.zadd(key, {str(current_time): current_time})
-                self.redis.expire(key, window + 10)
-            
-            # Check if limit exceeded
-            if request_count >= limit:
-                # Calculate when limit resets by getting the oldest timestamp in window
-                oldest_entries = self.redis.zrange(key, 0, 0, withscores=True)
-                if oldest_entries:
-                    reset_time = int(oldest_entries[0][1]) + window
-                else:
-                    reset_time = current_time + window
-                
-                remaining = 0
-                return False, remaining, reset_time
             
-            # Request allowed
-            remaining = max(0, limit - request_count - 1)
-            reset_time = current_time + window
+            if not self.redis.is_connected():
+                granted, remaining, reset_time = await self._acquire_in_memory(key, limit, window)
+                return granted > 0, remaining, reset_time
             
-            return True, remaining, reset_time
+            size = self._lease_size(limit)
+            if size == 1:
+                return await self._check_redis(key, limit, window)
+            return await self._check_leased(key, limit, window, size)
             
         except Exception as e:
             logger.error(f"Rate limit check error: {e}")
             # On Redis failure, allow request (fail open) to prevent blocking users
             return True, limit, 0
     
-    def check_user_limit(
+    async def _acquire(
+        self, key: str, limit: int, window: int, requested: int, refund: int
+    ) -> Optional[Tuple[int, int, int]]:
+        """One GCRA_SCRIPT call: (granted, remaining, reset_time), or None on Redis failure."""
+        self.redis_calls += 1
+        result = await self.redis.run_script(GCRA_SCRIPT, [key], [limit, window, requested, refund])
+        if result is None:
+            return None
+        granted, remaining, reset_time = result
+        return int(granted), int(remaining), int(reset_time)
+    
+    async def _check_redis(self, key: str, limit: int, window: int) -> Tuple[bool, int, int]:
+        result = await self._acquire(key, limit, window, 1, 0)
+        if result is None:
+            # Redis failed: allow request (fail open)
+            return True, limit, 0
+        granted, remaining, reset_time = result
+        return granted > 0, remaining, reset_time
+    
+    async def _check_leased(self, key: str, limit: int, window: int, size: int) -> Tuple[bool, int, int]:
+        lease = self._get_lease(key)
+        now = time.monotonic()
+        
+        # Local tier: spend a leased token, or refuse while Redis would refuse
+        if lease.tokens > 0 and lease.expires_at > now:
+            lease.tokens -= 1
+            self.local_decisions += 1
+            return True, lease.remaining + lease.tokens, lease.reset_time
+        if lease.tokens == 0 and lease.blocked_until > time.time():
+            self.local_decisions += 1
+            return False, 0, lease.blocked_until
+        
+        # Lease used up or expired: hand back what is left and take a new one
+        refund, lease.tokens = lease.tokens, 0
+        result = await self._acquire(key, limit, window, size, refund)
+        if result is None:
+            return True, limit, 0
+        granted, remaining, reset_time = result
+        
+        if granted == 0:
+            lease.blocked_until = reset_time
+            return False, 0, reset_time
+        
+        # Another request may have refilled the lease while we awaited Redis
+        lease.tokens += granted - 1
+        lease.remaining = remaining
+        lease.reset_time = reset_time
+        lease.expires_at = time.monotonic() + settings.RATE_LIMIT_LEASE_TTL
+        lease.blocked_until = 0
+        return True, remaining + lease.tokens, reset_time
+    
+    async def _acquire_in_memory(self, key: str, limit: int, window: int) -> Tuple[int, int, int]:
+        """GCRA_SCRIPT for one token on the in-memory fallback (single process)."""
+        now = time.time()
+        interval = window / limit
+        
+        stored = await self.redis.get(key)
+        tat = max(float(stored) if stored else now, now)
+        available = math.floor((now + window - tat + 0.0005) / interval)
+        
+        if available < 1:
+            return 0, 0, math.ceil(tat + interval - window)
+        
+        new_tat = tat + interval
+        await self.redis.set(key, str(new_tat), ex=math.ceil(new_tat - now))
+        return 1, available - 1, math.ceil(new_tat)
+    
+    async def check_user_limit(
         self,
         user_id: int,
         endpoint: str,
@@ -127,9 +252,9 @@ class RateLimiter:
     ) -> Tuple[bool, int, int]:
         """Check rate limit for authenticated user"""
         key = self._get_user_key(user_id, endpoint)
-        return self.check_rate_limit(key, limit, window)
+        return await self.check_rate_limit(key, limit, window)
     
-    def check_ip_limit(
+    async def check_ip_limit(
         self,
         ip: str,
         endpoint: str,
@@ -138,7 +263,7 @@ class RateLimiter:
     ) -> Tuple[bool, int, int]:
         """Check rate limit for IP address"""
         key = self._get_ip_key(ip, endpoint)
-        return self.check_rate_limit(key, limit, window)
+        return await self.check_rate_limit(key, limit, window)
 
 
 # Singleton instance
@@ -159,11 +284,26 @@ def rate_limit(
     Rate limiting dependency for FastAPI endpoints.
     
     Usage:
-        @router.post("/login", dependencies=[Depends(rate_limit(5, 60))])
+        @router.post("/login", dependencies=[Depends(rate_limit(5, 60, by_ip=True))])
         async def login(...):
             ...
+    
+    by_user limits authenticate the request themselves: route dependencies
+    run before the endpoint's parameters, and FastAPI caches get_current_user
+    per request, so the endpoint reuses the same user without a second lookup.
     """
-    async def dependency(request: Request):
+    # Imported here: the API layer imports this module at load time
+    from app.api.deps import get_current_user
+    
+    def too_many_requests(reset_time: int) -> HTTPException:
+        retry_after = max(1, reset_time - int(time.time()))
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many requests. Try again in {retry_after} seconds.",
+            headers={"Retry-After": str(retry_after)}
+        )
+    
+    async def enforce(request: Request, user):
         endpoint = request.url.path
         
         # Get client IP
@@ -171,7 +311,7 @@ def rate_limit(
         
         # Check IP rate limit first (if enabled)
         if by_ip:
-            allowed, remaining, reset_time = rate_limiter.check_ip_limit(
+            allowed, remaining, reset_time = await rate_limiter.check_ip_limit(
                 client_ip,
                 endpoint,
                 limit,
@@ -179,36 +319,30 @@ def rate_limit(
             )
             
             if not allowed:
-                retry_after = reset_time - int(time.time())
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Too many requests. Try again in {retry_after} seconds.",
-                    headers={"Retry-After": str(retry_after)}
-                )
+                raise too_many_requests(reset_time)
         
-        # Check user rate limit (if authenticated and enabled)
-        if by_user:
-            # Try to get user from request state (set by auth dependency)
-            user = getattr(request.state, "user", None)
+        # Check user rate limit (if enabled)
+        if user is not None:
+            request.state.user = user
+            allowed, remaining, reset_time = await rate_limiter.check_user_limit(
+                user.id,
+                endpoint,
+                limit,
+                window
+            )
             
-            if user:
-                allowed, remaining, reset_time = rate_limiter.check_user_limit(
-                    user.id,
-                    endpoint,
-                    limit,
-                    window
-                )
-                
-                if not allowed:
-                    retry_after = reset_time - int(time.time())
-                    raise HTTPException(
-                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                        detail=f"Too many requests. Try again in {retry_after} seconds.",
-                        headers={"Retry-After": str(retry_after)}
-                    )
-                
-                # Add rate limit headers to response
-                request.state.rate_limit_remaining = remaining
-                request.state.rate_limit_reset = reset_time
-    
-    return dependency
\ No newline at end of file
+            if not allowed:
+                raise too_many_requests(reset_time)
+            
+            # Add rate limit headers to response
+            request.state.rate_limit_remaining = remaining
+            request.state.rate_limit_reset = reset_time
+    
+    if by_user:
+        async def dependency(request: Request, current_user=Depends(get_current_user)):
+            await enforce(request, current_user)
+    else:
+        async def dependency(request: Request):
+            await enforce(request, None)
+    
+    return dependency
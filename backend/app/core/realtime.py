@@ -0,0 +1,181 @@
+# ============================================================================
+# FILE: backend/app/core/realtime.py (FRIEND EVENTS OVER REDIS PUB/SUB)
+# ============================================================================
+"""
+Real-time friend activity fan-out.
+
+- Publishers (track_prayer) PUBLISH one message per friend to that friend's
+  channel: friend_events:{recipient_id}.
+- Each API process runs one FriendEventHub: a single Redis pub/sub connection
+  subscribed only to the channels of users connected to *this* process.
+  Messages are copied into small per-connection queues.
+- A connection whose queue overflows gets a single "resync" event instead
+  of unbounded buffering; the client then refetches /friends/feed.
+
+Without a real Redis connection (development fallback) events are delivered
+in-process only.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+
+from redis import asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "friend_events:"
+
+RESYNC_EVENT = {"type": "resync"}
+
+
+def _channel(user_id: int) -> str:
+    return f"{CHANNEL_PREFIX}{user_id}"
+
+
+class Subscription:
+    """One connected client: a bounded event queue."""
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.REALTIME_QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, event: Dict[str, Any]):
+        """Enqueue without blocking; a full queue collapses into one resync."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+
+    async def next_event(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait for the next event (None on timeout)."""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is RESYNC_EVENT:
+            self.overflowed = False
+        return event
+
+
+class FriendEventHub:
+    """Per-process pub/sub multiplexer for connected clients."""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._redis: Optional[aioredis.Redis] = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def uses_redis(self) -> bool:
+        return bool(settings.REDIS_URL) and redis_client.is_connected()
+
+    async def _ensure_listener(self):
+        if self._listener is not None or not self.uses_redis():
+            return
+        self._redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._listener = asyncio.create_task(self._listen())
+        logger.info("📡 Friend event hub started")
+
+    async def _listen(self):
+        while True:
+            try:
+                if not self._pubsub.subscribed:
+                    await asyncio.sleep(0.5)
+                    continue
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None:
+                    continue
+                user_id = int(message["channel"][len(CHANNEL_PREFIX):])
+                self.dispatch(user_id, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Friend event listener error: {e}", exc_info=True)
+                await asyncio.sleep(1)
+
+    def dispatch(self, user_id: int, event: Dict[str, Any]):
+        """Deliver an event to this process's connections for a user."""
+        for subscription in self._subscribers.get(user_id, ()):
+            subscription.offer(event)
+
+    async def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id)
+        async with self._lock:
+            await self._ensure_listener()
+            subs = self._subscribers.setdefault(user_id, set())
+            if not subs and self._pubsub is not None:
+                await self._pubsub.subscribe(_channel(user_id))
+            subs.add(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription):
+        async with self._lock:
+            subs = self._subscribers.get(subscription.user_id)
+            if not subs:
+                return
+            subs.discard(subscription)
+            if not subs:
+                del self._subscribers[subscription.user_id]
+                if self._pubsub is not None:
+                    await self._pubsub.unsubscribe(_channel(subscription.user_id))
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+friend_event_hub = FriendEventHub()
+
+
+async def publish_friend_event(db: AsyncSession, actor_id: int, event: Dict[str, Any]):
+    """
+    Publish an activity event by `actor_id` to all of the actor's friends.
+    Best-effort: failures are logged, never raised into the request.
+    """
+    if not settings.REALTIME_ENABLED:
+        return
+
+    # Imported lazily: friend_graph lives in services, which import core
+    from app.services.friend_graph import get_friend_ids
+
+    try:
+        friend_ids = await get_friend_ids(db, actor_id)
+        if not friend_ids:
+            return
+
+        event = {**event, "friend_id": actor_id}
+        if friend_event_hub.uses_redis():
+            await redis_client.publish_many([_channel(fid) for fid in friend_ids], json.dumps(event))
+        else:
+            for fid in friend_ids:
+                friend_event_hub.dispatch(fid, event)
+    except Exception as e:
+        logger.error(f"Failed to publish friend event for user {actor_id}: {e}")
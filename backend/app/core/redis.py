@@ -1,8 +1,23 @@
 # ============================================================================
-# FILE: backend/app/core/redis.py (FIXED - COMPLETE IMPLEMENTATION)
+# FILE: backend/app/core/redis.py (ASYNC CLIENT + POOL + FALLBACK)
 # ============================================================================
-import redis
+"""
+Async Redis access for the whole app (redis.asyncio).
+
+- One shared connection pool per process (REDIS_MAX_CONNECTIONS), with a
+  short socket timeout (REDIS_SOCKET_TIMEOUT): a slow Redis delays the
+  requests that use it instead of freezing the event loop.
+- Every method catches Redis errors, logs them and returns a neutral value,
+  exactly like the previous synchronous wrapper.
+- Without REDIS_URL, or if the startup ping fails, an in-memory fallback
+  with the same interface is used (development only).
+- pipeline() and mget() batch several commands into one round trip.
+
+connect() must be awaited once on startup (API and worker).
+"""
+from redis import asyncio as aioredis
 from app.core.config import settings
+from typing import Any, List, Optional
 import logging
 import time
 
@@ -10,212 +25,524 @@ logger = logging.getLogger(__name__)
 
 
 class RedisClient:
-    """Redis client with fallback"""
-    
+    """Async Redis client with fallback"""
+
     def __init__(self):
         self._client = None
         self._is_connected = False
-        self._connect()
-    
-    def _connect(self):
-        """Connect to Redis"""
-        try:
-            if settings.REDIS_URL:
-                self._client = redis.from_url(
+        self._scripts = {}
+        self._setup()
+
+    def _setup(self):
+        """Create the connection pool (connections are opened lazily)"""
+        if settings.REDIS_URL:
+            self._client = aioredis.Redis(
+                connection_pool=aioredis.ConnectionPool.from_url(
                     settings.REDIS_URL,
                     decode_responses=True,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
                     socket_connect_timeout=5,
+                    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
                     socket_keepalive=True,
                     health_check_interval=30
                 )
-                # Test connection
-                self._client.ping()
-                self._is_connected = True
-                logger.info("✅ Redis connected successfully")
-            else:
-                logger.warning("⚠️  REDIS_URL not set - using in-memory fallback")
-                self._client = InMemoryRedis()
-                self._is_connected = False
-                
+            )
+            # Confirmed (or reverted to the fallback) by connect()
+            self._is_connected = True
+        else:
+            logger.warning("⚠️  REDIS_URL not set - using in-memory fallback")
+            self._client = InMemoryRedis()
+            self._is_connected = False
+
+    async def connect(self):
+        """Check the connection once on startup"""
+        if not self._is_connected:
+            return
+        try:
+            await self._client.ping()
+            logger.info("✅ Redis connected successfully")
         except Exception as e:
             logger.error(f"❌ Redis connection failed: {e}")
             logger.warning("⚠️  Using in-memory fallback")
+            await self._client.aclose()
             self._client = InMemoryRedis()
             self._is_connected = False
-    
+
+    async def close(self):
+        """Release pooled connections (on shutdown)"""
+        if self._is_connected:
+            await self._client.aclose()
+
     # Basic operations
-    def setex(self, key: str, seconds: int, value: str):
+    async def setex(self, key: str, seconds: int, value: str):
         """Set key with expiration"""
         try:
-            return self._client.setex(key, seconds, value)
+            return await self._client.setex(key, seconds, value)
         except Exception as e:
             logger.error(f"Redis setex error: {e}")
             return False
-    
-    def get(self, key: str):
+
+    async def set(self, key: str, value: str, ex: int = None, nx: bool = False):
+        """Set key (optionally only if it does not exist yet)"""
+        try:
+            return await self._client.set(key, value, ex=ex, nx=nx)
+        except Exception as e:
+            logger.error(f"Redis set error: {e}")
+            return False
+
+    async def get(self, key: str):
         """Get key"""
         try:
-            return self._client.get(key)
+            return await self._client.get(key)
         except Exception as e:
             logger.error(f"Redis get error: {e}")
             return None
-    
-    def exists(self, key: str):
-        """Check if key exists"""
+
+    async def mget(self, keys: List[str]) -> list:
+        """Get several keys in one round trip (None for missing keys)"""
+        if not keys:
+            return []
         try:
-            return self._client.exists(key)
+            return await self._client.mget(keys)
+        except Exception as e:
+            logger.error(f"Redis mget error: {e}")
+            return [None] * len(keys)
+
+    async def exists(self, key: str, raise_errors: bool = False):
+        """Check if key exists (raise_errors: let the caller decide how to fail)"""
+        try:
+            return await self._client.exists(key)
         except Exception as e:
             logger.error(f"Redis exists error: {e}")
+            if raise_errors:
+                raise
             return False
-    
-    def delete(self, key: str):
+
+    async def delete(self, key: str):
         """Delete key"""
         try:
-            return self._client.delete(key)
+            return await self._client.delete(key)
         except Exception as e:
             logger.error(f"Redis delete error: {e}")
             return False
-    
+
     # ✅ FIXED: Added sorted set operations for rate limiter
-    def zremrangebyscore(self, key: str, min_score: float, max_score: float):
+    async def zremrangebyscore(self, key: str, min_score: float, max_score: float):
         """Remove members by score range"""
         try:
-            return self._client.zremrangebyscore(key, min_score, max_score)
+            return await self._client.zremrangebyscore(key, min_score, max_score)
         except Exception as e:
             logger.error(f"Redis zremrangebyscore error: {e}")
             return 0
-    
-    def zcard(self, key: str):
+
+    async def zcard(self, key: str):
         """Get sorted set cardinality"""
         try:
-            return self._client.zcard(key)
+            return await self._client.zcard(key)
         except Exception as e:
             logger.error(f"Redis zcard error: {e}")
             return 0
-    
-    def zadd(self, key: str, mapping: dict):
+
+    async def zadd(self, key: str, mapping: dict):
         """Add members to sorted set"""
         try:
-            return self._client.zadd(key, mapping)
+            return await self._client.zadd(key, mapping)
         except Exception as e:
             logger.error(f"Redis zadd error: {e}")
             return 0
-    
-    def zrange(self, key: str, start: int, end: int, withscores: bool = False):
+
+    async def zrange(self, key: str, start: int, end: int, withscores: bool = False):
         """Get range from sorted set"""
         try:
-            return self._client.zrange(key, start, end, withscores=withscores)
+            return await self._client.zrange(key, start, end, withscores=withscores)
         except Exception as e:
             logger.error(f"Redis zrange error: {e}")
             return []
-    
-    def expire(self, key: str, seconds: int):
+
+    async def zrangebyscore(self, key: str, min_score: float, max_score: float, num: int = None):
+        """Get members by score range (lowest first), at most `num`"""
+        try:
+            if num is None:
+                return await self._client.zrangebyscore(key, min_score, max_score)
+            return await self._client.zrangebyscore(key, min_score, max_score, start=0, num=num)
+        except Exception as e:
+            logger.error(f"Redis zrangebyscore error: {e}")
+            return []
+
+    async def zrem(self, key: str, *members: str):
+        """Remove members from sorted set"""
+        if not members:
+            return 0
+        try:
+            return await self._client.zrem(key, *members)
+        except Exception as e:
+            logger.error(f"Redis zrem error: {e}")
+            return 0
+
+    async def expire(self, key: str, seconds: int):
         """Set key expiration"""
         try:
-            return self._client.expire(key, seconds)
+            return await self._client.expire(key, seconds)
         except Exception as e:
             logger.error(f"Redis expire error: {e}")
             return False
-    
+
+    # List operations (notification digests)
+    async def rpush(self, key: str, *values: str):
+        """Append values to list"""
+        try:
+            return await self._client.rpush(key, *values)
+        except Exception as e:
+            logger.error(f"Redis rpush error: {e}")
+            return 0
+
+    async def lrange(self, key: str, start: int, end: int, raise_errors: bool = False) -> list:
+        """Read a range of a list (raise_errors: let the caller retry instead of seeing [])"""
+        try:
+            return await self._client.lrange(key, start, end) or []
+        except Exception as e:
+            logger.error(f"Redis lrange error: {e}")
+            if raise_errors:
+                raise
+            return []
+
+    async def ltrim(self, key: str, start: int, end: int):
+        """Keep only a range of a list"""
+        try:
+            return await self._client.ltrim(key, start, end)
+        except Exception as e:
+            logger.error(f"Redis ltrim error: {e}")
+            return False
+
+    # Set operations (friend adjacency sets)
+    async def sadd(self, key: str, *members: str):
+        """Add members to set"""
+        try:
+            return await self._client.sadd(key, *members)
+        except Exception as e:
+            logger.error(f"Redis sadd error: {e}")
+            return 0
+
+    async def srem(self, key: str, *members: str):
+        """Remove members from set"""
+        try:
+            return await self._client.srem(key, *members)
+        except Exception as e:
+            logger.error(f"Redis srem error: {e}")
+            return 0
+
+    async def smembers(self, key: str) -> set:
+        """Get all set members"""
+        try:
+            return await self._client.smembers(key)
+        except Exception as e:
+            logger.error(f"Redis smembers error: {e}")
+            return set()
+
+    async def smismember(self, key: str, *members: str) -> list:
+        """Check membership of several members in one call"""
+        try:
+            return [bool(m) for m in await self._client.smismember(key, members)]
+        except Exception as e:
+            logger.error(f"Redis smismember error: {e}")
+            return [False] * len(members)
+
+    async def scard(self, key: str) -> int:
+        """Get set cardinality"""
+        try:
+            return await self._client.scard(key)
+        except Exception as e:
+            logger.error(f"Redis scard error: {e}")
+            return 0
+
+    async def replace_set(self, key: str, members: list, ex: int = None):
+        """Atomically replace a whole set (optionally with expiration)"""
+        try:
+            if self._is_connected:
+                async with self._client.pipeline(transaction=True) as pipe:
+                    pipe.delete(key)
+                    pipe.sadd(key, *members)
+                    if ex:
+                        pipe.expire(key, ex)
+                    await pipe.execute()
+                return True
+            return await self._client.replace_set(key, members, ex)
+        except Exception as e:
+            logger.error(f"Redis replace_set error: {e}")
+            return False
+
+    # Pub/sub (real-time friend events, token revocations)
+    async def publish(self, channel: str, message: str) -> int:
+        """Publish a message (no-op on the in-memory fallback)"""
+        if not self._is_connected:
+            return 0
+        try:
+            return await self._client.publish(channel, message)
+        except Exception as e:
+            logger.error(f"Redis publish error: {e}")
+            return 0
+
+    async def publish_many(self, channels: list, message: str) -> int:
+        """Publish one message to several channels in a single round trip"""
+        try:
+            if not channels:
+                return 0
+            async with self._client.pipeline(transaction=False) as pipe:
+                for channel in channels:
+                    pipe.publish(channel, message)
+                return sum(await pipe.execute())
+        except Exception as e:
+            logger.error(f"Redis publish error: {e}")
+            return 0
+
+    # Stream operations for the background job queue
+    async def xadd(self, key: str, fields: dict, maxlen: int = None):
+        """Append entry to stream (approximate trimming when maxlen is set)"""
+        try:
+            return await self._client.xadd(key, fields, maxlen=maxlen, approximate=True)
+        except Exception as e:
+            logger.error(f"Redis xadd error: {e}")
+            return None
+
+    # Lua scripts
+    async def run_script(self, script: str, keys: List[str], args: List[Any]):
+        """
+        Run a Lua script atomically via EVALSHA (the script is loaded on first
+        use and again after NOSCRIPT). Returns None on error or without real
+        Redis; callers need their own fallback for the in-memory store.
+        """
+        if not self._is_connected:
+            return None
+        try:
+            registered = self._scripts.get(script)
+            if registered is None:
+                registered = self._scripts[script] = self._client.register_script(script)
+            return await registered(keys=keys, args=args)
+        except Exception as e:
+            logger.error(f"Redis script error: {e}")
+            return None
+
+    # Batching
+    def pipeline(self, transaction: bool = False) -> "RedisPipeline":
+        """Queue commands locally and send them in one round trip on execute()"""
+        return RedisPipeline(self, transaction)
+
     def is_connected(self):
         """Check if connected to real Redis"""
         return self._is_connected
 
 
+class RedisPipeline:
+    """
+    Buffered commands for RedisClient.pipeline().
+
+    Commands are recorded by name (pipe.zadd(...), pipe.expire(...)) and
+    sent together by `await pipe.execute()`, which returns their results
+    in order, or None if Redis failed. On the in-memory fallback they run
+    one after the other.
+    """
+
+    def __init__(self, redis: RedisClient, transaction: bool):
+        self._redis = redis
+        self._transaction = transaction
+        self._commands = []
+
+    def __getattr__(self, name: str):
+        def command(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return command
+
+    async def execute(self) -> Optional[List[Any]]:
+        commands, self._commands = self._commands, []
+        if not commands:
+            return []
+        try:
+            if self._redis.is_connected():
+                async with self._redis._client.pipeline(transaction=self._transaction) as pipe:
+                    for name, args, kwargs in commands:
+                        getattr(pipe, name)(*args, **kwargs)
+                    return await pipe.execute()
+            return [
+                await getattr(self._redis._client, name)(*args, **kwargs)
+                for name, args, kwargs in commands
+            ]
+        except Exception as e:
+            logger.error(f"Redis pipeline error: {e}")
+            return None
+
+
 class InMemoryRedis:
     """Fallback in-memory Redis for development"""
-    
+
     def __init__(self):
         self._data = {}
         self._expiry = {}
         self._sorted_sets = {}  # ✅ ADDED: For rate limiter sorted sets
+        self._lists = {}
+        self._sets = {}
         logger.warning("⚠️  Using in-memory Redis - NOT for production!")
-    
-    def setex(self, key: str, seconds: int, value: str):
-        self._data[key] = value
-        self._expiry[key] = time.time() + seconds
-        return True
-    
-    def get(self, key: str):
+
+    def _get(self, key: str):
         if key not in self._data:
             return None
-        
+
         # Check expiry
         if key in self._expiry and time.time() > self._expiry[key]:
             del self._data[key]
             del self._expiry[key]
             return None
-        
+
         return self._data[key]
-    
-    def exists(self, key: str):
-        return self.get(key) is not None or key in self._sorted_sets
-    
-    def delete(self, key: str):
+
+    async def setex(self, key: str, seconds: int, value: str):
+        self._data[key] = value
+        self._expiry[key] = time.time() + seconds
+        return True
+
+    async def set(self, key: str, value: str, ex: int = None, nx: bool = False):
+        if nx and self._get(key) is not None:
+            return None
+        self._data[key] = value
+        if ex:
+            self._expiry[key] = time.time() + ex
+        else:
+            self._expiry.pop(key, None)
+        return True
+
+    async def get(self, key: str):
+        return self._get(key)
+
+    async def mget(self, keys: List[str]) -> list:
+        return [self._get(key) for key in keys]
+
+    async def exists(self, key: str):
+        return self._get(key) is not None or key in self._sorted_sets
+
+    async def delete(self, key: str):
         self._data.pop(key, None)
         self._expiry.pop(key, None)
         self._sorted_sets.pop(key, None)
+        self._lists.pop(key, None)
+        self._sets.pop(key, None)
         return True
-    
+
+    async def rpush(self, key: str, *values: str):
+        self._lists.setdefault(key, []).extend(values)
+        return len(self._lists[key])
+
+    @staticmethod
+    def _list_slice(start: int, end: int) -> slice:
+        # Redis ranges are inclusive; -1 means the last element
+        return slice(start, None if end == -1 else end + 1)
+
+    async def lrange(self, key: str, start: int, end: int, raise_errors: bool = False) -> list:
+        return self._lists.get(key, [])[self._list_slice(start, end)]
+
+    async def ltrim(self, key: str, start: int, end: int):
+        kept = self._lists.get(key, [])[self._list_slice(start, end)]
+        if kept:
+            self._lists[key] = kept
+        else:
+            self._lists.pop(key, None)
+        return True
+
+    async def sadd(self, key: str, *members: str):
+        members_set = self._sets.setdefault(key, set())
+        before = len(members_set)
+        members_set.update(str(m) for m in members)
+        return len(members_set) - before
+
+    async def srem(self, key: str, *members: str):
+        members_set = self._sets.get(key, set())
+        before = len(members_set)
+        members_set.difference_update(str(m) for m in members)
+        return before - len(members_set)
+
+    async def smembers(self, key: str) -> set:
+        return set(self._sets.get(key, set()))
+
+    async def smismember(self, key: str, members) -> list:
+        members_set = self._sets.get(key, set())
+        return [str(m) in members_set for m in members]
+
+    async def scard(self, key: str) -> int:
+        return len(self._sets.get(key, set()))
+
+    async def replace_set(self, key: str, members: list, ex: int = None):
+        self._sets[key] = {str(m) for m in members}
+        return True
+
     # ✅ FIXED: Implement sorted set operations
-    def zremrangebyscore(self, key: str, min_score: float, max_score: float):
+    async def zremrangebyscore(self, key: str, min_score: float, max_score: float):
         """Remove members by score range"""
         if key not in self._sorted_sets:
             return 0
-        
+
         # Filter out items in score range
         original_len = len(self._sorted_sets[key])
         self._sorted_sets[key] = {
-            member: score 
+            member: score
             for member, score in self._sorted_sets[key].items()
             if not (min_score <= score <= max_score)
         }
-        
+
         return original_len - len(self._sorted_sets[key])
-    
-    def zcard(self, key: str):
+
+    async def zcard(self, key: str):
         """Get sorted set cardinality"""
         if key not in self._sorted_sets:
             return 0
         return len(self._sorted_sets[key])
-    
-    def zadd(self, key: str, mapping: dict):
+
+    async def zadd(self, key: str, mapping: dict):
         """Add members to sorted set"""
         if key not in self._sorted_sets:
             self._sorted_sets[key] = {}
-        
+
         self._sorted_sets[key].update(mapping)
         return len(mapping)
-    
-    def zrange(self, key: str, start: int, end: int, withscores: bool = False):
+
+    async def zrange(self, key: str, start: int, end: int, withscores: bool = False):
         """Get range from sorted set"""
         if key not in self._sorted_sets:
             return []
-        
+
         # Sort by score
         sorted_items = sorted(self._sorted_sets[key].items(), key=lambda x: x[1])
-        
+
         # Handle negative indices
         if end == -1:
             end = len(sorted_items)
         else:
             end = end + 1
-        
+
         sliced = sorted_items[start:end]
-        
+
         if withscores:
             return sliced
         else:
             return [item[0] for item in sliced]
-    
-    def expire(self, key: str, seconds: int):
+
+    async def zrangebyscore(self, key: str, min_score: float, max_score: float, start: int = 0, num: int = None):
+        """Get members by score range (lowest first), at most `num`"""
+        items = sorted(self._sorted_sets.get(key, {}).items(), key=lambda x: x[1])
+        members = [member for member, score in items if min_score <= score <= max_score]
+        return members[start:] if num is None else members[start:start + num]
+
+    async def zrem(self, key: str, *members: str):
+        """Remove members from sorted set"""
+        zset = self._sorted_sets.get(key, {})
+        return sum(1 for member in members if zset.pop(member, None) is not None)
+
+    async def expire(self, key: str, seconds: int):
         """Set key expiration"""
         self._expiry[key] = time.time() + seconds
         return True
-    
-    def ping(self):
+
+    async def ping(self):
         return True
 
 
 # Singleton instance
-redis_client = RedisClient()
\ No newline at end of file
+redis_client = RedisClient()
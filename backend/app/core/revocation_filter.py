@@ -0,0 +1,219 @@
+# ============================================================================
+# FILE: backend/app/core/revocation_filter.py (REVOKED JTI BLOOM FILTER)
+# ============================================================================
+"""
+In-process Bloom filter of revoked token JTIs.
+
+Almost no tokens are ever revoked, yet every authenticated request used to
+pay an EXISTS blacklist:jti:* round trip. Each API process now keeps a
+Bloom filter of the revoked JTIs:
+
+- "not in filter" means definitely not revoked: Redis is skipped.
+- "in filter" (a revocation or a rare false positive) is confirmed against
+  Redis, exactly as before.
+
+The filter is kept in sync through the REVOCATION_CHANNEL pub/sub channel
+(blacklist_token_jti publishes every revocation). On startup, on every
+reconnect, and every REVOCATION_FILTER_REBUILD_INTERVAL seconds, it is
+rebuilt from a SCAN of the blacklist keys. The periodic rebuild also drops
+JTIs whose keys have expired.
+
+The subscription is pinged every half REVOCATION_FILTER_HEALTH_CHECK_INTERVAL;
+if neither a message nor a pong arrives within the interval (half-open
+socket, Redis gone) the connection counts as lost. Rebuilds run at least
+once per access token lifetime.
+
+Until a rebuild has completed, and whenever the pub/sub connection is lost,
+the filter reports every JTI as possibly revoked. Every request is then
+checked in Redis, so REDIS_FAIL_CLOSED keeps working: a Redis outage can
+never be hidden behind a stale filter.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Any, Dict, Optional
+
+from redis import asyncio as aioredis
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHANNEL = "blacklist:revocations"
+BLACKLIST_PREFIX = "blacklist:jti:"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter (bytearray + double hashing over blake2b)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationFilter:
+    """Per-process revocation filter, fed by SCAN + pub/sub."""
+
+    def __init__(self):
+        self._bloom: Optional[BloomFilter] = None
+        self._building: Optional[BloomFilter] = None
+        self._ready = False
+        self._task: Optional[asyncio.Task] = None
+        self.redis_checks_skipped = 0
+        self.redis_checks = 0
+
+    def is_ready(self) -> bool:
+        return self._ready
+
+    def might_be_revoked(self, jti: str) -> bool:
+        """False only if the JTI is certainly not revoked."""
+        if not self._ready:
+            return True
+        if jti in self._bloom:
+            self.redis_checks += 1
+            return True
+        self.redis_checks_skipped += 1
+        return False
+
+    def add(self, jti: str):
+        """Record a revocation (also applied to a filter being rebuilt)."""
+        if self._bloom is not None:
+            self._bloom.add(jti)
+        if self._building is not None:
+            self._building.add(jti)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self._ready,
+            "entries": self._bloom.count if self._bloom else 0,
+            "capacity": self._bloom.capacity if self._bloom else 0,
+            "redis_checks": self.redis_checks,
+            "redis_checks_skipped": self.redis_checks_skipped,
+        }
+
+    # ------------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------------
+    async def start(self):
+        """Start syncing (API startup). Without real Redis the filter stays off."""
+        if not (settings.REVOCATION_FILTER_ENABLED and settings.TOKEN_BLACKLIST_ENABLED):
+            return
+        if not redis_client.is_connected() or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._ready = False
+
+    @staticmethod
+    def _rebuild_interval() -> int:
+        # A JTI missed by pub/sub must not outlive the tokens it revokes
+        return min(settings.REVOCATION_FILTER_REBUILD_INTERVAL, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+    def _apply(self, message: Optional[Dict[str, Any]]):
+        if message is not None and message["type"] == "message":
+            self.add(message["data"])
+
+    async def _run(self):
+        health_interval = settings.REVOCATION_FILTER_HEALTH_CHECK_INTERVAL
+        while True:
+            redis = aioredis.from_url(
+                settings.REDIS_URL,
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_keepalive=True,
+                health_check_interval=health_interval
+            )
+            pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                # Subscribe before scanning: a revocation made during the scan
+                # is then either found by SCAN or received as a message
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                await self._rebuild(redis, pubsub)
+                next_rebuild = time.monotonic() + self._rebuild_interval()
+                last_heard = next_ping = time.monotonic()
+
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    now = time.monotonic()
+                    if message is not None:
+                        last_heard = now
+                        self._apply(message)
+                    if now - last_heard > health_interval:
+                        raise ConnectionError(f"no message or pong for {health_interval}s")
+                    if now >= next_ping:
+                        await pubsub.ping()
+                        next_ping = now + health_interval / 2
+                    if now >= next_rebuild:
+                        await self._rebuild(redis, pubsub)
+                        next_rebuild = time.monotonic() + self._rebuild_interval()
+                        last_heard = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Messages may have been missed: confirm every JTI in Redis until rebuilt
+                self._ready = False
+                self._building = None
+                logger.error(f"❌ Revocation filter sync lost, checking Redis on every request: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+                await redis.aclose()
+
+    async def _rebuild(self, redis: aioredis.Redis, pubsub):
+        """Load every blacklisted JTI into a fresh filter, then swap it in."""
+        started = time.monotonic()
+        previous = self._bloom.count if self._bloom else 0
+        self._building = BloomFilter(
+            max(settings.REVOCATION_FILTER_CAPACITY, previous * 2),
+            settings.REVOCATION_FILTER_ERROR_RATE
+        )
+
+        cursor = 0
+        while True:
+            cursor, keys = await redis.scan(cursor, match=f"{BLACKLIST_PREFIX}*", count=1000)
+            for key in keys:
+                self._building.add(key[len(BLACKLIST_PREFIX):])
+            # Keep applying live revocations while the scan is running
+            while (message := await pubsub.get_message(ignore_subscribe_messages=True, timeout=0)) is not None:
+                self._apply(message)
+            if cursor == 0:
+                break
+
+        self._bloom, self._building = self._building, None
+        self._ready = True
+        logger.info(
+            f"🛡️  Revocation filter rebuilt: {self._bloom.count} revoked JTIs "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+
+
+revocation_filter = RevocationFilter()
@@ -1,14 +1,20 @@
 # ============================================================================
 # FILE: backend/app/core/security.py (PRODUCTION-READY)
 # ============================================================================
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, Set
+from typing import Optional, Dict, Any, Set, Tuple
 from jose import JWTError, jwt
+from fastapi import HTTPException
 import bcrypt
+import hashlib
 import re
 import secrets
+import time
 from app.core.config import settings
 from app.core.redis import redis_client  #
+from app.core.password_hasher import password_hasher
+from app.core.revocation_filter import revocation_filter, REVOCATION_CHANNEL, BLACKLIST_PREFIX
 import logging
 
 logger = logging.getLogger(__name__)
@@ -59,7 +65,7 @@ def get_password_hash(password: str) -> str:
         raise ValueError(error_msg)
     
     try:
-        salt = bcrypt.gensalt(rounds=12)
+        salt = bcrypt.gensalt(rounds=settings.PASSWORD_HASH_ROUNDS)
         hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed.decode('utf-8')
     except Exception as e:
@@ -67,11 +73,41 @@ def get_password_hash(password: str) -> str:
         raise ValueError("Failed to hash password")
 
 
+# Request handlers must use the async variants below: they run bcrypt in the
+# password hasher's process pool instead of blocking the event loop, and raise
+# HTTPException(503) when the pool's queue is full.
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password() in the bcrypt process pool."""
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Password verification error: {e}")
+        return False
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash() in the bcrypt process pool."""
+    is_valid, error_msg = validate_password_strength(password)
+    if not is_valid:
+        raise ValueError(error_msg)
+    
+    try:
+        return await password_hasher.hash(password)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Password hashing error: {e}")
+        raise ValueError("Failed to hash password")
+
+
 # ============================================================================
 # TOKEN BLACKLIST MANAGEMENT (CENTRALIZED & REDIS-BASED)
 # ============================================================================
 
-def blacklist_token_jti(jti: str, ttl_seconds: int, user_id: int) -> bool:
+async def blacklist_token_jti(jti: str, ttl_seconds: int, user_id: int) -> bool:
     """
     Add token JTI to Redis blacklist.
     
@@ -88,11 +124,17 @@ def blacklist_token_jti(jti: str, ttl_seconds: int, user_id: int) -> bool:
 
     try:
         # Key format: blacklist:jti:{jti_string}
-        redis_client.setex(
-            name=f"blacklist:jti:{jti}",
-            time=ttl_seconds,
-            value=str(user_id)
-        )
+        if not await redis_client.setex(
+            f"{BLACKLIST_PREFIX}{jti}",
+            ttl_seconds,
+            str(user_id)
+        ):
+            return False
+        
+        # Update this process's revocation filter now, and every other one via pub/sub
+        revocation_filter.add(jti)
+        await redis_client.publish(REVOCATION_CHANNEL, jti)
+        
         logger.info(f"Token JTI blacklisted: {jti[:8]}... for user {user_id}")
         return True
     except Exception as e:
@@ -101,10 +143,13 @@ def blacklist_token_jti(jti: str, ttl_seconds: int, user_id: int) -> bool:
         return False
 
 
-def is_token_blacklisted(jti: str) -> bool:
+async def is_token_blacklisted(jti: str) -> bool:
     """
     Check if token JTI is in Redis blacklist.
     
+    Redis is only asked when the in-process revocation filter cannot rule
+    the JTI out (see app/core/revocation_filter.py).
+    
     Args:
         jti: JWT ID to check
         
@@ -114,8 +159,11 @@ def is_token_blacklisted(jti: str) -> bool:
     if not settings.TOKEN_BLACKLIST_ENABLED:
         return False
 
+    if not revocation_filter.might_be_revoked(jti):
+        return False
+
     try:
-        return redis_client.exists(f"blacklist:jti:{jti}")
+        return bool(await redis_client.exists(f"{BLACKLIST_PREFIX}{jti}", raise_errors=True))
     except Exception as e:
         logger.error(f"Blacklist check failed: {e}")
         
@@ -172,13 +220,73 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
 # JWT TOKEN VALIDATION
 # ============================================================================
 
-def decode_token(token: str, check_blacklist: bool = True) -> Optional[Dict[str, Any]]:
+class VerifiedTokenCache:
+    """
+    LRU of already verified JWT claims, keyed by SHA-256 of the raw token
+    (raw tokens are never kept in memory).
+    
+    A client reuses the same access token for ACCESS_TOKEN_EXPIRE_MINUTES,
+    so after the first request its signature check and claim parsing are
+    replaced by one hash and one dict lookup. Entries are dropped at the
+    token's own `exp`, so an expired token always goes through jwt.decode
+    again and is rejected there. Only signature/claims verification is
+    cached: revocation is still checked on every request.
+    """
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return dict(payload)  # callers may mutate their copy
+    
+    def put(self, token: str, payload: Dict[str, Any]):
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)) or self.max_size <= 0:
+            return
+        self._data[self._key(token)] = (float(expires_at), dict(payload))
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+    
+    def discard(self, token: str):
+        self._data.pop(self._key(token), None)
+    
+    def clear(self):
+        self._data.clear()
+
+
+verified_tokens = VerifiedTokenCache(settings.TOKEN_CACHE_SIZE if settings.TOKEN_CACHE_ENABLED else 0)
+
+
+def forget_verified_token(token: str):
+    """Drop a token from the verified-token cache (revoked or logged out)."""
+    verified_tokens.discard(token)
+
+
+async def decode_token(token: str, check_blacklist: bool = True) -> Optional[Dict[str, Any]]:
     """
     Decode and validate JWT token.
+    Verified claims are served from the verified-token cache until `exp`.
     Optionally checks blacklist using JTI.
     """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = verified_tokens.get(token)
+        if payload is None:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            verified_tokens.put(token, payload)
         
         if check_blacklist:
             jti = payload.get("jti")
@@ -188,8 +296,9 @@ def decode_token(token: str, check_blacklist: bool = True) -> Optional[Dict[str,
                 
             # Use centralized blacklist check
             try:
-                if is_token_blacklisted(jti):
+                if await is_token_blacklisted(jti):
                     logger.warning(f"Attempted use of blacklisted token JTI: {jti[:8]}...")
+                    verified_tokens.discard(token)
                     return None
             except Exception:
                 # Redis failed and we are failing closed
@@ -205,4 +314,17 @@ def decode_token(token: str, check_blacklist: bool = True) -> Optional[Dict[str,
         return None
     except JWTError as e:
         logger.error(f"JWT decode error: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+# ============================================================================
+# CONTACT DISCOVERY HASHING
+# ============================================================================
+
+def hash_email_for_discovery(email: str) -> str:
+    """
+    Salted SHA-256 of a normalized email, as computed by the mobile app for
+    address-book entries. Stored in users.email_hash.
+    """
+    normalized = email.lower().strip()
+    return hashlib.sha256(f"{settings.CONTACT_DISCOVERY_SALT}:{normalized}".encode("utf-8")).hexdigest()
@@ -0,0 +1,78 @@
+# ============================================================================
+# FILE: backend/app/import_history.py (BULK IMPORT CLI)
+# ============================================================================
+"""
+Import a prayer history file for a user from the command line.
+
+Usage:
+    python -m app.import_history --email user@example.com history.csv
+    python -m app.import_history --user-id 42 --format ndjson history.ndjson.gz
+
+Same validation and COPY-based merge as POST /api/v1/prayers/import,
+without the upload size and rate limits.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+from app.services.history_import import (
+    import_prayer_history,
+    open_import_lines,
+    ImportValidationError,
+)
+
+logging.basicConfig(
+    level=getattr(logging, settings.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("app.import_history")
+
+
+async def run(args: argparse.Namespace) -> int:
+    fmt = args.format or ("ndjson" if ".ndjson" in args.path else "csv")
+
+    async with AsyncSessionLocal() as db:
+        if args.user_id:
+            query = select(User).filter(User.id == args.user_id)
+        else:
+            query = select(User).filter(User.email == args.email.lower().strip())
+        user = (await db.execute(query)).scalars().first()
+
+        if not user:
+            logger.error("User not found")
+            return 1
+
+        with open(args.path, "rb") as handle:
+            try:
+                result = await import_prayer_history(
+                    user.id, open_import_lines(handle, args.path), fmt, db
+                )
+            except ImportValidationError as e:
+                await db.rollback()
+                logger.error(f"Import rejected: {e}")
+                return 1
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import prayer history for a user")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--user-id", type=int, help="Target user ID")
+    target.add_argument("--email", help="Target user email")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension")
+    parser.add_argument("path", help="CSV or NDJSON file (optionally .gz)")
+
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -175,6 +175,9 @@ async def root():
 async def health_check():
     """Health check endpoint for monitoring"""
     from app.core.database import check_db_connection
+    from app.core.rate_limiter import rate_limiter
+    from app.core.password_hasher import password_hasher
+    from app.core.revocation_filter import revocation_filter
     
     # ✅ FIX: Unpack the tuple (is_healthy, error_message)
     # This prevents the boolean logic error where a tuple (False, "Error") was evaluated as True
@@ -185,7 +188,10 @@ async def health_check():
     response_content = {
         "status": "healthy" if db_healthy else "degraded",
         "service": settings.APP_NAME,
-        "database": "connected" if db_healthy else "disconnected"
+        "database": "connected" if db_healthy else "disconnected",
+        "password_hasher": password_hasher.stats(),
+        "revocation_filter": revocation_filter.stats(),
+        "rate_limiter": rate_limiter.stats()
     }
     
     # Include error detail if unhealthy
@@ -225,6 +231,18 @@ async def startup_event():
             logger.critical(f"⛔ CONFIGURATION ERROR: {e}")
             sys.exit(1)
     
+    # Verify Redis once; falls back to the in-memory store if unreachable
+    from app.core.redis import redis_client
+    await redis_client.connect()
+    
+    # Load revoked JTIs so most requests skip the Redis blacklist lookup
+    from app.core.revocation_filter import revocation_filter
+    await revocation_filter.start()
+    
+    # Spawn the bcrypt processes now rather than on the first login
+    from app.core.password_hasher import password_hasher
+    password_hasher.start()
+    
     logger.info(f"🔧 Environment: {'Development' if settings.DEBUG else 'Production'}")
     logger.info(f"🌐 CORS Origins: {settings.get_cors_origins()}")
     logger.info("=" * 60)
@@ -232,6 +250,17 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
+    from app.core.realtime import friend_event_hub
+    from app.services.push_notification_service import push_service
+    from app.core.password_hasher import password_hasher
+    from app.core.redis import redis_client
+    from app.core.revocation_filter import revocation_filter
+    
+    await friend_event_hub.close()
+    await revocation_filter.close()
+    await push_service.close()
+    password_hasher.shutdown()
+    await redis_client.close()
     logger.info(f"👋 Shutting down {settings.APP_NAME}")
 
 # ============================================================================
@@ -0,0 +1,94 @@
+# ============================================================================
+# FILE: backend/app/models/group.py (PRAYER CIRCLES)
+# ============================================================================
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Index, Enum
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+
+class GroupRole(enum.Enum):
+    """Member roles inside a prayer circle"""
+    OWNER = "owner"
+    ADMIN = "admin"
+    MEMBER = "member"
+
+
+class PrayerGroup(Base):
+    """
+    Prayer circle (mosque, family, study group) with up to GROUP_MAX_MEMBERS members.
+
+    member_count is maintained on join/leave so dashboards never count rows.
+    """
+    __tablename__ = "prayer_groups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)
+    description = Column(String(500), nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    invite_code = Column(String(16), unique=True, index=True, nullable=False)
+    member_count = Column(Integer, default=0, nullable=False)
+
+    # Timestamps (timezone-aware)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    # Relationships
+    members = relationship(
+        "GroupMember",
+        back_populates="group",
+        cascade="all, delete-orphan",
+        lazy="dynamic"
+    )
+
+    def __repr__(self):
+        return f"<PrayerGroup(id={self.id}, name={self.name}, members={self.member_count})>"
+
+
+class GroupMember(Base):
+    """Membership of a user in a prayer circle"""
+    __tablename__ = "prayer_group_members"
+
+    id = Column(Integer, primary_key=True, index=True)
+    group_id = Column(Integer, ForeignKey("prayer_groups.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    role = Column(Enum(GroupRole), default=GroupRole.MEMBER, nullable=False)
+    joined_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Relationships
+    group = relationship("PrayerGroup", back_populates="members")
+    user = relationship("User")
+
+    __table_args__ = (
+        UniqueConstraint('group_id', 'user_id', name='uq_group_member'),
+
+        # "Which groups is this user in?" (prayer event -> aggregate updates)
+        Index('idx_group_members_user', 'user_id'),
+    )
+
+    def __repr__(self):
+        return f"<GroupMember(group={self.group_id}, user={self.user_id}, role={self.role.value})>"
+
+
+class GroupDailyProgress(Base):
+    """
+    Per-group, per-day completion aggregate.
+
+    Updated incrementally by prayer events (see services/prayer_groups.py),
+    so the dashboard reads a handful of rows regardless of group size.
+    """
+    __tablename__ = "prayer_group_daily_progress"
+
+    group_id = Column(Integer, ForeignKey("prayer_groups.id", ondelete="CASCADE"), primary_key=True)
+    prayer_date = Column(String(10), primary_key=True)  # YYYY-MM-DD format
+
+    # Sum of completed prayers across members
+    completed_prayers = Column(Integer, default=0, nullable=False)
+    # Members who completed all 5 prayers that day
+    members_completed_all = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<GroupDailyProgress(group={self.group_id}, date={self.prayer_date}, completed={self.completed_prayers})>"
@@ -0,0 +1,83 @@
+# ============================================================================
+# FILE: backend/app/models/notification.py (OUTBOX + BROADCASTS)
+# ============================================================================
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Index, JSON, Enum
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+
+class NotificationOutbox(Base):
+    """
+    Pending push notification, written in the same transaction as the
+    domain change that caused it (friend request, accept, ...).
+
+    The relay (services/notification_outbox.py) renders and sends rows in
+    batches and deletes them once Expo has accepted them, so a crash after
+    commit can no longer lose a notification.
+    """
+    __tablename__ = "notification_outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    recipient_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    # Translation key (see push_notification_service.TRANSLATIONS) and its format params
+    kind = Column(String(50), nullable=False)
+    params = Column(JSON, nullable=False, default=dict)
+    data = Column(JSON, nullable=False, default=dict)
+
+    # notification_preferences key that must not be False for the push to go out
+    preference = Column(String(50), nullable=True)
+
+    # Delivery bookkeeping
+    attempts = Column(Integer, default=0, nullable=False)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Relay scan: due rows in insertion order
+        Index('idx_outbox_available', 'available_at', 'id'),
+    )
+
+    def __repr__(self):
+        return f"<NotificationOutbox(id={self.id}, kind={self.kind}, recipient={self.recipient_id})>"
+
+
+class BroadcastStatus(enum.Enum):
+    """Lifecycle of an all-user announcement"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+
+class NotificationBroadcast(Base):
+    """
+    Announcement pushed to every active user (Ramadan, Eid, ...).
+
+    last_user_id is the keyset checkpoint: the broadcast engine
+    (services/broadcast.py) walks users by id and commits progress after
+    every page, so an interrupted broadcast resumes where it stopped.
+    """
+    __tablename__ = "notification_broadcasts"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Either a TRANSLATIONS key (+ params) or explicit per-language templates
+    kind = Column(String(50), nullable=True)
+    params = Column(JSON, nullable=False, default=dict)
+    templates = Column(JSON, nullable=True)  # {"en": {"title": ..., "body": ...}, ...}
+    data = Column(JSON, nullable=False, default=dict)
+
+    status = Column(Enum(BroadcastStatus), default=BroadcastStatus.PENDING, nullable=False)
+    last_user_id = Column(Integer, default=0, nullable=False)
+    sent_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<NotificationBroadcast(id={self.id}, status={self.status.value}, sent={self.sent_count})>"
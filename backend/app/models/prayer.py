@@ -1,12 +1,31 @@
 # ============================================================================
 # FILE: backend/app/models/prayer.py (FIXED - ADDED INDEXES)
 # ============================================================================
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, UniqueConstraint, Index
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Float, ForeignKey, UniqueConstraint, Index, Sequence
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.core.database import Base
 
 
+# Monotonic change sequence shared by prayer_logs and their tombstones.
+# Every insert/update/delete takes the next value, so clients can sync with
+# "give me everything after change_seq N".
+prayer_log_change_seq = Sequence("prayer_log_change_seq", metadata=Base.metadata)
+
+# Values are taken before commit, so two writers could commit in the opposite
+# order and a sync in between would skip the smaller one. Writers of a user's
+# logs take this transaction-scoped lock before drawing a value: per user,
+# commit order then equals change_seq order.
+LOCK_USER_CHANGES_SQL = text(
+    "SELECT pg_advisory_xact_lock(hashtext('prayer_log_change_seq'), :user_id)"
+)
+
+
+async def lock_user_log_changes(db, user_id: int):
+    """Serialize change_seq writers of one user until the transaction ends."""
+    await db.execute(LOCK_USER_CHANGES_SQL, {"user_id": user_id})
+
+
 class PrayerLog(Base):
     """
     Prayer tracking log - stores user's daily prayer completions.
@@ -36,6 +55,14 @@ class PrayerLog(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
+    # Delta sync cursor (bumped on every write, see prayer_log_change_seq)
+    change_seq = Column(
+        BigInteger,
+        prayer_log_change_seq,
+        server_default=prayer_log_change_seq.next_value(),
+        nullable=False
+    )
+    
     # Relationships
     user = relationship("User", back_populates="prayer_logs")
     
@@ -52,6 +79,9 @@ class PrayerLog(Base):
         # ✅ NEW: Optimized index for streak calculation (user_id + completed + date)
         # Allows DB to quickly filter completed prayers and order by date
         Index('idx_streak_calc', 'user_id', 'completed', 'prayer_date'),
+        
+        # Delta sync: "changes for user after cursor"
+        Index('idx_prayer_logs_user_change_seq', 'user_id', 'change_seq'),
     )
     
     def __repr__(self):
@@ -70,8 +100,41 @@ class PrayerLog(Base):
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "change_seq": self.change_seq,
         }
 
+    def touch(self):
+        """Bump change_seq so delta-sync clients pick up an update."""
+        self.change_seq = prayer_log_change_seq.next_value()
+
+
+class PrayerLogTombstone(Base):
+    """
+    Records deleted prayer logs so delta-sync clients can remove them locally.
+    Shares prayer_log_change_seq with prayer_logs.
+    """
+    __tablename__ = "prayer_log_tombstones"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    log_id = Column(Integer, nullable=False)
+    prayer_name = Column(String(20), nullable=False)
+    prayer_date = Column(String(10), nullable=False)
+    change_seq = Column(
+        BigInteger,
+        prayer_log_change_seq,
+        server_default=prayer_log_change_seq.next_value(),
+        nullable=False
+    )
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_tombstones_user_change_seq', 'user_id', 'change_seq'),
+    )
+    
+    def __repr__(self):
+        return f"<PrayerLogTombstone(user={self.user_id}, log={self.log_id}, seq={self.change_seq})>"
+
 
 class PrayerStreak(Base):
     """
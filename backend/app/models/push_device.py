@@ -0,0 +1,39 @@
+# ============================================================================
+# FILE: backend/app/models/push_device.py (MULTI-DEVICE PUSH TOKENS)
+# ============================================================================
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class PushDevice(Base):
+    """
+    One Expo push token per device. A user can have several active devices;
+    a token belongs to exactly one user (re-registering moves it).
+
+    Senders resolve tokens for a whole set of recipients with one query
+    (services/push_devices.py). Dead tokens are deactivated by token.
+    """
+    __tablename__ = "push_devices"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    token = Column(String(255), nullable=False)
+    platform = Column(String(20), nullable=True)  # ios / android / web
+    active = Column(Boolean, default=True, nullable=False)
+
+    last_seen = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    user = relationship("User")
+
+    __table_args__ = (
+        # Cleanup by token (DeviceNotRegistered) and upsert target
+        Index('uq_push_devices_token', 'token', unique=True),
+        # Fan-out: active tokens of a set of users
+        Index('idx_push_devices_user_active', 'user_id', 'active'),
+    )
+
+    def __repr__(self):
+        return f"<PushDevice(user={self.user_id}, platform={self.platform}, active={self.active})>"
@@ -20,6 +20,8 @@ class User(Base):
     # Primary fields
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
+    # Salted email hash for contact discovery (see hash_email_for_discovery)
+    email_hash = Column(String(64), nullable=True, index=True)
     hashed_password = Column(String(255), nullable=False)
     full_name = Column(String(255), nullable=True)
     
@@ -35,6 +37,8 @@ class User(Base):
 
     
     # Expo Push Token (Mobil cihazdan gelen token)
+    # Most recently registered token only, kept for API compatibility.
+    # Senders use push_devices (all of the user's devices).
     push_token = Column(String(255), nullable=True, index=True)
     
     # Notification Preferences (JSON olarak saklıyoruz, böylece ileride yeni tipler eklemek kolay olur)
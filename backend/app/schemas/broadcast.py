@@ -0,0 +1,69 @@
+# ============================================================================
+# FILE: backend/app/schemas/broadcast.py (ALL-USER ANNOUNCEMENTS)
+# ============================================================================
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+
+class BroadcastTemplate(BaseModel):
+    """Title/body of an announcement in one language"""
+    title: str = Field(..., min_length=1, max_length=100)
+    body: str = Field(..., min_length=1, max_length=500)
+
+
+class BroadcastCreate(BaseModel):
+    """
+    Schema for starting a broadcast.
+    Use a built-in notification key (e.g. 'ramadan_start') or custom
+    templates per language; 'en' is the fallback for other languages.
+    """
+    kind: Optional[str] = Field(None, max_length=50)
+    params: Dict[str, str] = Field(default_factory=dict)
+    templates: Optional[Dict[str, BroadcastTemplate]] = None
+    data: Dict[str, Any] = Field(default_factory=dict)
+
+    @model_validator(mode="after")
+    def check_content(self):
+        if not self.kind and not self.templates:
+            raise ValueError("Either kind or templates is required")
+        if self.templates and 'en' not in self.templates:
+            raise ValueError("templates must include 'en' as the fallback language")
+        return self
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "kind": "ramadan_start",
+                "params": {},
+                "data": {"screen": "ramadan"}
+            }
+        }
+    }
+
+
+class BroadcastResponse(BaseModel):
+    """Broadcast progress"""
+    id: int
+    kind: Optional[str] = None
+    status: str
+    last_user_id: int
+    sent_count: int
+    failed_count: int
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "id": 3,
+                "kind": "ramadan_start",
+                "status": "running",
+                "last_user_id": 412000,
+                "sent_count": 398211,
+                "failed_count": 1204,
+                "created_at": "2025-02-28T18:00:00",
+                "finished_at": None
+            }
+        }
+    }
@@ -5,6 +5,8 @@ from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 
+from app.core.config import settings
+
 
 # ============================================================================
 # FRIEND REQUEST SCHEMAS
@@ -112,6 +114,103 @@ class FriendWeekPrayersResponse(BaseModel):
     }
 
 
+class FriendFeedEntry(BaseModel):
+    """One friend's week grid and streaks in the friends feed"""
+    friendship_id: int
+    friend_id: int
+    friend_name: str
+    days: List[FriendDayStatus]
+    current_streak: int = 0
+    best_streak: int = 0
+
+
+class FriendsFeedResponse(BaseModel):
+    """Week grids and streaks for all accepted friends"""
+    start_date: str
+    end_date: str
+    friends: List[FriendFeedEntry]
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "start_date": "2024-01-15",
+                "end_date": "2024-01-21",
+                "friends": [
+                    {
+                        "friendship_id": 1,
+                        "friend_id": 2,
+                        "friend_name": "John Doe",
+                        "days": [
+                            {
+                                "date": "2024-01-15",
+                                "completion_percentage": 100.0,
+                                "is_today": False,
+                                "completed_count": 5
+                            }
+                        ],
+                        "current_streak": 5,
+                        "best_streak": 12
+                    }
+                ]
+            }
+        }
+    }
+
+
+# ============================================================================
+# CONTACT DISCOVERY SCHEMAS
+# ============================================================================
+
+class ContactDiscoveryRequest(BaseModel):
+    """Salted email hashes from the phone's address book"""
+    hashes: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.CONTACT_DISCOVERY_MAX_HASHES,
+        description='Hex sha256("<salt>:<lowercased email>") per contact'
+    )
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "hashes": [
+                    "9f2c4b0e6a0d5c1e7b3f8a2d4c6e8f0a1b3d5f7092c4e6a8b0d2f4a6c8e0b2d4"
+                ]
+            }
+        }
+    }
+
+
+class ContactMatch(BaseModel):
+    """A registered user matching one of the submitted hashes"""
+    hash: str
+    user_id: int
+    name: str
+    friendship_status: Optional[str] = None
+    is_requester: Optional[bool] = None
+
+
+class ContactDiscoveryResponse(BaseModel):
+    """Registered contacts among the submitted hashes"""
+    matches: List[ContactMatch]
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "matches": [
+                    {
+                        "hash": "9f2c4b0e6a0d5c1e7b3f8a2d4c6e8f0a1b3d5f7092c4e6a8b0d2f4a6c8e0b2d4",
+                        "user_id": 2,
+                        "name": "John Doe",
+                        "friendship_status": "pending",
+                        "is_requester": True
+                    }
+                ]
+            }
+        }
+    }
+
+
 # ============================================================================
 # MESSAGE RESPONSE
 # ============================================================================
@@ -0,0 +1,142 @@
+# ============================================================================
+# FILE: backend/app/schemas/group.py (PRAYER CIRCLES)
+# ============================================================================
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+
+
+# ============================================================================
+# GROUP SCHEMAS
+# ============================================================================
+
+class GroupCreate(BaseModel):
+    """Schema for creating a prayer circle"""
+    name: str = Field(..., min_length=1, max_length=100)
+    description: Optional[str] = Field(None, max_length=500)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "name": "Central Mosque Youth",
+                "description": "Daily prayers together"
+            }
+        }
+    }
+
+
+class GroupJoin(BaseModel):
+    """Schema for joining a circle by invite code"""
+    invite_code: str = Field(..., min_length=4, max_length=16)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "invite_code": "K3X9QF2M"
+            }
+        }
+    }
+
+
+class GroupResponse(BaseModel):
+    """Prayer circle summary"""
+    id: int
+    name: str
+    description: Optional[str] = None
+    member_count: int
+    role: Optional[str] = None
+    invite_code: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    model_config = {
+        "from_attributes": True,
+        "json_schema_extra": {
+            "example": {
+                "id": 1,
+                "name": "Central Mosque Youth",
+                "description": "Daily prayers together",
+                "member_count": 240,
+                "role": "member",
+                "invite_code": None,
+                "created_at": "2024-01-15T10:00:00"
+            }
+        }
+    }
+
+
+# ============================================================================
+# MEMBERS
+# ============================================================================
+
+class GroupMemberResponse(BaseModel):
+    """One member of a circle"""
+    user_id: int
+    name: str
+    role: str
+    joined_at: datetime
+
+
+class GroupMembersResponse(BaseModel):
+    """Keyset-paginated member list"""
+    members: List[GroupMemberResponse]
+    next_cursor: Optional[int] = None
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "members": [
+                    {
+                        "user_id": 2,
+                        "name": "John Doe",
+                        "role": "member",
+                        "joined_at": "2024-01-15T10:00:00"
+                    }
+                ],
+                "next_cursor": 2
+            }
+        }
+    }
+
+
+# ============================================================================
+# DASHBOARD
+# ============================================================================
+
+class GroupDayProgress(BaseModel):
+    """Aggregate completion of a circle for one day"""
+    date: str
+    completed_prayers: int = 0
+    completion_percentage: float = 0.0
+    members_completed_all: int = 0
+    is_today: bool = False
+
+
+class GroupDashboardResponse(BaseModel):
+    """Per-day aggregate completion of a circle"""
+    group_id: int
+    name: str
+    member_count: int
+    start_date: str
+    end_date: str
+    days: List[GroupDayProgress]
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "group_id": 1,
+                "name": "Central Mosque Youth",
+                "member_count": 240,
+                "start_date": "2024-01-15",
+                "end_date": "2024-01-21",
+                "days": [
+                    {
+                        "date": "2024-01-15",
+                        "completed_prayers": 912,
+                        "completion_percentage": 76.0,
+                        "members_completed_all": 131,
+                        "is_today": False
+                    }
+                ]
+            }
+        }
+    }
@@ -129,6 +129,7 @@ class PrayerLogResponse(BaseModel):
     completed_at: Optional[datetime]
     created_at: datetime
     updated_at: datetime
+    change_seq: Optional[int] = Field(None, description="Delta-sync cursor of this write")
     
     class Config:
         from_attributes = True
@@ -339,4 +340,124 @@ class StreakResponse(BaseModel):
                 "last_prayer_date": "2025-01-04",
                 "updated_at": "2025-01-04T12:00:00Z"
             }
-        }
\ No newline at end of file
+        }
+
+# ============================================================================
+# STREAK HISTORY SCHEMAS (gaps-and-islands runs, cursor paginated)
+# ============================================================================
+
+class StreakRun(BaseModel):
+    """A single run of consecutive perfect days (all 5 prayers completed)"""
+    start_date: str = Field(..., description="First day of the run in YYYY-MM-DD")
+    end_date: str = Field(..., description="Last day of the run in YYYY-MM-DD")
+    length: int = Field(..., description="Number of consecutive perfect days")
+    dates: Optional[List[str]] = Field(None, description="Every day in the run (only when include_dates=true)")
+
+
+class StreakHistoryResponse(BaseModel):
+    """Streak runs within a date range, one page at a time"""
+    start_date: str
+    end_date: str
+    streaks: List[StreakRun]
+    total_streaks: int = Field(..., description="Number of runs in the whole range")
+    total_perfect_days: int = Field(..., description="Number of perfect days in the whole range")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "start_date": "2024-01-01",
+                "end_date": "2024-12-31",
+                "streaks": [
+                    {"start_date": "2024-01-03", "end_date": "2024-01-09", "length": 7, "dates": None},
+                    {"start_date": "2024-02-01", "end_date": "2024-02-02", "length": 2, "dates": None}
+                ],
+                "total_streaks": 14,
+                "total_perfect_days": 61,
+                "next_cursor": "2024-02-01"
+            }
+        }
+
+
+# ============================================================================
+# DELTA SYNC SCHEMAS
+# ============================================================================
+
+class PrayerLogTombstoneResponse(BaseModel):
+    """A prayer log deleted after the client's cursor"""
+    log_id: int
+    prayer_name: str
+    prayer_date: str
+    change_seq: int
+    deleted_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PrayerChangesResponse(BaseModel):
+    """Prayer log changes since a cursor, ordered by change_seq"""
+    upserts: List[PrayerLogResponse] = Field(..., description="Created or updated logs")
+    deletes: List[PrayerLogTombstoneResponse] = Field(..., description="Deleted logs")
+    cursor: int = Field(..., description="Pass as `since` on the next sync")
+    has_more: bool = Field(..., description="More changes are waiting; sync again immediately")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "upserts": [
+                    {
+                        "id": 42,
+                        "user_id": 1,
+                        "prayer_name": "Fajr",
+                        "prayer_date": "2024-01-15",
+                        "prayer_time": "05:30",
+                        "completed": True,
+                        "on_time": True,
+                        "completed_at": "2024-01-15T05:35:00Z",
+                        "created_at": "2024-01-15T05:35:00Z",
+                        "updated_at": "2024-01-15T05:35:00Z",
+                        "change_seq": 1041
+                    }
+                ],
+                "deletes": [
+                    {
+                        "log_id": 40,
+                        "prayer_name": "Isha",
+                        "prayer_date": "2024-01-14",
+                        "change_seq": 1042,
+                        "deleted_at": "2024-01-15T06:00:00Z"
+                    }
+                ],
+                "cursor": 1042,
+                "has_more": False
+            }
+        }
+
+
+# ============================================================================
+# BULK IMPORT SCHEMAS
+# ============================================================================
+
+class PrayerImportResponse(BaseModel):
+    """Result of a bulk history import"""
+    rows_imported: int = Field(..., description="Valid rows loaded into staging")
+    inserted: int = Field(..., description="New prayer logs created")
+    updated: int = Field(..., description="Existing prayer logs overwritten")
+    rejected: int = Field(..., description="Invalid rows skipped")
+    errors: List[str] = Field(default_factory=list, description="First few validation errors")
+    current_streak: Optional[int] = None
+    best_streak: Optional[int] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "rows_imported": 18250,
+                "inserted": 18100,
+                "updated": 150,
+                "rejected": 2,
+                "errors": ["line 17: invalid prayer_name 'Tahajjud'", "line 904: prayer_date 2031-01-01 is in the future"],
+                "current_streak": 12,
+                "best_streak": 140
+            }
+        }
@@ -0,0 +1,208 @@
+# ============================================================================
+# FILE: backend/app/services/broadcast.py (ALL-USER ANNOUNCEMENTS)
+# ============================================================================
+"""
+Broadcast engine for announcements to every user (Ramadan, Eid, ...).
+
+- Users are streamed by keyset pagination on users.id (BROADCAST_PAGE_SIZE
+  rows per query), never loaded all at once: memory stays flat.
+- Each page is grouped by preferred_language; the template is rendered once
+  per language and reused for every recipient of that language.
+- Sends go through the chunked async Expo client, paced to
+  BROADCAST_RATE_PER_SECOND. Only one broadcast slice runs at a time
+  (Redis lock), so the pace is global.
+- After every page the checkpoint (last_user_id + counters) is committed.
+  A job runs for at most BROADCAST_SLICE_SECONDS and then re-enqueues
+  itself, so a crashed or restarted worker resumes from the checkpoint
+  and long broadcasts never look like stuck jobs to the reclaimer.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from fastapi import BackgroundTasks
+from sqlalchemy import text
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.job_queue import enqueue_job, enqueue_delayed_job
+from app.core.redis import redis_client
+from app.models.notification import NotificationBroadcast, BroadcastStatus
+from app.services.push_notification_service import push_service, get_translation
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_LOCK_KEY = "broadcast:lock"
+
+# Lock holder checks: a slice that overran its TTL must not release or extend
+# the lock another broadcast has taken since
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# One page of users with at least one active device, joined to all their tokens
+RECIPIENT_PAGE_SQL = text("""
+WITH page AS (
+    SELECT u.id, u.preferred_language
+    FROM users u
+    WHERE u.id > :last_user_id
+      AND u.is_active = true
+      AND COALESCE(u.notification_preferences->>'announcements', 'true') <> 'false'
+      AND EXISTS (SELECT 1 FROM push_devices d WHERE d.user_id = u.id AND d.active = true)
+    ORDER BY u.id
+    LIMIT :limit
+)
+SELECT page.id, page.preferred_language, d.token
+FROM page
+JOIN push_devices d ON d.user_id = page.id AND d.active = true
+ORDER BY page.id
+""")
+
+
+def _render(broadcast: NotificationBroadcast, lang: str) -> Dict[str, str]:
+    """Title/body for one language (custom templates fall back to 'en')."""
+    if broadcast.templates:
+        template = broadcast.templates.get(lang) or broadcast.templates['en']
+        return {'title': template['title'], 'body': template['body']}
+    return get_translation(broadcast.kind, lang, **(broadcast.params or {}))
+
+
+async def start_broadcast(background_tasks: BackgroundTasks, broadcast_id: int):
+    """Hand a new broadcast to the job worker (BackgroundTasks fallback)."""
+    if not await enqueue_job("broadcast", broadcast_id=broadcast_id):
+        background_tasks.add_task(run_broadcast, broadcast_id)
+
+
+async def _release_lock(broadcast_id: int):
+    owner = str(broadcast_id)
+    if redis_client.is_connected():
+        await redis_client.run_script(RELEASE_LOCK_SCRIPT, [BROADCAST_LOCK_KEY], [owner])
+    elif await redis_client.get(BROADCAST_LOCK_KEY) == owner:
+        await redis_client.delete(BROADCAST_LOCK_KEY)
+
+
+async def _extend_lock(broadcast_id: int, lock_ttl: int) -> bool:
+    """Refresh the lock TTL. False if another broadcast holds it now."""
+    owner = str(broadcast_id)
+    if redis_client.is_connected():
+        # None (Redis error): keep going, as before the check existed
+        return await redis_client.run_script(
+            EXTEND_LOCK_SCRIPT, [BROADCAST_LOCK_KEY], [owner, lock_ttl]
+        ) != 0
+    if await redis_client.get(BROADCAST_LOCK_KEY) != owner:
+        return False
+    await redis_client.expire(BROADCAST_LOCK_KEY, lock_ttl)
+    return True
+
+
+async def _send_page(broadcast: NotificationBroadcast, rows) -> Dict[str, int]:
+    """Send one page of recipients, one rendered template per language."""
+    by_language: Dict[str, List[str]] = defaultdict(list)
+    for row in rows:
+        by_language[row.preferred_language or 'en'].append(row.token)
+
+    totals = {'success': 0, 'failed': 0}
+    data = {**(broadcast.data or {}), 'type': 'broadcast', 'broadcast_id': broadcast.id}
+    for lang, tokens in by_language.items():
+        content = _render(broadcast, lang)
+        result = await push_service.send_batch_notifications([
+            {'push_token': token, 'title': content['title'], 'body': content['body'], 'data': data}
+            for token in tokens
+        ])
+        totals['success'] += result['success']
+        totals['failed'] += result['failed']
+    return totals
+
+
+async def run_broadcast(broadcast_id: int):
+    """
+    Job handler: advance a broadcast by one slice, then re-enqueue the next
+    slice (or keep going in-process when there is no job queue).
+    """
+    while True:
+        lock_ttl = settings.BROADCAST_SLICE_SECONDS * 4
+        if await redis_client.set(BROADCAST_LOCK_KEY, str(broadcast_id), ex=lock_ttl, nx=True):
+            try:
+                more = await _run_slice(broadcast_id, lock_ttl)
+            finally:
+                await _release_lock(broadcast_id)
+            if not more or await enqueue_job("broadcast", broadcast_id=broadcast_id):
+                return
+        else:
+            # Another broadcast is sending: wait for its slice to end
+            if await enqueue_delayed_job("broadcast", settings.BROADCAST_SLICE_SECONDS, broadcast_id=broadcast_id):
+                return
+            await asyncio.sleep(settings.BROADCAST_SLICE_SECONDS)
+
+
+async def _run_slice(broadcast_id: int, lock_ttl: int) -> bool:
+    """Send pages for up to BROADCAST_SLICE_SECONDS. Returns True if work remains."""
+    async with AsyncSessionLocal() as db:
+        broadcast = (await db.execute(
+            select(NotificationBroadcast).filter(NotificationBroadcast.id == broadcast_id)
+        )).scalars().first()
+        if not broadcast or broadcast.status in (BroadcastStatus.COMPLETED, BroadcastStatus.CANCELLED):
+            return False
+
+        if broadcast.status == BroadcastStatus.PENDING:
+            broadcast.status = BroadcastStatus.RUNNING
+            await db.commit()
+            logger.info(f"📢 Broadcast {broadcast_id} started")
+
+        deadline = time.monotonic() + settings.BROADCAST_SLICE_SECONDS
+        while True:
+            page_started = time.monotonic()
+            rows = (await db.execute(RECIPIENT_PAGE_SQL, {
+                "last_user_id": broadcast.last_user_id,
+                "limit": settings.BROADCAST_PAGE_SIZE,
+            })).all()
+
+            if not rows:
+                broadcast.status = BroadcastStatus.COMPLETED
+                broadcast.finished_at = datetime.now(timezone.utc)
+                await db.commit()
+                logger.info(
+                    f"📢 Broadcast {broadcast_id} completed: "
+                    f"{broadcast.sent_count} sent, {broadcast.failed_count} failed"
+                )
+                return False
+
+            result = await _send_page(broadcast, rows)
+
+            # Checkpoint: a restart resumes after the last fully sent page
+            broadcast.last_user_id = rows[-1].id
+            broadcast.sent_count += result['success']
+            broadcast.failed_count += result['failed']
+            await db.commit()
+
+            # Reload to notice a cancellation made through the API
+            await db.refresh(broadcast, ['status'])
+            if broadcast.status == BroadcastStatus.CANCELLED:
+                logger.info(f"📢 Broadcast {broadcast_id} cancelled at user {broadcast.last_user_id}")
+                return False
+
+            # Global pacing: never exceed BROADCAST_RATE_PER_SECOND
+            min_duration = len(rows) / settings.BROADCAST_RATE_PER_SECOND
+            elapsed = time.monotonic() - page_started
+            if elapsed < min_duration:
+                await asyncio.sleep(min_duration - elapsed)
+
+            if time.monotonic() >= deadline:
+                return True
+            if not await _extend_lock(broadcast_id, lock_ttl):
+                logger.warning(f"📢 Broadcast {broadcast_id} lost the send lock: yielding the slice")
+                return True
@@ -0,0 +1,186 @@
+# ============================================================================
+# FILE: backend/app/services/expo_push_client.py (ASYNC EXPO HTTP CLIENT)
+# ============================================================================
+"""
+Native async client for the Expo push API.
+
+- One pooled httpx.AsyncClient per process (keep-alive, HTTP/1.1).
+- Messages are split into chunks of EXPO_PUSH_CHUNK_SIZE (Expo's limit: 100).
+- At most EXPO_PUSH_MAX_CONCURRENCY chunks are in flight at once.
+- Receipts are fetched in requests of up to 1000 ticket ids.
+- 429 / 5xx / network errors are retried with exponential backoff + jitter
+  (Retry-After is honoured); 4xx request errors are not retried.
+
+Nothing here blocks the event loop: the exponent_server_sdk client it
+replaces did a synchronous requests call per publish.
+"""
+import asyncio
+import logging
+import random
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RECEIPT_CHUNK_SIZE = 1000  # Expo's per-request limit for getReceipts
+
+
+class ExpoPushError(Exception):
+    """A chunk could not be delivered to Expo (after retries)."""
+
+
+def _error_ticket(message: str, error: str) -> Dict[str, Any]:
+    """Ticket shape used for messages that never reached Expo."""
+    return {"status": "error", "message": message, "details": {"error": error}}
+
+
+class ExpoPushClient:
+    """Async Expo push client. Safe to share across tasks of one event loop."""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        access_token: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = (base_url or settings.EXPO_API_BASE_URL).rstrip("/")
+        self.access_token = access_token if access_token is not None else settings.EXPO_ACCESS_TOKEN
+        self.chunk_size = min(chunk_size or settings.EXPO_PUSH_CHUNK_SIZE, 100)
+        self.max_concurrency = max_concurrency or settings.EXPO_PUSH_MAX_CONCURRENCY
+        self.max_retries = settings.EXPO_PUSH_MAX_RETRIES if max_retries is None else max_retries
+        self.timeout = timeout or settings.EXPO_PUSH_TIMEOUT
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # ------------------------------------------------------------------
+    # Connection pool
+    # ------------------------------------------------------------------
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            headers = {
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+                "Content-Type": "application/json",
+            }
+            if self.access_token:
+                headers["Authorization"] = f"Bearer {self.access_token}"
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                transport=self._transport,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def close(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), 30.0)
+            except ValueError:
+                pass
+        base = settings.EXPO_PUSH_RETRY_BASE_DELAY * (2 ** attempt)
+        return base + random.uniform(0, base)
+
+    async def _post(self, path: str, payload: Any) -> Dict[str, Any]:
+        """POST with bounded concurrency and retries. Returns the JSON body."""
+        client = self._get_client()
+        attempt = 0
+        while True:
+            retry_after = None
+            async with self._semaphore:
+                try:
+                    response = await client.post(path, json=payload)
+                    if response.status_code not in RETRYABLE_STATUS:
+                        if response.status_code >= 400:
+                            raise ExpoPushError(
+                                f"Expo rejected request ({response.status_code}): {response.text[:200]}"
+                            )
+                        return response.json()
+                    retry_after = response.headers.get("Retry-After")
+                    error = ExpoPushError(f"Expo returned {response.status_code}")
+                except httpx.TransportError as e:
+                    error = ExpoPushError(f"Network error: {e}")
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = self._backoff(attempt, retry_after)
+            attempt += 1
+            logger.warning(f"⚠️ Expo {path} failed ({error}); retry {attempt} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _send_chunk(self, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        try:
+            body = await self._post("/send", chunk)
+        except ExpoPushError as e:
+            logger.error(f"❌ Push chunk of {len(chunk)} failed: {e}")
+            return [_error_ticket(str(e), "DeliveryFailed") for _ in chunk]
+
+        tickets = body.get("data")
+        if isinstance(tickets, dict):
+            tickets = [tickets]
+        if not isinstance(tickets, list) or len(tickets) != len(chunk):
+            errors = body.get("errors") or "malformed response"
+            logger.error(f"❌ Unexpected Expo response for chunk of {len(chunk)}: {errors}")
+            return [_error_ticket(str(errors), "DeliveryFailed") for _ in chunk]
+        return tickets
+
+    async def send(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send Expo message dicts ({"to", "title", "body", "data", ...}).
+        Returns one ticket per message, in input order.
+        """
+        if not messages:
+            return []
+        self._get_client()
+
+        chunks = [
+            messages[i:i + self.chunk_size]
+            for i in range(0, len(messages), self.chunk_size)
+        ]
+        results = await asyncio.gather(*(self._send_chunk(chunk) for chunk in chunks))
+        return [ticket for chunk_tickets in results for ticket in chunk_tickets]
+
+    async def get_receipts(self, ticket_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch receipts for ticket ids. Returns {ticket_id: receipt}; ids
+        whose receipt is not ready yet are simply absent.
+        """
+        if not ticket_ids:
+            return {}
+        self._get_client()
+
+        async def fetch(ids: List[str]) -> Dict[str, Dict[str, Any]]:
+            body = await self._post("/getReceipts", {"ids": ids})
+            return body.get("data") or {}
+
+        chunks = [
+            ticket_ids[i:i + RECEIPT_CHUNK_SIZE]
+            for i in range(0, len(ticket_ids), RECEIPT_CHUNK_SIZE)
+        ]
+        receipts: Dict[str, Dict[str, Any]] = {}
+        for result in await asyncio.gather(*(fetch(chunk) for chunk in chunks)):
+            receipts.update(result)
+        return receipts
@@ -0,0 +1,173 @@
+# ============================================================================
+# FILE: backend/app/services/friend_graph.py (REDIS FRIEND ADJACENCY SETS)
+# ============================================================================
+"""
+Per-user friend-id sets in Redis (friends:{user_id}).
+
+Each set holds the user's accepted friend ids plus a LOADED_MARKER member,
+which tells an empty friend list apart from a set that was never loaded.
+A set without the marker (expired, or created by an edge update before the
+first read) is reloaded from `friendships` in one query.
+
+Edges are updated after the friendship change commits (accept adds, remove/
+reject/cancel remove), together with a per-user generation counter
+(friends:gen:{user_id}). A reload notes the generation before reading the
+database and only replaces the set if it is unchanged, so a reload racing
+with a removal can never write the removed friend back: are_friends gates
+access to friends' prayer data.
+
+With the in-memory Redis fallback each process would hold its own copy, so
+every lookup goes straight to the database instead.
+"""
+import logging
+from typing import Set
+
+from sqlalchemy import and_, or_, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.models.friendship import Friendship, FriendshipStatus
+
+logger = logging.getLogger(__name__)
+
+LOADED_MARKER = "loaded"
+
+# KEYS: set, generation. ARGV: generation seen before the DB read, ttl, members
+REPLACE_IF_CURRENT_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+for i = 3, #ARGV, 1000 do
+    redis.call('SADD', KEYS[1], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+def _friends_key(user_id: int) -> str:
+    return f"friends:{user_id}"
+
+
+def _generation_key(user_id: int) -> str:
+    return f"friends:gen:{user_id}"
+
+
+def _use_cache() -> bool:
+    return redis_client.is_connected()
+
+
+async def _load_friend_ids(db: AsyncSession, user_id: int) -> Set[int]:
+    """Read a user's accepted friend ids from the database."""
+    friend_id_col = case(
+        (Friendship.user_id == user_id, Friendship.friend_id),
+        else_=Friendship.user_id
+    )
+    query = select(friend_id_col).filter(
+        and_(
+            or_(
+                Friendship.user_id == user_id,
+                Friendship.friend_id == user_id
+            ),
+            Friendship.status == FriendshipStatus.ACCEPTED
+        )
+    )
+    result = await db.execute(query)
+    return set(result.scalars().all())
+
+
+async def _ensure_loaded(db: AsyncSession, user_id: int) -> Set[int]:
+    """Reload a user's set from the database and return the friend ids."""
+    generation = await redis_client.get(_generation_key(user_id)) or "0"
+    friend_ids = await _load_friend_ids(db, user_id)
+    # Skipped if an edge changed meanwhile; the next lookup reloads again
+    await redis_client.run_script(
+        REPLACE_IF_CURRENT_SCRIPT,
+        [_friends_key(user_id), _generation_key(user_id)],
+        [generation, settings.FRIEND_GRAPH_CACHE_TTL, LOADED_MARKER, *[str(fid) for fid in friend_ids]]
+    )
+    return friend_ids
+
+
+# ============================================================================
+# LOOKUPS
+# ============================================================================
+async def get_friend_ids(db: AsyncSession, user_id: int) -> Set[int]:
+    """All accepted friend ids of a user."""
+    if not _use_cache():
+        return await _load_friend_ids(db, user_id)
+
+    members = await redis_client.smembers(_friends_key(user_id))
+    if LOADED_MARKER not in members:
+        return await _ensure_loaded(db, user_id)
+    return {int(m) for m in members if m != LOADED_MARKER}
+
+
+async def are_friends(db: AsyncSession, user_id: int, other_id: int) -> bool:
+    """O(1) accepted-friendship check."""
+    if not _use_cache():
+        return other_id in await _load_friend_ids(db, user_id)
+
+    loaded, is_member = await redis_client.smismember(_friends_key(user_id), LOADED_MARKER, str(other_id))
+    if not loaded:
+        return other_id in await _ensure_loaded(db, user_id)
+    return is_member
+
+
+async def count_friends(db: AsyncSession, user_id: int) -> int:
+    """O(1) accepted-friend count."""
+    if not _use_cache():
+        return len(await _load_friend_ids(db, user_id))
+
+    key = _friends_key(user_id)
+    results = await redis_client.pipeline().sismember(key, LOADED_MARKER).scard(key).execute()
+    if not results or not results[0]:
+        return len(await _ensure_loaded(db, user_id))
+    return max(results[1] - 1, 0)
+
+
+# ============================================================================
+# MAINTENANCE (call after the friendship change is committed)
+# ============================================================================
+def _bump_generation(pipe, user_id: int):
+    """Fence off reloads that read the database before this change."""
+    pipe.incr(_generation_key(user_id))
+    pipe.expire(_generation_key(user_id), settings.FRIEND_GRAPH_CACHE_TTL)
+
+
+async def add_friend_edge(user_id: int, friend_id: int):
+    """Record an accepted friendship in both users' sets."""
+    if not _use_cache():
+        return
+    pipe = redis_client.pipeline(transaction=True)
+    for owner, member in ((user_id, friend_id), (friend_id, user_id)):
+        key = _friends_key(owner)
+        pipe.sadd(key, str(member))
+        pipe.expire(key, settings.FRIEND_GRAPH_CACHE_TTL)
+        _bump_generation(pipe, owner)
+    await pipe.execute()
+
+
+async def remove_friend_edge(user_id: int, friend_id: int):
+    """Drop a friendship (removed, rejected or cancelled) from both users' sets."""
+    if not _use_cache():
+        return
+    pipe = redis_client.pipeline(transaction=True)
+    for owner, member in ((user_id, friend_id), (friend_id, user_id)):
+        pipe.srem(_friends_key(owner), str(member))
+        _bump_generation(pipe, owner)
+    results = await pipe.execute()
+    if results is not None:
+        return
+
+    # are_friends gates access: without the SREM, drop both sets so the next
+    # lookup reloads them from the database
+    deleted = [await redis_client.delete(_friends_key(owner)) for owner in (user_id, friend_id)]
+    if any(result is False for result in deleted):
+        logger.error(
+            f"❌ Could not drop friendship {user_id}<->{friend_id} from the friend graph; "
+            f"it may be served for up to {settings.FRIEND_GRAPH_CACHE_TTL}s"
+        )
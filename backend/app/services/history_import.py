@@ -0,0 +1,307 @@
+# ============================================================================
+# FILE: backend/app/services/history_import.py (BULK IMPORT VIA COPY)
+# ============================================================================
+"""
+Bulk prayer history import.
+
+Pipeline:
+1. Parse + validate the uploaded CSV/NDJSON line by line (never fully in
+   memory), one batch at a time in a worker thread (off the event loop).
+2. COPY valid rows into a temporary staging table (asyncpg copy_records_to_table).
+3. Merge staging into prayer_logs with ONE set-based upsert.
+4. Recompute the user's streak record once.
+
+The accepted columns match /prayers/export, so an export can be re-imported.
+"""
+import asyncio
+import csv
+import gzip
+import io
+import itertools
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.prayer import PrayerStreak, lock_user_log_changes
+from app.services.streak_cache import invalidate_streak_cache
+from app.services.prayer_groups import get_user_group_ids, rebuild_group_progress
+
+logger = logging.getLogger(__name__)
+
+VALID_PRAYERS = {name.lower(): name for name in ['Fajr', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']}
+IMPORT_MAX_ROWS = 100000
+IMPORT_COPY_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 20
+
+STAGING_TABLE = "prayer_import_staging"
+STAGING_COLUMNS = [
+    "line_no", "prayer_name", "prayer_date", "prayer_time",
+    "completed", "on_time", "completed_at",
+]
+
+TRUE_VALUES = {"true", "1", "yes", "y", "t"}
+FALSE_VALUES = {"false", "0", "no", "n", "f", ""}
+
+
+class ImportValidationError(ValueError):
+    """Raised when the file as a whole cannot be imported."""
+
+
+# ============================================================================
+# PARSING / VALIDATION
+# ============================================================================
+def _parse_bool(value: Any, default: bool) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    normalized = str(value).strip().lower()
+    if normalized in TRUE_VALUES:
+        return True
+    if normalized in FALSE_VALUES:
+        return False
+    raise ValueError(f"invalid boolean '{value}'")
+
+
+def _parse_record(raw: Dict[str, Any], line_no: int, today: str) -> Tuple:
+    """Validate one input record and return a staging row."""
+    name = VALID_PRAYERS.get(str(raw.get("prayer_name") or "").strip().lower())
+    if not name:
+        raise ValueError(f"invalid prayer_name '{raw.get('prayer_name')}'")
+
+    prayer_date = str(raw.get("prayer_date") or "").strip()
+    try:
+        datetime.strptime(prayer_date, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"invalid prayer_date '{prayer_date}'")
+    if prayer_date > today:
+        raise ValueError(f"prayer_date {prayer_date} is in the future")
+
+    prayer_time = str(raw.get("prayer_time") or "00:00").strip()[:5]
+    try:
+        datetime.strptime(prayer_time, "%H:%M")
+    except ValueError:
+        raise ValueError(f"invalid prayer_time '{prayer_time}'")
+
+    completed = _parse_bool(raw.get("completed"), True)
+    on_time = _parse_bool(raw.get("on_time"), False)
+
+    completed_at = None
+    if completed and raw.get("completed_at"):
+        try:
+            completed_at = datetime.fromisoformat(str(raw["completed_at"]).strip())
+        except ValueError:
+            raise ValueError(f"invalid completed_at '{raw['completed_at']}'")
+        if completed_at.tzinfo is None:
+            completed_at = completed_at.replace(tzinfo=timezone.utc)
+
+    return (line_no, name, prayer_date, prayer_time, completed, on_time, completed_at)
+
+
+def _iter_raw_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        for line_no, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            yield line_no, record
+
+
+def iter_import_rows(lines: Iterable[str], fmt: str, report: Dict[str, Any]) -> Iterator[Tuple]:
+    """
+    Stream validated staging rows out of an input file.
+    Invalid rows are skipped, counted in report['rejected'] and the first
+    few are described in report['errors'].
+    """
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    rows = 0
+    for line_no, record in _iter_raw_records(lines, fmt):
+        rows += 1
+        if rows > IMPORT_MAX_ROWS:
+            raise ImportValidationError(f"File exceeds the limit of {IMPORT_MAX_ROWS} rows")
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("not a JSON object")
+            yield _parse_record(record, line_no, today)
+        except ValueError as e:
+            report["rejected"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append(f"line {line_no}: {e}")
+
+
+# ============================================================================
+# LOAD + MERGE
+# ============================================================================
+MERGE_SQL = f"""
+WITH latest AS (
+    -- Last occurrence in the file wins when a prayer appears twice
+    SELECT DISTINCT ON (prayer_name, prayer_date)
+        prayer_name, prayer_date, prayer_time, completed, on_time, completed_at
+    FROM {STAGING_TABLE}
+    ORDER BY prayer_name, prayer_date, line_no DESC
+),
+merged AS (
+    INSERT INTO prayer_logs (
+        user_id, prayer_name, prayer_date, prayer_time, completed, on_time, completed_at
+    )
+    SELECT :user_id, prayer_name, prayer_date, prayer_time, completed, on_time, completed_at
+    FROM latest
+    ON CONFLICT (user_id, prayer_name, prayer_date) DO UPDATE SET
+        prayer_time = EXCLUDED.prayer_time,
+        completed = EXCLUDED.completed,
+        on_time = EXCLUDED.on_time,
+        completed_at = EXCLUDED.completed_at,
+        updated_at = now(),
+        change_seq = nextval('prayer_log_change_seq')
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT
+    COUNT(*) FILTER (WHERE inserted) AS inserted,
+    COUNT(*) FILTER (WHERE NOT inserted) AS updated
+FROM merged
+"""
+
+BEST_STREAK_SQL = """
+WITH perfect_days AS (
+    SELECT prayer_date::DATE AS day
+    FROM prayer_logs
+    WHERE user_id = :user_id AND completed = true
+    GROUP BY prayer_date
+    HAVING COUNT(*) = 5
+)
+SELECT COALESCE(MAX(length), 0) FROM (
+    SELECT COUNT(*) AS length
+    FROM (
+        SELECT day - (ROW_NUMBER() OVER (ORDER BY day))::INT AS grp
+        FROM perfect_days
+    ) islands
+    GROUP BY grp
+) runs
+"""
+
+
+def _next_batch(rows: Iterator[Tuple]) -> List[Tuple]:
+    return list(itertools.islice(rows, IMPORT_COPY_BATCH_SIZE))
+
+
+async def _copy_in_batches(driver_conn, rows: Iterator[Tuple]) -> int:
+    total = 0
+    while True:
+        # Decompressing + parsing is synchronous CPU work: pull each batch
+        # from the iterator in a worker thread so the event loop keeps serving
+        batch = await asyncio.to_thread(_next_batch, rows)
+        if not batch:
+            return total
+        await driver_conn.copy_records_to_table(STAGING_TABLE, records=batch, columns=STAGING_COLUMNS)
+        total += len(batch)
+
+
+async def _recompute_streak(user_id: int, db: AsyncSession):
+    """Recompute current and best streak once, after the whole import."""
+    # Imported lazily: prayers.py depends on services, not the other way round
+    from app.api.v1.endpoints.prayers import calculate_prayer_streak_optimized
+
+    current_streak = await calculate_prayer_streak_optimized(user_id, db)
+    best_streak = (await db.execute(text(BEST_STREAK_SQL), {"user_id": user_id})).scalar() or 0
+
+    result = await db.execute(
+        select(PrayerStreak).filter(PrayerStreak.user_id == user_id).with_for_update()
+    )
+    streak_record = result.scalars().first()
+    if not streak_record:
+        streak_record = PrayerStreak(user_id=user_id, current_streak=0, best_streak=0)
+        db.add(streak_record)
+
+    streak_record.current_streak = current_streak
+    streak_record.best_streak = max(streak_record.best_streak or 0, best_streak, current_streak)
+    streak_record.last_prayer_date = datetime.utcnow().strftime("%Y-%m-%d")
+    return streak_record
+
+
+async def import_prayer_history(
+    user_id: int,
+    lines: Iterable[str],
+    fmt: str,
+    db: AsyncSession
+) -> Dict[str, Any]:
+    """
+    Validate, COPY and merge a prayer history file for one user (single transaction).
+    Requires PostgreSQL (asyncpg).
+    """
+    if db.bind.dialect.name != "postgresql":
+        raise ImportValidationError("Bulk import requires PostgreSQL")
+
+    report: Dict[str, Any] = {"rejected": 0, "errors": []}
+    conn = await db.connection()
+    raw_conn = await conn.get_raw_connection()
+    driver_conn = raw_conn.driver_connection
+
+    await db.execute(text(f"""
+        CREATE TEMP TABLE {STAGING_TABLE} (
+            line_no INTEGER NOT NULL,
+            prayer_name VARCHAR(20) NOT NULL,
+            prayer_date VARCHAR(10) NOT NULL,
+            prayer_time VARCHAR(5) NOT NULL,
+            completed BOOLEAN NOT NULL,
+            on_time BOOLEAN NOT NULL,
+            completed_at TIMESTAMPTZ
+        ) ON COMMIT DROP
+    """))
+
+    staged = await _copy_in_batches(driver_conn, iter_import_rows(lines, fmt, report))
+
+    inserted = updated = 0
+    if staged:
+        await lock_user_log_changes(db, user_id)
+        counts = (await db.execute(text(MERGE_SQL), {"user_id": user_id})).first()
+        inserted, updated = counts.inserted, counts.updated
+        streak_record = await _recompute_streak(user_id, db)
+
+        # Imported days may change circle aggregates: rebuild only that range
+        group_ids = await get_user_group_ids(db, user_id)
+        if group_ids:
+            span = (await db.execute(text(
+                f"SELECT MIN(prayer_date) AS date_from, MAX(prayer_date) AS date_to FROM {STAGING_TABLE}"
+            ))).first()
+            await rebuild_group_progress(db, group_ids, span.date_from, span.date_to)
+    else:
+        streak_record = None
+
+    await db.commit()
+    if streak_record:
+        await invalidate_streak_cache(user_id)
+
+    logger.info(
+        f"📥 Imported history for user {user_id}: {staged} rows staged, "
+        f"{inserted} inserted, {updated} updated, {report['rejected']} rejected"
+    )
+
+    return {
+        "rows_imported": staged,
+        "inserted": inserted,
+        "updated": updated,
+        "rejected": report["rejected"],
+        "errors": report["errors"],
+        "current_streak": streak_record.current_streak if streak_record else None,
+        "best_streak": streak_record.best_streak if streak_record else None,
+    }
+
+
+def open_import_lines(binary_file, filename: Optional[str]) -> Iterable[str]:
+    """Wrap an uploaded binary file (optionally .gz) as a text line iterator."""
+    if filename and filename.endswith(".gz"):
+        binary_file = gzip.GzipFile(fileobj=binary_file)
+    return io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
@@ -0,0 +1,174 @@
+# ============================================================================
+# FILE: backend/app/services/notification_digest.py (DEDUP + DIGEST WINDOWS)
+# ============================================================================
+"""
+Notification coalescing for friend milestone pushes.
+
+- Dedup: each (actor, milestone, date) is claimed once in Redis, so toggling
+  a prayer off and on again never re-notifies friends.
+- Digest: milestone events for a recipient are buffered for
+  NOTIFICATION_DIGEST_WINDOW seconds, then sent as a single push
+  ("Ali and 2 other friends completed their prayers today!").
+"""
+import json
+import logging
+from typing import Any, Dict
+
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.job_queue import is_queue_available, enqueue_delayed_job
+from app.core.redis import redis_client
+from app.models.user import User
+from app.services.push_notification_service import push_service, get_translation
+from app.services.push_devices import get_push_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def _dedup_key(actor_id: int, milestone: str, date: str) -> str:
+    return f"notif:dedup:{actor_id}:{milestone}:{date}"
+
+
+def _digest_key(recipient_id: int) -> str:
+    return f"notif:digest:{recipient_id}"
+
+
+def _digest_scheduled_key(recipient_id: int) -> str:
+    return f"notif:digest:scheduled:{recipient_id}"
+
+
+# ============================================================================
+# DEDUP
+# ============================================================================
+async def claim_milestone(actor_id: int, milestone: str, date: str) -> bool:
+    """
+    Claim the right to notify about (actor, milestone, date).
+    Returns False if it was already claimed (notification already sent).
+    """
+    return bool(await redis_client.set(
+        _dedup_key(actor_id, milestone, date),
+        "1",
+        ex=settings.NOTIFICATION_DEDUP_TTL,
+        nx=True
+    ))
+
+
+async def release_milestone(actor_id: int, milestone: str, date: str):
+    """Release a claim so a failed (and retried) job can send again."""
+    await redis_client.delete(_dedup_key(actor_id, milestone, date))
+
+
+# ============================================================================
+# DIGEST
+# ============================================================================
+def is_digest_available() -> bool:
+    """Digests need the job worker to send the delayed flush."""
+    return settings.NOTIFICATION_DIGEST_ENABLED and is_queue_available()
+
+
+async def add_to_digest(recipient_id: int, event: Dict[str, Any]) -> bool:
+    """
+    Buffer a milestone event for a recipient.
+    The first event in a window schedules the flush job.
+    Returns False if the event could not be buffered (caller sends directly).
+    """
+    window = settings.NOTIFICATION_DIGEST_WINDOW
+    key = _digest_key(recipient_id)
+
+    # One round trip: buffer, cap the lifetime of leftovers from a lost
+    # flush, and claim the right to schedule this window's flush
+    results = await (
+        redis_client.pipeline()
+        .rpush(key, json.dumps(event))
+        .expire(key, window * 4)
+        .set(_digest_scheduled_key(recipient_id), "1", ex=window, nx=True)
+        .execute()
+    )
+    if not results or not results[0]:
+        return False
+
+    if results[2]:
+        if not await enqueue_delayed_job("notification_digest", window, recipient_id=recipient_id):
+            logger.error(f"Failed to schedule digest for user {recipient_id}")
+            await redis_client.delete(_digest_scheduled_key(recipient_id))
+    return True
+
+
+def _render_digest(events: list, lang: str) -> Dict[str, str]:
+    """Render one push for all buffered events (one line per friend, highest milestone wins)."""
+    by_actor: Dict[int, Dict[str, Any]] = {}
+    for event in events:
+        current = by_actor.get(event['actor_id'])
+        if current is None or event['completed_count'] > current['completed_count']:
+            by_actor[event['actor_id']] = event
+
+    actors = sorted(by_actor.values(), key=lambda e: e['completed_count'], reverse=True)
+    first = actors[0]
+
+    if len(actors) == 1:
+        return get_translation(
+            f"friend_prayer_{first['completed_count']}",
+            lang,
+            name=first['actor_name']
+        )
+    if len(actors) == 2:
+        return get_translation(
+            'friend_prayer_digest_2',
+            lang,
+            name=first['actor_name'],
+            other=actors[1]['actor_name']
+        )
+    return get_translation(
+        'friend_prayer_digest',
+        lang,
+        name=first['actor_name'],
+        count=len(actors) - 1
+    )
+
+
+async def send_notification_digest(recipient_id: int):
+    """
+    Job handler: flush a recipient's buffered milestone events as one push.
+    The events are only removed once handled, so a failed attempt is retried
+    with the same digest; events buffered meanwhile stay for the next flush.
+    """
+    key = _digest_key(recipient_id)
+    raw_events = await redis_client.lrange(key, 0, -1, raise_errors=True)
+    if not raw_events:
+        return
+
+    await _deliver_digest(recipient_id, [json.loads(raw) for raw in raw_events])
+    await redis_client.ltrim(key, len(raw_events), -1)
+
+
+async def _deliver_digest(recipient_id: int, events: list):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User).filter(User.id == recipient_id))
+        recipient = result.scalars().first()
+        tokens = (await get_push_tokens(db, [recipient_id])).get(recipient_id)
+
+    if not recipient or not recipient.is_active or not tokens:
+        return
+
+    prefs = recipient.notification_preferences or {}
+    if not prefs.get('friend_prayers', True):
+        return
+
+    content = _render_digest(events, recipient.preferred_language or 'en')
+    data = {
+        'type': 'friend_prayer_digest',
+        'friend_ids': sorted({e['actor_id'] for e in events}),
+    }
+    # Errors propagate so the job is retried with the events still buffered
+    tickets = await push_service.send_batch_with_tickets([
+        {'push_token': token, 'title': content['title'], 'body': content['body'], 'data': data}
+        for token in tokens
+    ])
+    if tickets and all(
+        ticket is not None and (ticket.get('details') or {}).get('error') == 'DeliveryFailed'
+        for ticket in tickets
+    ):
+        raise RuntimeError(f"Digest for user {recipient_id} reached none of its devices")
+    logger.info(f"📤 Sent digest of {len(events)} events to user {recipient_id}")
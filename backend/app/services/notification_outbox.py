@@ -0,0 +1,177 @@
+# ============================================================================
+# FILE: backend/app/services/notification_outbox.py (TRANSACTIONAL OUTBOX)
+# ============================================================================
+"""
+Transactional outbox for push notifications.
+
+1. Endpoints call add_outbox_notification() BEFORE db.commit(), so the
+   notification is stored atomically with the domain change.
+2. The relay (run_outbox_relay in the job worker, or relay_outbox_once as a
+   BackgroundTasks fallback) claims due rows with FOR UPDATE SKIP LOCKED,
+   renders them in the recipient's language, sends them in one batch and
+   deletes them in the same transaction.
+
+Several relays can run concurrently: SKIP LOCKED hands each one a disjoint
+batch. Rows whose chunk never reached Expo are retried with backoff.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import BackgroundTasks
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.job_queue import is_queue_available
+from app.models.notification import NotificationOutbox
+from app.services.push_notification_service import push_service, get_translation
+from app.services.push_devices import get_push_tokens
+
+logger = logging.getLogger(__name__)
+
+CLAIM_BATCH_SQL = text("""
+SELECT o.id, o.recipient_id, o.kind, o.params, o.data, o.preference, o.attempts,
+       u.preferred_language, u.notification_preferences, u.is_active
+FROM notification_outbox o
+JOIN users u ON u.id = o.recipient_id
+WHERE o.available_at <= now()
+ORDER BY o.id
+LIMIT :limit
+FOR UPDATE OF o SKIP LOCKED
+""")
+
+DELETE_ROWS_SQL = text("DELETE FROM notification_outbox WHERE id = ANY(:ids)")
+
+RETRY_ROWS_SQL = text("""
+UPDATE notification_outbox
+SET attempts = attempts + 1,
+    available_at = now() + make_interval(secs => CAST(:base_delay AS DOUBLE PRECISION) * power(2, attempts))
+WHERE id = ANY(:ids)
+""")
+
+
+def add_outbox_notification(
+    db: AsyncSession,
+    recipient_id: int,
+    kind: str,
+    params: Optional[Dict[str, Any]] = None,
+    data: Optional[Dict[str, Any]] = None,
+    preference: Optional[str] = None
+):
+    """Stage a push in the caller's transaction (sent once the caller commits)."""
+    db.add(NotificationOutbox(
+        recipient_id=recipient_id,
+        kind=kind,
+        params=params or {},
+        data=data or {},
+        preference=preference
+    ))
+
+
+def schedule_outbox_relay(background_tasks: BackgroundTasks):
+    """
+    Without the job worker nothing drains the outbox, so relay in-process
+    after the response. With the worker running this is a no-op.
+    """
+    if not is_queue_available():
+        background_tasks.add_task(relay_outbox_once)
+
+
+def _is_deliverable(row, tokens) -> bool:
+    if not row.is_active or not tokens:
+        return False
+    if row.preference:
+        prefs = row.notification_preferences or {}
+        return prefs.get(row.preference, True)
+    return True
+
+
+async def relay_outbox_batch(db: AsyncSession) -> int:
+    """Claim, send and settle one batch. Returns the number of rows claimed."""
+    rows = (await db.execute(CLAIM_BATCH_SQL, {"limit": settings.OUTBOX_BATCH_SIZE})).all()
+    if not rows:
+        await db.commit()
+        return 0
+
+    device_tokens = await get_push_tokens(db, {row.recipient_id for row in rows})
+
+    done_ids = []
+    notifications = []
+    owners = []
+    for row in rows:
+        tokens = device_tokens.get(row.recipient_id)
+        if not _is_deliverable(row, tokens):
+            done_ids.append(row.id)
+            continue
+        content = get_translation(row.kind, row.preferred_language or 'en', **(row.params or {}))
+        for token in tokens:
+            notifications.append({
+                'push_token': token,
+                'title': content['title'],
+                'body': content['body'],
+                'data': row.data or {},
+            })
+            owners.append(row)
+
+    retry_ids = []
+    if notifications:
+        tickets = await push_service.send_batch_with_tickets(notifications)
+
+        # A row is retried only if none of its devices could be reached
+        reached: Dict[int, Tuple[Any, bool]] = {}
+        for row, ticket in zip(owners, tickets):
+            failed = ticket is not None and (ticket.get('details') or {}).get('error') == 'DeliveryFailed'
+            _, any_reached = reached.get(row.id, (row, False))
+            reached[row.id] = (row, any_reached or not failed)
+
+        for row, any_reached in reached.values():
+            if not any_reached and row.attempts + 1 < settings.OUTBOX_MAX_ATTEMPTS:
+                retry_ids.append(row.id)
+            else:
+                if not any_reached:
+                    logger.warning(f"☠️  Outbox notification {row.id} dropped after {row.attempts + 1} attempts")
+                done_ids.append(row.id)
+
+    if done_ids:
+        await db.execute(DELETE_ROWS_SQL, {"ids": done_ids})
+    if retry_ids:
+        await db.execute(RETRY_ROWS_SQL, {
+            "ids": retry_ids,
+            "base_delay": settings.OUTBOX_RETRY_BASE_DELAY,
+        })
+    await db.commit()
+
+    logger.info(f"📬 Outbox relayed {len(rows)} rows ({len(retry_ids)} to retry)")
+    return len(rows)
+
+
+async def relay_outbox_once():
+    """Drain everything currently due (BackgroundTasks fallback)."""
+    try:
+        async with AsyncSessionLocal() as db:
+            while await relay_outbox_batch(db) == settings.OUTBOX_BATCH_SIZE:
+                pass
+    except Exception as e:
+        logger.error(f"Outbox relay error: {e}", exc_info=True)
+
+
+async def run_outbox_relay(stopping: asyncio.Event):
+    """Long-running relay loop (started by the job worker)."""
+    logger.info("📬 Outbox relay started")
+    while not stopping.is_set():
+        claimed = 0
+        try:
+            async with AsyncSessionLocal() as db:
+                claimed = await relay_outbox_batch(db)
+        except Exception as e:
+            logger.error(f"Outbox relay error: {e}", exc_info=True)
+
+        # Full batch: more is probably waiting, go again immediately
+        if claimed < settings.OUTBOX_BATCH_SIZE:
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=settings.OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    logger.info("📬 Outbox relay stopped")
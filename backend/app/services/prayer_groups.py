@@ -0,0 +1,258 @@
+# ============================================================================
+# FILE: backend/app/services/prayer_groups.py (CIRCLE AGGREGATES + FAN-OUT)
+# ============================================================================
+"""
+Prayer circle aggregates and notifications.
+
+Aggregates: prayer_group_daily_progress holds, per (group, day), the sum of
+completed prayers and the number of members who completed all 5. Each prayer
+event applies a +1/-1 delta to every group of the user in ONE statement,
+inside the request's transaction, so dashboards never scan member logs.
+Membership changes and bulk imports rebuild only the affected rows.
+
+Notifications: instead of one push per member event (O(members^2) per day),
+a group is notified when half of its members, and then all of them, completed
+all 5 prayers. Recipients are streamed in keyset batches.
+"""
+import logging
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import BackgroundTasks
+from sqlalchemy import text, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.job_queue import enqueue_job
+from app.models.group import PrayerGroup, GroupMember
+from app.models.user import User
+from app.services.notification_digest import claim_milestone, release_milestone
+from app.services.push_devices import get_push_tokens
+from app.services.push_notification_service import push_service, get_translation
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# INCREMENTAL AGGREGATES
+# ============================================================================
+APPLY_DELTA_SQL = text("""
+WITH day AS (
+    SELECT COUNT(*) FILTER (WHERE completed = true) AS n
+    FROM prayer_logs
+    WHERE user_id = :user_id AND prayer_date = :prayer_date
+),
+delta AS (
+    SELECT
+        CAST(:prayer_delta AS INTEGER) AS prayers,
+        CASE
+            WHEN CAST(:prayer_delta AS INTEGER) > 0 AND day.n = 5 THEN 1
+            WHEN CAST(:prayer_delta AS INTEGER) < 0 AND day.n = 4 THEN -1
+            ELSE 0
+        END AS full_days
+    FROM day
+),
+upserted AS (
+    INSERT INTO prayer_group_daily_progress
+        (group_id, prayer_date, completed_prayers, members_completed_all, updated_at)
+    SELECT m.group_id, CAST(:prayer_date AS VARCHAR), GREATEST(delta.prayers, 0), GREATEST(delta.full_days, 0), now()
+    FROM prayer_group_members m, delta
+    WHERE m.user_id = :user_id
+      -- Days before the user joined were never counted for that group
+      AND (m.joined_at AT TIME ZONE 'UTC')::date <= CAST(:prayer_date AS DATE)
+    ON CONFLICT (group_id, prayer_date) DO UPDATE SET
+        completed_prayers = GREATEST(
+            prayer_group_daily_progress.completed_prayers + (SELECT prayers FROM delta), 0),
+        members_completed_all = GREATEST(
+            prayer_group_daily_progress.members_completed_all + (SELECT full_days FROM delta), 0),
+        updated_at = now()
+    RETURNING group_id, members_completed_all
+)
+SELECT u.group_id, u.members_completed_all, g.member_count, g.name, (SELECT full_days FROM delta) AS full_delta
+FROM upserted u
+JOIN prayer_groups g ON g.id = u.group_id
+""")
+
+REBUILD_DELETE_SQL = text("""
+DELETE FROM prayer_group_daily_progress
+WHERE group_id = ANY(:group_ids) AND prayer_date BETWEEN :date_from AND :date_to
+""")
+
+REBUILD_INSERT_SQL = text("""
+INSERT INTO prayer_group_daily_progress
+    (group_id, prayer_date, completed_prayers, members_completed_all, updated_at)
+SELECT m.group_id, d.prayer_date, SUM(d.n), COUNT(*) FILTER (WHERE d.n = 5), now()
+FROM prayer_group_members m
+JOIN (
+    SELECT user_id, prayer_date, COUNT(*) FILTER (WHERE completed = true) AS n
+    FROM prayer_logs
+    WHERE prayer_date BETWEEN :date_from AND :date_to
+      AND user_id IN (SELECT user_id FROM prayer_group_members WHERE group_id = ANY(:group_ids))
+    GROUP BY user_id, prayer_date
+) d ON d.user_id = m.user_id
+WHERE m.group_id = ANY(:group_ids)
+  AND (m.joined_at AT TIME ZONE 'UTC')::date <= CAST(d.prayer_date AS DATE)
+GROUP BY m.group_id, d.prayer_date
+""")
+
+
+def _group_milestone(members_completed_all: int, member_count: int) -> Optional[str]:
+    """The milestone reached exactly at this count, if any."""
+    if member_count < settings.GROUP_NOTIFY_MIN_MEMBERS:
+        return None
+    if members_completed_all == member_count:
+        return "group_all"
+    if members_completed_all == (member_count + 1) // 2:
+        return "group_half"
+    return None
+
+
+async def record_prayer_change(
+    db: AsyncSession,
+    user_id: int,
+    prayer_date: str,
+    was_completed: bool,
+    is_completed: bool
+) -> List[Tuple[int, str]]:
+    """
+    Apply one prayer event to all of the user's groups (call after flush,
+    before commit). Returns the (group_id, milestone) pairs reached, to be
+    passed to schedule_group_notifications once the caller has committed.
+    """
+    if was_completed == is_completed:
+        return []
+
+    result = await db.execute(APPLY_DELTA_SQL, {
+        "user_id": user_id,
+        "prayer_date": prayer_date,
+        "prayer_delta": 1 if is_completed else -1,
+    })
+    rows = result.all()
+
+    # Only today's progress is worth a push
+    if prayer_date != datetime.utcnow().strftime("%Y-%m-%d"):
+        return []
+
+    reached = []
+    for row in rows:
+        if row.full_delta <= 0:
+            continue
+        milestone = _group_milestone(row.members_completed_all, row.member_count)
+        if milestone:
+            reached.append((row.group_id, milestone))
+    return reached
+
+
+async def rebuild_group_progress(
+    db: AsyncSession,
+    group_ids: Iterable[int],
+    date_from: str,
+    date_to: str
+):
+    """Recompute aggregates for some groups over a date range (caller commits)."""
+    group_ids = list(group_ids)
+    if not group_ids:
+        return
+    params = {"group_ids": group_ids, "date_from": date_from, "date_to": date_to}
+    await db.execute(REBUILD_DELETE_SQL, params)
+    await db.execute(REBUILD_INSERT_SQL, params)
+
+
+async def refresh_today_progress(db: AsyncSession, group_id: int):
+    """Membership changed: today's aggregate must reflect the new member set."""
+    today_str = datetime.utcnow().strftime("%Y-%m-%d")
+    await rebuild_group_progress(db, [group_id], today_str, today_str)
+
+
+async def get_user_group_ids(db: AsyncSession, user_id: int) -> List[int]:
+    result = await db.execute(select(GroupMember.group_id).filter(GroupMember.user_id == user_id))
+    return list(result.scalars().all())
+
+
+# ============================================================================
+# BATCHED GROUP FAN-OUT
+# ============================================================================
+async def schedule_group_notifications(
+    background_tasks: BackgroundTasks,
+    milestones: List[Tuple[int, str]],
+    prayer_date: str
+):
+    """Hand reached group milestones to the job queue (BackgroundTasks fallback)."""
+    for group_id, milestone in milestones:
+        if not await enqueue_job(
+            "group_milestone",
+            group_id=group_id,
+            milestone=milestone,
+            prayer_date=prayer_date
+        ):
+            background_tasks.add_task(notify_group_milestone, group_id, milestone, prayer_date)
+
+
+async def notify_group_milestone(group_id: int, milestone: str, prayer_date: str):
+    """
+    Job handler: push a group milestone to all members, GROUP_FANOUT_BATCH_SIZE
+    recipients per query and per push batch.
+    """
+    # Dedup: one push per (group, milestone, day) even if the count oscillates
+    if not await claim_milestone(group_id, milestone, prayer_date):
+        return
+
+    try:
+        async with AsyncSessionLocal() as db:
+            group = (await db.execute(
+                select(PrayerGroup).filter(PrayerGroup.id == group_id)
+            )).scalars().first()
+            if not group:
+                return
+
+            last_user_id = 0
+            total_sent = 0
+            while True:
+                query = (
+                    select(User.id, User.preferred_language, User.notification_preferences)
+                    .join(GroupMember, GroupMember.user_id == User.id)
+                    .filter(
+                        and_(
+                            GroupMember.group_id == group_id,
+                            User.id > last_user_id,
+                            User.is_active == True
+                        )
+                    )
+                    .order_by(User.id)
+                    .limit(settings.GROUP_FANOUT_BATCH_SIZE)
+                )
+                batch = (await db.execute(query)).all()
+                if not batch:
+                    break
+                last_user_id = batch[-1].id
+                device_tokens = await get_push_tokens(db, [member.id for member in batch])
+
+                notifications = []
+                for member in batch:
+                    tokens = device_tokens.get(member.id)
+                    prefs = member.notification_preferences or {}
+                    if not tokens or not prefs.get('group_prayers', True):
+                        continue
+                    content = get_translation(milestone, member.preferred_language or 'en', group=group.name)
+                    notifications.extend({
+                        'push_token': token,
+                        'title': content['title'],
+                        'body': content['body'],
+                        'data': {
+                            'type': 'group_milestone',
+                            'group_id': group_id,
+                            'milestone': milestone,
+                        },
+                    } for token in tokens)
+
+                if notifications:
+                    await push_service.send_batch_notifications(notifications)
+                    total_sent += len(notifications)
+
+        logger.info(f"📤 Group {group_id} {milestone} sent to {total_sent} members")
+
+    except Exception:
+        await release_milestone(group_id, milestone, prayer_date)
+        raise
@@ -0,0 +1,91 @@
+# ============================================================================
+# FILE: backend/app/services/push_devices.py (MULTI-DEVICE PUSH TOKENS)
+# ============================================================================
+"""
+Push device registry.
+
+Every sender resolves the tokens of ALL its recipients with one query
+(get_push_tokens) and fans a notification out to each active device.
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REGISTER_DEVICE_SQL = text("""
+INSERT INTO push_devices (user_id, token, platform, active, last_seen, created_at)
+VALUES (:user_id, :token, :platform, true, now(), now())
+ON CONFLICT (token) DO UPDATE SET
+    user_id = EXCLUDED.user_id,
+    platform = COALESCE(EXCLUDED.platform, push_devices.platform),
+    active = true,
+    last_seen = now()
+""")
+
+# Keep only the most recently seen devices active
+TRIM_DEVICES_SQL = text("""
+UPDATE push_devices SET active = false
+WHERE user_id = :user_id AND active = true AND id NOT IN (
+    SELECT id FROM push_devices
+    WHERE user_id = :user_id AND active = true
+    ORDER BY last_seen DESC
+    LIMIT :max_devices
+)
+""")
+
+UNREGISTER_DEVICE_SQL = text(
+    "UPDATE push_devices SET active = false WHERE user_id = :user_id AND token = :token"
+)
+
+ACTIVE_TOKENS_SQL = text(
+    "SELECT user_id, token FROM push_devices WHERE user_id = ANY(:user_ids) AND active = true"
+)
+
+DEACTIVATE_TOKENS_SQL = text(
+    "UPDATE push_devices SET active = false WHERE token = ANY(:tokens) AND active = true"
+)
+
+# users.push_token mirrors the latest device for API compatibility
+CLEAR_USER_TOKENS_SQL = text(
+    "UPDATE users SET push_token = NULL WHERE push_token = ANY(:tokens)"
+)
+
+
+async def register_device(db: AsyncSession, user_id: int, token: str, platform: Optional[str] = None):
+    """Add or refresh a device for the user (caller commits)."""
+    params = {"user_id": user_id, "token": token, "platform": platform}
+    await db.execute(REGISTER_DEVICE_SQL, params)
+    await db.execute(TRIM_DEVICES_SQL, {
+        "user_id": user_id,
+        "max_devices": settings.PUSH_MAX_DEVICES_PER_USER,
+    })
+
+
+async def unregister_device(db: AsyncSession, user_id: int, token: str):
+    """Stop pushing to one of the user's devices (caller commits)."""
+    await db.execute(UNREGISTER_DEVICE_SQL, {"user_id": user_id, "token": token})
+
+
+async def get_push_tokens(db: AsyncSession, user_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """Active tokens for a set of users, in one query: {user_id: [token, ...]}."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    result = await db.execute(ACTIVE_TOKENS_SQL, {"user_ids": user_ids})
+    tokens: Dict[int, List[str]] = defaultdict(list)
+    for row in result:
+        tokens[row.user_id].append(row.token)
+    return tokens
+
+
+async def deactivate_tokens(db: AsyncSession, tokens: List[str]) -> int:
+    """Deactivate dead tokens everywhere (caller commits). Returns devices affected."""
+    result = await db.execute(DEACTIVATE_TOKENS_SQL, {"tokens": tokens})
+    await db.execute(CLEAR_USER_TOKENS_SQL, {"tokens": tokens})
+    return result.rowcount
@@ -6,23 +6,22 @@ Expo Push Notification Service
 Sends push notifications to mobile devices via Expo.
 Includes i18n support for localized notifications.
 """
-from exponent_server_sdk import (
-    DeviceNotRegisteredError,
-    PushClient,
-    PushMessage,
-    PushServerError,
-    PushTicketError,
-)
-from requests.exceptions import ConnectionError, HTTPError
+import json
 import logging
-from typing import List, Dict, Optional
-from sqlalchemy.future import select
+import time
+from typing import Iterable, List, Dict, Optional
 from app.core.config import settings
 from app.core.database import AsyncSessionLocal
-from app.models.user import User
+from app.core.job_queue import is_queue_available
+from app.core.redis import redis_client
+from app.services.expo_push_client import ExpoPushClient
+from app.services.push_devices import deactivate_tokens
 
 logger = logging.getLogger(__name__)
 
+# Sorted set of {"id": ticket_id, "token": push_token}, scored by send time
+PUSH_TICKETS_KEY = "push:tickets"
+
 # ============================================================================
 # ✅ ADDED: TRANSLATION DICTIONARIES
 # ============================================================================
@@ -44,6 +43,14 @@ TRANSLATIONS = {
             'title': '🌟 Friend Prayer Update',
             'body': '{name} completed all 5 prayers today!'
         },
+        'friend_prayer_digest_2': {
+            'title': '🕌 Friend Prayer Update',
+            'body': '{name} and {other} completed their prayers today!'
+        },
+        'friend_prayer_digest': {
+            'title': '🕌 Friend Prayer Update',
+            'body': '{name} and {count} other friends completed their prayers today!'
+        },
         'friend_streak_7': {
             'title': '🔥 Streak Milestone',
             'body': '{name} reached a 7-day prayer streak!'
@@ -60,6 +67,26 @@ TRANSLATIONS = {
             'title': '🏆 Streak Milestone',
             'body': '{name} reached a 365-day prayer streak!'
         },
+        'group_half': {
+            'title': '🕌 {group}',
+            'body': 'Half of {group} completed all 5 prayers today!'
+        },
+        'group_all': {
+            'title': '🌟 {group}',
+            'body': 'Everyone in {group} completed all 5 prayers today!'
+        },
+        'ramadan_start': {
+            'title': '🌙 Ramadan Mubarak',
+            'body': 'Ramadan has begun. May it be a month of blessings and prayer.'
+        },
+        'eid_al_fitr': {
+            'title': '🎉 Eid al-Fitr Mubarak',
+            'body': 'Eid Mubarak! May Allah accept your fasting and prayers.'
+        },
+        'eid_al_adha': {
+            'title': '🐑 Eid al-Adha Mubarak',
+            'body': 'Eid Mubarak! Wishing you and your family a blessed Eid.'
+        },
     },
     'ar': {
         'friend_request': {
@@ -78,6 +105,14 @@ TRANSLATIONS = {
             'title': '🌟 تحديث صلاة الصديق',
             'body': 'أتم {name} الصلوات الخمس كلها اليوم!'
         },
+        'friend_prayer_digest_2': {
+            'title': '🕌 تحديث صلاة الأصدقاء',
+            'body': 'أتم {name} و{other} صلواتهم اليوم!'
+        },
+        'friend_prayer_digest': {
+            'title': '🕌 تحديث صلاة الأصدقاء',
+            'body': 'أتم {name} و{count} أصدقاء آخرون صلواتهم اليوم!'
+        },
         'friend_streak_7': {
             'title': '🔥 إنجاز السلسلة',
             'body': 'وصل {name} إلى سلسلة صلاة لمدة ٧ أيام!'
@@ -94,6 +129,26 @@ TRANSLATIONS = {
             'title': '🏆 إنجاز السلسلة',
             'body': 'وصل {name} إلى سلسلة صلاة لمدة ٣٦٥ يومًا!'
         },
+        'group_half': {
+            'title': '🕌 {group}',
+            'body': 'أتم نصف أعضاء {group} الصلوات الخمس كلها اليوم!'
+        },
+        'group_all': {
+            'title': '🌟 {group}',
+            'body': 'أتم جميع أعضاء {group} الصلوات الخمس كلها اليوم!'
+        },
+        'ramadan_start': {
+            'title': '🌙 رمضان مبارك',
+            'body': 'بدأ شهر رمضان. جعله الله شهر خير وبركة وصلاة.'
+        },
+        'eid_al_fitr': {
+            'title': '🎉 عيد فطر مبارك',
+            'body': 'عيد مبارك! تقبل الله صيامكم وصلاتكم.'
+        },
+        'eid_al_adha': {
+            'title': '🐑 عيد أضحى مبارك',
+            'body': 'عيد مبارك! أعاده الله عليكم وعلى أسرتكم بالخير والبركة.'
+        },
     },
     'tr': {
         'friend_request': {
@@ -112,6 +167,14 @@ TRANSLATIONS = {
             'title': '🌟 Arkadaş Namaz Güncellemesi',
             'body': '{name} bugün 5 namazı da kıldı!'
         },
+        'friend_prayer_digest_2': {
+            'title': '🕌 Arkadaş Namaz Güncellemesi',
+            'body': '{name} ve {other} bugün namazlarını kıldı!'
+        },
+        'friend_prayer_digest': {
+            'title': '🕌 Arkadaş Namaz Güncellemesi',
+            'body': '{name} ve {count} arkadaşın daha bugün namazlarını kıldı!'
+        },
         'friend_streak_7': {
             'title': '🔥 Seri Başarısı',
             'body': '{name} 7 günlük namaz serisine ulaştı!'
@@ -128,6 +191,26 @@ TRANSLATIONS = {
             'title': '🏆 Seri Başarısı',
             'body': '{name} 365 günlük namaz serisine ulaştı!'
         },
+        'group_half': {
+            'title': '🕌 {group}',
+            'body': '{group} üyelerinin yarısı bugün 5 namazı da kıldı!'
+        },
+        'group_all': {
+            'title': '🌟 {group}',
+            'body': '{group} üyelerinin hepsi bugün 5 namazı da kıldı!'
+        },
+        'ramadan_start': {
+            'title': '🌙 Hayırlı Ramazanlar',
+            'body': 'Ramazan ayı başladı. Bereketli ve ibadetle dolu bir ay dileriz.'
+        },
+        'eid_al_fitr': {
+            'title': '🎉 Ramazan Bayramınız Mübarek Olsun',
+            'body': 'Bayramınız mübarek olsun! Allah oruçlarınızı ve namazlarınızı kabul etsin.'
+        },
+        'eid_al_adha': {
+            'title': '🐑 Kurban Bayramınız Mübarek Olsun',
+            'body': 'Bayramınız mübarek olsun! Size ve ailenize hayırlı bayramlar.'
+        },
     }
 }
 
@@ -163,32 +246,57 @@ class PushNotificationService:
     """Service for sending push notifications via Expo"""
     
     def __init__(self):
-        self.client = PushClient()
+        self.client = ExpoPushClient()
+    
+    async def close(self):
+        await self.client.close()
     
-    async def _remove_invalid_token(self, push_token: str):
+    async def _remove_invalid_tokens(self, push_tokens: Iterable[str]):
         """
-        Remove invalid push token from database to prevent future errors.
-        ✅ FIXED: Uses AsyncSessionLocal for compatibility with async engine.
-        ✅ SAFETY: Handles case where multiple users might have the same token.
+        Deactivate dead push tokens (push_devices, by token) in one statement.
         """
+        tokens = list(set(push_tokens))
+        if not tokens:
+            return
         try:
             async with AsyncSessionLocal() as db:
-                # ✅ Async Query to find all users with this token
-                result = await db.execute(select(User).filter(User.push_token == push_token))
-                users = result.scalars().all()
-                
-                # Iterate and clear token for ALL matching users
-                for user in users:
-                    user.push_token = None
-                    logger.info(f"🗑️ Removed invalid push token for user {user.id}")
-                    # Need to add to session to track changes
-                    db.add(user)
-                
-                if users:
-                    await db.commit()
-                    
+                devices = await deactivate_tokens(db, tokens)
+                await db.commit()
+            logger.info(f"🗑️ Removed {len(tokens)} invalid push tokens ({devices} devices)")
         except Exception as e:
-            logger.error(f"Error removing invalid token: {e}")
+            logger.error(f"Error removing invalid tokens: {e}")
+
+    async def _store_tickets(self, messages: List[Dict], tickets: List[Dict]):
+        """Remember accepted tickets so their receipts can be polled later."""
+        if not is_queue_available():
+            return  # Nobody would poll them
+        now = time.time()
+        mapping = {
+            json.dumps({'id': ticket['id'], 'token': message['to']}): now
+            for message, ticket in zip(messages, tickets)
+            if ticket.get('status') == 'ok' and ticket.get('id')
+        }
+        if mapping:
+            await redis_client.zadd(PUSH_TICKETS_KEY, mapping)
+
+    async def _process_tickets(self, messages: List[Dict], tickets: List[Dict]) -> Dict[str, int]:
+        """Count results, prune DeviceNotRegistered tokens, store ticket ids."""
+        success_count = 0
+        dead_tokens = []
+        for message, ticket in zip(messages, tickets):
+            if ticket.get('status') == 'ok':
+                success_count += 1
+            elif self._is_device_not_registered(ticket):
+                dead_tokens.append(message['to'])
+
+        await self._remove_invalid_tokens(dead_tokens)
+        await self._store_tickets(messages, tickets)
+        return {'success': success_count, 'failed': len(messages) - success_count}
+
+    @staticmethod
+    def _is_device_not_registered(ticket: Dict) -> bool:
+        details = ticket.get('details') or {}
+        return details.get('error') == 'DeviceNotRegistered'
 
     async def send_notification(
         self,
@@ -209,110 +317,151 @@ class PushNotificationService:
                 return False
             
             # Create message
-            message = PushMessage(
-                to=push_token,
-                title=title,
-                body=body,
-                data=data or {},
-                sound=sound,
-                badge=badge,
-                channel_id="social", # Default to social channel for backend pushes
-            )
+            message = {
+                'to': push_token,
+                'title': title,
+                'body': body,
+                'data': data or {},
+                'sound': sound,
+                'channelId': "social",  # Default to social channel for backend pushes
+            }
+            if badge is not None:
+                message['badge'] = badge
             
-            # Send notification (Exponent SDK is sync, but we wrap logic in async def)
-            # In high-scale apps, consider running this in a thread pool:
-            # response = await loop.run_in_executor(None, self.client.publish, message)
-            response = self.client.publish(message)
+            # Non-blocking: pooled httpx.AsyncClient with retries
+            tickets = await self.client.send([message])
+            result = await self._process_tickets([message], tickets)
             
             # Check response
-            if response.status == 'ok':
+            if result['success']:
                 logger.info(f"✅ Notification sent: {title}")
                 return True
-            else:
-                logger.warning(f"⚠️  Notification error: {response.message}")
-                
-                if response.details and response.details.get('error') == 'DeviceNotRegistered':
-                    await self._remove_invalid_token(push_token)
-                    
-                return False
-                
-        except DeviceNotRegisteredError:
-            logger.warning(f"Device not registered: {push_token}")
-            await self._remove_invalid_token(push_token)
-            return False
             
-        except PushServerError as e:
-            logger.error(f"Push server error: {e}")
-            return False
-            
-        except (ConnectionError, HTTPError) as e:
-            logger.error(f"Network error: {e}")
+            logger.warning(f"⚠️  Notification error: {tickets[0].get('message')}")
             return False
             
         except Exception as e:
             logger.error(f"Unexpected error sending notification: {e}")
             return False
     
+    @staticmethod
+    def _build_message(notif: Dict) -> Optional[Dict]:
+        """Expo message for a notification dict, or None without a valid token."""
+        push_token = notif.get('push_token')
+        
+        if not push_token or not push_token.startswith('ExponentPushToken['):
+            return None
+        
+        return {
+            'to': push_token,
+            'title': notif.get('title'),
+            'body': notif.get('body'),
+            'data': notif.get('data', {}),
+            'sound': notif.get('sound', 'default'),
+            'channelId': "social",  # Default to social channel
+        }
+    
     async def send_batch_notifications(
         self,
         notifications: List[Dict]
     ) -> Dict[str, int]:
         """
         Send multiple notifications in batch (Async).
+        Chunked at 100 messages with bounded concurrency (see ExpoPushClient).
         """
-        messages = []
-        
-        for notif in notifications:
-            try:
-                push_token = notif.get('push_token')
-                
-                if not push_token or not push_token.startswith('ExponentPushToken['):
-                    continue
-                
-                message = PushMessage(
-                    to=push_token,
-                    title=notif.get('title'),
-                    body=notif.get('body'),
-                    data=notif.get('data', {}),
-                    sound=notif.get('sound', 'default'),
-                    channel_id="social", # Default to social channel
-                )
-                messages.append(message)
-                
-            except Exception as e:
-                logger.error(f"Error creating message: {e}")
-                continue
+        messages = [m for m in map(self._build_message, notifications) if m]
         
         if not messages:
             return {'success': 0, 'failed': 0}
         
         # Send batch
         try:
-            # Publish multiple is sync, but wrapped in async def
-            responses = self.client.publish_multiple(messages)
-            
-            success_count = 0
-            failed_count = 0
-            
-            for j, response in enumerate(responses):
-                if response.status == 'ok':
-                    success_count += 1
-                else:
-                    failed_count += 1
-                    if response.details and response.details.get('error') == 'DeviceNotRegistered':
-                        invalid_token = messages[j].to
-                        await self._remove_invalid_token(invalid_token)
+            tickets = await self.client.send(messages)
+            result = await self._process_tickets(messages, tickets)
             
             logger.info(
-                f"📤 Batch sent: {success_count} success, {failed_count} failed"
+                f"📤 Batch sent: {result['success']} success, {result['failed']} failed"
             )
             
-            return {'success': success_count, 'failed': failed_count}
+            return result
             
         except Exception as e:
             logger.error(f"Batch send error: {e}")
             return {'success': 0, 'failed': len(messages)}
 
+    async def send_batch_with_tickets(self, notifications: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Like send_batch_notifications, but returns one Expo ticket per input
+        notification (None when it had no valid push token). Errors propagate.
+        """
+        results: List[Optional[Dict]] = [None] * len(notifications)
+        positions, messages = [], []
+        for i, notif in enumerate(notifications):
+            message = self._build_message(notif)
+            if message:
+                positions.append(i)
+                messages.append(message)
+        
+        if messages:
+            tickets = await self.client.send(messages)
+            await self._process_tickets(messages, tickets)
+            for i, ticket in zip(positions, tickets):
+                results[i] = ticket
+        return results
+
+    async def poll_receipts(self) -> Dict[str, int]:
+        """
+        Fetch receipts for tickets older than PUSH_RECEIPT_DELAY, in bulk,
+        and clear every DeviceNotRegistered token with one UPDATE.
+        """
+        now = time.time()
+        # Expo keeps receipts for ~24h; anything older can never be resolved
+        await redis_client.zremrangebyscore(PUSH_TICKETS_KEY, 0, now - settings.PUSH_TICKET_TTL)
+
+        checked = 0
+        dead_tokens = set()
+        while True:
+            entries = await redis_client.zrangebyscore(
+                PUSH_TICKETS_KEY, 0, now - settings.PUSH_RECEIPT_DELAY,
+                num=settings.PUSH_RECEIPT_BATCH_SIZE
+            )
+            if not entries:
+                break
+
+            tickets = {}
+            for raw in entries:
+                try:
+                    entry = json.loads(raw)
+                    tickets[entry['id']] = (raw, entry['token'])
+                except (ValueError, KeyError):
+                    await redis_client.zrem(PUSH_TICKETS_KEY, raw)
+
+            receipts = await self.client.get_receipts(list(tickets))
+            for ticket_id, receipt in receipts.items():
+                if ticket_id in tickets and receipt.get('status') == 'error':
+                    if self._is_device_not_registered(receipt):
+                        dead_tokens.add(tickets[ticket_id][1])
+                    else:
+                        logger.warning(f"⚠️  Push receipt error: {receipt.get('message')}")
+
+            # Resolved receipts are done; unresolved ones are retried next run
+            resolved = [tickets[ticket_id][0] for ticket_id in receipts if ticket_id in tickets]
+            await redis_client.zrem(PUSH_TICKETS_KEY, *resolved)
+            checked += len(resolved)
+
+            if len(entries) < settings.PUSH_RECEIPT_BATCH_SIZE or not resolved:
+                break
+
+        await self._remove_invalid_tokens(dead_tokens)
+        if checked:
+            logger.info(f"🧾 Checked {checked} push receipts, {len(dead_tokens)} dead tokens")
+        return {'checked': checked, 'removed': len(dead_tokens)}
+
 
 # Singleton instance
-push_service = PushNotificationService()
\ No newline at end of file
+push_service = PushNotificationService()
+
+
+async def poll_push_receipts():
+    """Job handler (scheduled periodically by the worker)."""
+    await push_service.poll_receipts()
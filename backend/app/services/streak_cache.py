@@ -0,0 +1,118 @@
+# ============================================================================
+# FILE: backend/app/services/streak_cache.py (READ-ONLY STREAK LOOKUPS)
+# ============================================================================
+"""
+Read path for other users' streaks (friend screens).
+
+Reads never recompute or write:
+1. Redis snapshot (streak:{user_id}), at most STREAK_CACHE_TTL seconds old.
+2. Otherwise the maintained PrayerStreak row, which is then cached.
+
+A row older than STREAK_REPAIR_INTERVAL (or a missing row) is served as-is
+and a `streak_repair` job recomputes it in the background.
+"""
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.job_queue import enqueue_job
+from app.core.redis import redis_client
+from app.models.prayer import PrayerStreak
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_key(user_id: int) -> str:
+    return f"streak:{user_id}"
+
+
+def _repair_key(user_id: int) -> str:
+    return f"streak:repair:{user_id}"
+
+
+async def invalidate_streak_cache(user_id: int):
+    """Drop the cached snapshot after the streak row changed."""
+    await redis_client.delete(_cache_key(user_id))
+
+
+def _snapshot(record: Optional[PrayerStreak]) -> Dict[str, Any]:
+    if not record:
+        return {
+            "current_streak": 0,
+            "best_streak": 0,
+            "last_prayer_date": None,
+            "updated_at": None,
+        }
+    return {
+        "current_streak": record.current_streak,
+        "best_streak": record.best_streak,
+        "last_prayer_date": record.last_prayer_date,
+        "updated_at": record.updated_at.isoformat() if record.updated_at else None,
+    }
+
+
+def _needs_repair(record: Optional[PrayerStreak]) -> bool:
+    if not record or not record.updated_at:
+        return True
+    updated_at = record.updated_at
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    age = (datetime.now(timezone.utc) - updated_at).total_seconds()
+    return age > settings.STREAK_REPAIR_INTERVAL
+
+
+async def schedule_streak_repair(background_tasks: BackgroundTasks, user_id: int):
+    """
+    Queue a background recompute of a user's streak row.
+    At most one repair per user per STREAK_REPAIR_INTERVAL.
+    """
+    if not await redis_client.set(_repair_key(user_id), "1", ex=settings.STREAK_REPAIR_INTERVAL, nx=True):
+        return
+    if not await enqueue_job("streak_repair", user_id=user_id):
+        background_tasks.add_task(repair_user_streak, user_id)
+
+
+async def get_streak_snapshot(
+    user_id: int,
+    db: AsyncSession,
+    background_tasks: BackgroundTasks
+) -> Dict[str, Any]:
+    """Serve a user's streak without recomputing it or locking the row."""
+    cached = await redis_client.get(_cache_key(user_id))
+    if cached:
+        return json.loads(cached)
+
+    result = await db.execute(select(PrayerStreak).filter(PrayerStreak.user_id == user_id))
+    record = result.scalars().first()
+
+    if _needs_repair(record):
+        await schedule_streak_repair(background_tasks, user_id)
+
+    snapshot = _snapshot(record)
+    await redis_client.setex(_cache_key(user_id), settings.STREAK_CACHE_TTL, json.dumps(snapshot))
+    return snapshot
+
+
+async def repair_user_streak(user_id: int):
+    """
+    Job handler: recompute a user's streak row in its own transaction.
+    """
+    # Imported lazily: prayers.py depends on services, not the other way round
+    from app.api.v1.endpoints.prayers import update_user_streak
+
+    async with AsyncSessionLocal() as db:
+        current_streak = await update_user_streak(user_id, db)
+        if current_streak is None:
+            await db.rollback()
+            raise RuntimeError(f"Streak repair failed for user {user_id}")
+        await db.commit()
+
+    await invalidate_streak_cache(user_id)
+    logger.info(f"🔧 Repaired streak for user {user_id}: {current_streak}")
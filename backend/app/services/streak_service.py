@@ -4,12 +4,11 @@
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from sqlalchemy import and_, or_
 
 # ✅ FIXED: Missing User import added
 from app.models.user import User
-from app.models.friendship import Friendship, FriendshipStatus
+from app.services.friend_graph import get_friend_ids
+from app.services.push_devices import get_push_tokens
 # ✅ FIXED: Import get_translation for i18n
 from app.services.push_notification_service import push_service, get_translation
 
@@ -32,37 +31,25 @@ async def notify_streak_milestone(
         return
     
     try:
-        # Get user's accepted friends
-        query = select(Friendship).options(
-            selectinload(Friendship.user),
-            selectinload(Friendship.friend)
-        ).filter(
-            and_(
-                or_(
-                    Friendship.user_id == user_id,
-                    Friendship.friend_id == user_id
-                ),
-                Friendship.status == FriendshipStatus.ACCEPTED
-            )
-        )
-        result = await db.execute(query)
-        friendships = result.scalars().all()
-        
-        if not friendships:
+        # Get user's accepted friends (ids from the Redis friend set)
+        friend_ids = await get_friend_ids(db, user_id)
+        if not friend_ids:
             return
         
+        result = await db.execute(select(User).filter(User.id.in_(friend_ids)))
+        friend_users = result.scalars().all()
+        device_tokens = await get_push_tokens(db, friend_ids)
+        
         # Prepare notifications
         notifications = []
         
         # Determine notification key for translation lookup
         notif_key = f'friend_streak_{streak_days}'
         
-        for friendship in friendships:
-            # Determine who is the friend in this relationship
-            friend_user = friendship.friend if friendship.user_id == user_id else friendship.user
-            
-            # Check if friend has a push token
-            if not friend_user.push_token:
+        for friend_user in friend_users:
+            # Check if friend has any active device
+            tokens = device_tokens.get(friend_user.id)
+            if not tokens:
                 continue
             
             # Safe access for notification_preferences
@@ -82,8 +69,8 @@ async def notify_streak_milestone(
                 name=user_name or 'Your friend'
             )
             
-            notifications.append({
-                'push_token': friend_user.push_token,
+            notifications.extend({
+                'push_token': token,
                 'title': content['title'],
                 'body': content['body'],
                 'data': {
@@ -93,7 +80,7 @@ async def notify_streak_milestone(
                     'streak_days': streak_days,
                 },
                 'sound': 'default',
-            })
+            } for token in tokens)
         
         # Send batch notifications
         if notifications:
@@ -0,0 +1,154 @@
+# ============================================================================
+# FILE: backend/app/services/user_cache.py (AUTHENTICATED USER SNAPSHOTS)
+# ============================================================================
+"""
+Snapshot cache for the authenticated user (get_current_user).
+
+1. In-process LRU (USER_CACHE_LOCAL_SIZE entries, USER_CACHE_LOCAL_TTL s).
+2. Redis (user:snapshot:{id}, USER_CACHE_TTL s), shared by all processes.
+3. Otherwise one SELECT, whose result fills both layers.
+
+A snapshot holds every users column except hashed_password. It is turned
+back into a *persistent* User attached to the request's session without a
+query, so endpoints can still modify and commit it. hashed_password is left
+expired: load it with `await db.refresh(user, ["hashed_password"])`.
+
+invalidate_user_snapshot() must be called after any change to a user row.
+It replaces the snapshot with a tombstone for USER_CACHE_TOMBSTONE_TTL
+seconds, and fills only write with NX: a request that read the row just
+before the change cannot write its stale copy back behind the invalidation.
+Other processes may serve their local copy for up to USER_CACHE_LOCAL_TTL
+seconds after an invalidation; JWT revocation is checked separately on
+every request and is not affected.
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+TOMBSTONE = "invalidated"
+DATETIME_FIELDS = ("created_at", "updated_at", "last_login")
+EXCLUDED_FIELDS = {"hashed_password"}
+SNAPSHOT_FIELDS = tuple(
+    column.key for column in User.__table__.columns if column.key not in EXCLUDED_FIELDS
+)
+
+
+def _cache_key(user_id: int) -> str:
+    return f"user:snapshot:{user_id}"
+
+
+class _LocalLRU:
+    """Small TTL + LRU map; single event loop, so no locking needed."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        entry = self._data.get(user_id)
+        if entry is None:
+            return None
+        expires_at, snapshot = entry
+        if expires_at < time.monotonic():
+            del self._data[user_id]
+            return None
+        self._data.move_to_end(user_id)
+        return snapshot
+
+    def set(self, user_id: int, snapshot: Dict[str, Any]):
+        self._data[user_id] = (time.monotonic() + self.ttl, snapshot)
+        self._data.move_to_end(user_id)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, user_id: int):
+        self._data.pop(user_id, None)
+
+
+_local = _LocalLRU(settings.USER_CACHE_LOCAL_SIZE, settings.USER_CACHE_LOCAL_TTL)
+
+
+# ============================================================================
+# SERIALIZATION
+# ============================================================================
+def _to_snapshot(user: User) -> Dict[str, Any]:
+    snapshot = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+    snapshot["role"] = user.role.value if user.role else None
+    for field in DATETIME_FIELDS:
+        if snapshot.get(field) is not None:
+            snapshot[field] = snapshot[field].isoformat()
+    snapshot["_v"] = SNAPSHOT_VERSION
+    return snapshot
+
+
+def _from_snapshot(snapshot: Dict[str, Any]) -> User:
+    """Detached User with the snapshot's state and no pending changes."""
+    values = {field: snapshot.get(field) for field in SNAPSHOT_FIELDS}
+    values["role"] = UserRole(values["role"]) if values.get("role") else UserRole.USER
+    for field in DATETIME_FIELDS:
+        if values.get(field) is not None:
+            values[field] = datetime.fromisoformat(values[field])
+    user = User(**values)
+    # Reset attribute history as if loaded; missing columns become expired
+    make_transient_to_detached(user)
+    return user
+
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+async def get_user_snapshot(db: AsyncSession, user_id: int) -> Optional[User]:
+    """
+    The user with this id, attached to `db`, or None if it does not exist.
+    Usually served without a database query.
+    """
+    if settings.USER_CACHE_ENABLED:
+        snapshot = _local.get(user_id)
+        if snapshot is None:
+            raw = await redis_client.get(_cache_key(user_id))
+            if raw and raw != TOMBSTONE:
+                try:
+                    snapshot = json.loads(raw)
+                    if snapshot.get("_v") != SNAPSHOT_VERSION:
+                        snapshot = None
+                except ValueError:
+                    snapshot = None
+                if snapshot is not None:
+                    _local.set(user_id, snapshot)
+
+        if snapshot is not None:
+            user = _from_snapshot(snapshot)
+            db.add(user)  # detached -> persistent, no SELECT
+            return user
+
+    result = await db.execute(select(User).filter(User.id == user_id))
+    user = result.scalars().first()
+    if user is not None and settings.USER_CACHE_ENABLED:
+        snapshot = _to_snapshot(user)
+        # NX: skipped while a tombstone (recent invalidation) is in place
+        if await redis_client.set(
+            _cache_key(user_id), json.dumps(snapshot), ex=settings.USER_CACHE_TTL, nx=True
+        ):
+            _local.set(user_id, snapshot)
+    return user
+
+
+async def invalidate_user_snapshot(user_id: int):
+    """Drop a user's snapshot (call after committing a change to the row)."""
+    _local.pop(user_id)
+    await redis_client.setex(_cache_key(user_id), settings.USER_CACHE_TOMBSTONE_TTL, TOMBSTONE)
@@ -0,0 +1,305 @@
+# ============================================================================
+# FILE: backend/app/worker.py (BACKGROUND JOB WORKER)
+# ============================================================================
+"""
+Job worker entry point.
+
+Consumes the Redis Streams job queue (see app/core/job_queue.py) through a
+consumer group, so any number of worker processes can share the load.
+
+Run with:
+    python -m app.worker
+
+Guarantees:
+- At-least-once delivery: entries are ACKed only after the handler finishes
+  (or the job has been rescheduled / dead-lettered).
+- Bounded concurrency: at most JOB_WORKER_CONCURRENCY jobs in flight.
+- Retries with exponential backoff via a delayed sorted set.
+- Dead-lettering after JOB_MAX_ATTEMPTS.
+- Jobs left pending by a crashed worker are reclaimed after JOB_CLAIM_IDLE_MS.
+- Periodic jobs (PERIODIC_JOBS) are enqueued once per interval across all
+  workers, using a Redis NX key as the schedule lock.
+- Each worker also runs the notification outbox relay
+  (app/services/notification_outbox.py) alongside the stream consumer.
+"""
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Awaitable, Callable, Dict
+
+from redis import asyncio as aioredis
+from redis.exceptions import ResponseError
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.core.job_queue import (
+    JOB_STREAM,
+    DELAYED_JOBS_KEY,
+    DEAD_LETTER_STREAM,
+    CONSUMER_GROUP,
+    encode_job,
+    decode_job,
+)
+from app.api.v1.endpoints.prayers import (
+    check_and_notify_prayer_milestone,
+    check_streak_and_notify,
+)
+from app.services.notification_digest import send_notification_digest
+from app.services.streak_cache import repair_user_streak
+from app.services.prayer_groups import notify_group_milestone
+from app.services.push_notification_service import push_service, poll_push_receipts
+from app.services.notification_outbox import run_outbox_relay
+from app.services.broadcast import run_broadcast
+
+logging.basicConfig(
+    level=getattr(logging, settings.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("app.worker")
+
+# KEYS: delayed set, stream. ARGV: now, batch size, stream maxlen.
+# Delayed members are JSON-encoded stream fields (all strings).
+PROMOTE_DUE_JOBS_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, raw in ipairs(due) do
+    redis.call('ZREM', KEYS[1], raw)
+    local fields = {}
+    for name, value in pairs(cjson.decode(raw)) do
+        fields[#fields + 1] = name
+        fields[#fields + 1] = value
+    end
+    redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], '*', unpack(fields))
+end
+return #due
+"""
+
+# Job name -> async handler. Payload keys are passed as keyword arguments.
+JOB_HANDLERS: Dict[str, Callable[..., Awaitable[None]]] = {
+    "prayer_milestone": check_and_notify_prayer_milestone,
+    "streak_milestone": check_streak_and_notify,
+    "notification_digest": send_notification_digest,
+    "streak_repair": repair_user_streak,
+    "group_milestone": notify_group_milestone,
+    "push_receipts": poll_push_receipts,
+    "broadcast": run_broadcast,
+}
+
+# Job name -> interval in seconds. Jobs take no payload.
+PERIODIC_JOBS: Dict[str, int] = {
+    "push_receipts": settings.PUSH_RECEIPT_POLL_INTERVAL,
+}
+
+READ_BLOCK_MS = 2000
+
+
+class JobWorker:
+    """Redis Streams consumer with bounded concurrency, retries and dead-lettering."""
+
+    def __init__(self, redis: aioredis.Redis, consumer_name: str):
+        self.redis = redis
+        self.consumer_name = consumer_name
+        self._semaphore = asyncio.Semaphore(settings.JOB_WORKER_CONCURRENCY)
+        self._tasks: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._last_reclaim = 0.0
+        self._last_schedule = 0.0
+
+    def stop(self):
+        """Request a graceful shutdown (in-flight jobs are allowed to finish)."""
+        logger.info("🛑 Worker stop requested")
+        self._stopping.set()
+
+    async def setup(self):
+        """Create the consumer group (and stream) if missing."""
+        try:
+            await self.redis.xgroup_create(JOB_STREAM, CONSUMER_GROUP, id="0", mkstream=True)
+            logger.info(f"✅ Created consumer group {CONSUMER_GROUP}")
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    # ------------------------------------------------------------------------
+    # JOB EXECUTION
+    # ------------------------------------------------------------------------
+    async def _run_job(self, entry_id: str, fields: Dict[str, str]):
+        try:
+            try:
+                name, payload, attempts = decode_job(fields)
+            except Exception as e:
+                logger.error(f"Malformed job {entry_id}: {e}")
+                await self._bury(entry_id, fields, f"malformed: {e}")
+                return
+
+            handler = JOB_HANDLERS.get(name)
+            if handler is None:
+                logger.error(f"No handler registered for job '{name}' ({entry_id})")
+                await self._bury(entry_id, fields, "unknown job")
+                return
+
+            try:
+                await handler(**payload)
+            except Exception as e:
+                logger.error(f"Job {name} ({entry_id}) failed on attempt {attempts + 1}: {e}", exc_info=True)
+                await self._retry_or_bury(entry_id, name, payload, attempts, str(e))
+                return
+
+            await self.redis.xack(JOB_STREAM, CONSUMER_GROUP, entry_id)
+
+        except Exception as e:
+            # Never ACKed: the entry stays pending and will be reclaimed later
+            logger.error(f"Worker error on job {entry_id}: {e}", exc_info=True)
+        finally:
+            self._semaphore.release()
+
+    async def _retry_or_bury(self, entry_id: str, name: str, payload: dict, attempts: int, error: str):
+        """Schedule a retry with exponential backoff, or dead-letter the job."""
+        attempts += 1
+        if attempts >= settings.JOB_MAX_ATTEMPTS:
+            await self._bury(entry_id, encode_job(name, payload, attempts), error)
+            return
+
+        due_at = time.time() + settings.JOB_RETRY_BASE_DELAY * (2 ** (attempts - 1))
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(DELAYED_JOBS_KEY, {json.dumps(encode_job(name, payload, attempts)): due_at})
+            pipe.xack(JOB_STREAM, CONSUMER_GROUP, entry_id)
+            await pipe.execute()
+
+    async def _bury(self, entry_id: str, fields: Dict[str, str], error: str):
+        """Move a job to the dead-letter stream and ACK the original entry."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(
+                DEAD_LETTER_STREAM,
+                {**fields, "error": error[:500], "failed_at": str(int(time.time()))},
+                maxlen=settings.JOB_STREAM_MAXLEN,
+                approximate=True
+            )
+            pipe.xack(JOB_STREAM, CONSUMER_GROUP, entry_id)
+            await pipe.execute()
+        logger.warning(f"☠️  Job {entry_id} dead-lettered: {error}")
+
+    async def _dispatch(self, entries):
+        for entry_id, fields in entries:
+            await self._semaphore.acquire()
+            task = asyncio.create_task(self._run_job(entry_id, fields))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    # ------------------------------------------------------------------------
+    # MAINTENANCE
+    # ------------------------------------------------------------------------
+    async def _promote_due_retries(self):
+        """Move retries whose backoff has elapsed back onto the stream."""
+        # One script: a crash can no longer drop a job between ZREM and XADD,
+        # and no two workers can promote the same entry
+        await redis_client.run_script(
+            PROMOTE_DUE_JOBS_SCRIPT,
+            [DELAYED_JOBS_KEY, JOB_STREAM],
+            [time.time(), settings.JOB_WORKER_BATCH_SIZE, settings.JOB_STREAM_MAXLEN]
+        )
+
+    async def _reclaim_stale(self):
+        """Take over entries left pending by workers that died mid-job."""
+        now = time.monotonic()
+        if now - self._last_reclaim < settings.JOB_CLAIM_IDLE_MS / 2000:
+            return
+        self._last_reclaim = now
+
+        result = await self.redis.xautoclaim(
+            JOB_STREAM,
+            CONSUMER_GROUP,
+            self.consumer_name,
+            min_idle_time=settings.JOB_CLAIM_IDLE_MS,
+            start_id="0-0",
+            count=settings.JOB_WORKER_BATCH_SIZE,
+        )
+        claimed = [(entry_id, fields) for entry_id, fields in result[1] if fields]
+        if claimed:
+            logger.info(f"♻️  Reclaimed {len(claimed)} stale jobs")
+            await self._dispatch(claimed)
+
+    async def _schedule_periodic(self):
+        """Enqueue due periodic jobs; the NX key makes one worker win per interval."""
+        now = time.monotonic()
+        if now - self._last_schedule < READ_BLOCK_MS / 1000:
+            return
+        self._last_schedule = now
+
+        for name, interval in PERIODIC_JOBS.items():
+            if await self.redis.set(f"jobs:periodic:{name}", "1", nx=True, ex=interval):
+                await self.redis.xadd(
+                    JOB_STREAM, encode_job(name, {}),
+                    maxlen=settings.JOB_STREAM_MAXLEN, approximate=True
+                )
+                logger.debug(f"⏰ Periodic job enqueued: {name}")
+
+    # ------------------------------------------------------------------------
+    # MAIN LOOP
+    # ------------------------------------------------------------------------
+    async def run(self):
+        await self.setup()
+        logger.info(
+            f"👷 Worker {self.consumer_name} started "
+            f"(concurrency={settings.JOB_WORKER_CONCURRENCY})"
+        )
+        relay = asyncio.create_task(run_outbox_relay(self._stopping))
+
+        while not self._stopping.is_set():
+            try:
+                await self._promote_due_retries()
+                await self._reclaim_stale()
+                await self._schedule_periodic()
+
+                response = await self.redis.xreadgroup(
+                    CONSUMER_GROUP,
+                    self.consumer_name,
+                    {JOB_STREAM: ">"},
+                    count=settings.JOB_WORKER_BATCH_SIZE,
+                    block=READ_BLOCK_MS,
+                )
+                for _stream, entries in response or []:
+                    await self._dispatch(entries)
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Worker loop error: {e}", exc_info=True)
+                await asyncio.sleep(1)
+
+        self._stopping.set()
+        if self._tasks:
+            logger.info(f"⏳ Waiting for {len(self._tasks)} in-flight jobs")
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await asyncio.gather(relay, return_exceptions=True)
+        logger.info(f"👋 Worker {self.consumer_name} stopped")
+
+
+async def main():
+    if not settings.REDIS_URL:
+        logger.critical("REDIS_URL is required to run the job worker")
+        sys.exit(1)
+
+    # Shared client used by job handlers (enqueue, caches, locks)
+    await redis_client.connect()
+
+    redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    worker = JobWorker(redis, consumer_name=f"{socket.gethostname()}-{os.getpid()}")
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await push_service.close()
+        await redis.aclose()
+        await redis_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
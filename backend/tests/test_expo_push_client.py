@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import httpx
+
+from app.services.expo_push_client import ExpoPushClient
+
+
+class MockExpoServer:
+    """In-process stand-in for exp.host: records requests, returns scripted statuses."""
+
+    def __init__(self, statuses=None, delay=0.0):
+        self.statuses = list(statuses or [])
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if request.url.path.endswith("/getReceipts"):
+                ids = json.loads(request.content)["ids"]
+                self.requests.append(ids)
+                return httpx.Response(200, json={"data": {
+                    ticket_id: {"status": "error", "details": {"error": "DeviceNotRegistered"}}
+                    for ticket_id in ids
+                }})
+            messages = json.loads(request.content)
+            self.requests.append(messages)
+            status = self.statuses.pop(0) if self.statuses else 200
+            if status != 200:
+                return httpx.Response(status, json={"errors": [{"code": "TEST"}]})
+            return httpx.Response(200, json={
+                "data": [{"status": "ok", "id": f"ticket-{m['to']}"} for m in messages]
+            })
+        finally:
+            self.in_flight -= 1
+
+    def client(self, **kwargs) -> ExpoPushClient:
+        kwargs.setdefault("max_retries", 2)
+        return ExpoPushClient(
+            base_url="http://expo.test/--/api/v2/push",
+            transport=httpx.MockTransport(self.handler),
+            **kwargs
+        )
+
+
+def make_messages(count):
+    return [{"to": f"ExponentPushToken[{i}]", "title": "t", "body": "b"} for i in range(count)]
+
+
+def test_send_chunks_at_100_with_bounded_concurrency():
+    server = MockExpoServer(delay=0.01)
+    client = server.client(max_concurrency=2)
+
+    async def run():
+        try:
+            return await client.send(make_messages(450))
+        finally:
+            await client.close()
+
+    tickets = asyncio.run(run())
+
+    assert [len(chunk) for chunk in server.requests] == [100, 100, 100, 100, 50]
+    assert server.max_in_flight <= 2
+    assert len(tickets) == 450
+    assert tickets[0]["id"] == "ticket-ExponentPushToken[0]"
+    assert tickets[-1]["id"] == "ticket-ExponentPushToken[449]"
+
+
+def test_send_retries_transient_errors():
+    server = MockExpoServer(statuses=[503, 429])
+    client = server.client()
+    client._backoff = lambda attempt, retry_after=None: 0
+
+    async def run():
+        try:
+            return await client.send(make_messages(3))
+        finally:
+            await client.close()
+
+    tickets = asyncio.run(run())
+
+    assert len(server.requests) == 3
+    assert all(ticket["status"] == "ok" for ticket in tickets)
+
+
+def test_send_does_not_retry_rejected_requests():
+    server = MockExpoServer(statuses=[400])
+    client = server.client()
+
+    async def run():
+        try:
+            return await client.send(make_messages(2))
+        finally:
+            await client.close()
+
+    tickets = asyncio.run(run())
+
+    assert len(server.requests) == 1
+    assert [ticket["status"] for ticket in tickets] == ["error", "error"]
+
+
+def test_get_receipts_in_bulk():
+    server = MockExpoServer()
+    client = server.client()
+
+    async def run():
+        try:
+            return await client.get_receipts([f"ticket-{i}" for i in range(1500)])
+        finally:
+            await client.close()
+
+    receipts = asyncio.run(run())
+
+    assert sorted(len(ids) for ids in server.requests) == [500, 1000]
+    assert len(receipts) == 1500
+    assert receipts["ticket-0"]["details"]["error"] == "DeviceNotRegistered"
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.password_hasher import PasswordHasher, _hash
+
+
+def test_hash_and_verify_in_pool():
+    hasher = PasswordHasher(workers=1, queue_size=1)
+    try:
+        async def scenario():
+            hashed = await hasher.hash("Correct-Horse-1")
+            return (
+                await hasher.verify("Correct-Horse-1", hashed),
+                await hasher.verify("Wrong-Horse-1", hashed),
+            )
+
+        assert asyncio.run(scenario()) == (True, False)
+        stats = hasher.stats()
+        assert stats["completed"] == 3
+        assert stats["queue_depth"] == 0
+        assert stats["latency_ms"]["max"] is not None
+    finally:
+        hasher.shutdown()
+
+
+def test_sheds_with_503_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, queue_size=0)
+    hasher._pending = hasher.capacity  # pool already saturated
+    hashed, _ = _hash("Correct-Horse-1", 4)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(hasher.verify("Correct-Horse-1", hashed))
+
+    assert exc_info.value.status_code == 503
+    assert "Retry-After" in exc_info.value.headers
+    assert hasher.stats()["rejected"] == 1
+    assert hasher._executor is None  # nothing was submitted
+
+
+def test_replaces_a_pool_whose_worker_died():
+    hasher = PasswordHasher(workers=1, queue_size=1)
+    hashed, _ = _hash("Correct-Horse-1", 4)
+    try:
+        assert asyncio.run(hasher.verify("Correct-Horse-1", hashed)) is True
+
+        # Kill the worker the way the OOM killer would
+        for process in list(hasher._executor._processes.values()):
+            process.kill()
+            process.join()
+
+        assert asyncio.run(hasher.verify("Correct-Horse-1", hashed)) is True
+        assert hasher.stats()["pool_restarts"] == 1
+    finally:
+        hasher.shutdown()
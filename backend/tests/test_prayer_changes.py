@@ -0,0 +1,83 @@
+"""
+Delta-sync commit order (needs PostgreSQL: advisory locks and sequences).
+
+Run with TEST_DATABASE_URL=postgresql+asyncpg://... pointing at a scratch
+database; skipped otherwise.
+"""
+import asyncio
+import os
+import secrets
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+
+async def _write_log(session_factory, user_id: int, prayer_name: str, committed: asyncio.Event = None):
+    from app.models.prayer import PrayerLog, lock_user_log_changes
+
+    async with session_factory() as db:
+        await lock_user_log_changes(db, user_id)
+        log = PrayerLog(user_id=user_id, prayer_name=prayer_name, prayer_date="2024-01-01", completed=True)
+        db.add(log)
+        await db.flush()
+        await db.refresh(log, ["change_seq"])
+        if committed is not None:
+            await committed.wait()
+        await db.commit()
+        return log.change_seq
+
+
+def test_writers_of_one_user_commit_in_change_seq_order():
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.models.prayer import PrayerLog
+    from app.models.user import User
+
+    async def scenario():
+        engine = create_async_engine(TEST_DATABASE_URL)
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                User.metadata.create_all, tables=[User.__table__, PrayerLog.__table__]
+            )
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        async with session_factory() as db:
+            user = User(email=f"sync-{secrets.token_hex(4)}@example.com", hashed_password="x")
+            db.add(user)
+            await db.commit()
+
+        try:
+            # A draws its change_seq first but holds its commit back...
+            release_a = asyncio.Event()
+            first = asyncio.create_task(_write_log(session_factory, user.id, "fajr", release_a))
+            await asyncio.sleep(0.2)
+
+            # ...while B tries to write and commit straight away
+            second = asyncio.create_task(_write_log(session_factory, user.id, "dhuhr"))
+            await asyncio.sleep(0.5)
+            b_committed_early = second.done()
+
+            # A client syncing now must not get a cursor past A's change
+            async with session_factory() as db:
+                visible = (await db.execute(
+                    select(PrayerLog.change_seq).filter(PrayerLog.user_id == user.id)
+                )).scalars().all()
+
+            release_a.set()
+            seq_a, seq_b = await first, await second
+            return b_committed_early, visible, seq_a, seq_b
+        finally:
+            async with session_factory() as db:
+                await db.delete(await db.get(User, user.id))
+                await db.commit()
+            await engine.dispose()
+
+    b_committed_early, visible, seq_a, seq_b = asyncio.run(scenario())
+
+    assert not b_committed_early  # B waited for A's transaction
+    assert visible == []
+    assert seq_a < seq_b  # commit order == change_seq order
@@ -0,0 +1,202 @@
+import asyncio
+import math
+import time
+
+import pytest
+
+from app.core import rate_limiter as rate_limiter_module
+from app.core.config import settings
+from app.core.rate_limiter import RateLimiter
+from app.core.redis import InMemoryRedis
+
+
+class MemoryStore(InMemoryRedis):
+    """The in-memory fallback, as RedisClient exposes it without REDIS_URL."""
+
+    def is_connected(self):
+        return False
+
+
+def memory_limiter() -> RateLimiter:
+    limiter = RateLimiter()
+    limiter.enabled = True
+    limiter.redis = MemoryStore()
+    return limiter
+
+
+def test_in_memory_gcra_allows_a_burst_of_limit_then_rejects():
+    limiter = memory_limiter()
+
+    async def scenario():
+        return [await limiter.check_rate_limit("user:1", 5, 60) for _ in range(6)]
+
+    started = time.time()
+    results = asyncio.run(scenario())
+
+    assert [allowed for allowed, _, _ in results] == [True] * 5 + [False]
+    assert [remaining for _, remaining, _ in results[:5]] == [4, 3, 2, 1, 0]
+
+    # Rejected: reset is when the next request fits (one interval = 60 / 5 s)
+    _, remaining, reset_time = results[5]
+    assert remaining == 0
+    assert started + 11 <= reset_time <= started + 13
+
+
+def test_in_memory_keys_are_independent():
+    limiter = memory_limiter()
+
+    async def scenario():
+        for _ in range(3):
+            await limiter.check_rate_limit("ip:1.2.3.4", 3, 60)
+        return (
+            await limiter.check_rate_limit("ip:1.2.3.4", 3, 60),
+            await limiter.check_rate_limit("ip:5.6.7.8", 3, 60),
+        )
+
+    blocked, other = asyncio.run(scenario())
+    assert blocked[0] is False
+    assert other[:2] == (True, 2)
+
+
+# ============================================================================
+# LEASE TIER (stubbed run_script)
+# ============================================================================
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class GcraRedis:
+    """Connected Redis whose run_script is GCRA_SCRIPT ported to Python."""
+
+    def __init__(self, clock: Clock):
+        self.clock = clock
+        self.tat = {}
+        self.calls = 0
+
+    def is_connected(self):
+        return True
+
+    async def run_script(self, script, keys, args):
+        self.calls += 1
+        limit, window, requested, refund = args
+        now = self.clock.now * 1000
+        window = window * 1000
+        interval = window / limit
+
+        tat = max(self.tat.get(keys[0], now) - refund * interval, now)
+        available = math.floor((now + window - tat + 0.5) / interval)
+        granted = min(requested, available)
+        if granted < 1:
+            if refund > 0:
+                self.tat[keys[0]] = tat
+            return [0, 0, math.ceil((tat + interval - window) / 1000)]
+
+        self.tat[keys[0]] = tat + granted * interval
+        return [granted, available - granted, math.ceil(self.tat[keys[0]] / 1000)]
+
+
+@pytest.fixture
+def leased(monkeypatch):
+    clock = Clock(1000.0)
+    monkeypatch.setattr(rate_limiter_module, "time", clock)
+    monkeypatch.setattr(settings, "RATE_LIMIT_LEASE_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_LEASE_FRACTION", 0.2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_LEASE_MIN_LIMIT", 20)
+    monkeypatch.setattr(settings, "RATE_LIMIT_LEASE_TTL", 15)
+
+    limiter = RateLimiter()
+    limiter.enabled = True
+    limiter.redis = GcraRedis(clock)
+    return limiter, clock
+
+
+def test_lease_is_spent_locally(leased):
+    limiter, _ = leased
+
+    async def scenario():
+        return [await limiter.check_rate_limit("user:1", 60, 60) for _ in range(13)]
+
+    results = asyncio.run(scenario())
+
+    assert all(allowed for allowed, _, _ in results)
+    assert [remaining for _, remaining, _ in results[:3]] == [59, 58, 57]
+    assert limiter.redis.calls == 2  # 12 tokens per lease
+    assert limiter.stats()["local_decisions"] == 11
+
+
+def test_unused_tokens_are_refunded_when_the_lease_expires(leased):
+    limiter, clock = leased
+    interval = 3600 / 60
+
+    async def scenario():
+        for _ in range(3):
+            await limiter.check_rate_limit("user:1", 60, 3600)
+        clock.now += 16  # past RATE_LIMIT_LEASE_TTL: 9 tokens go back
+        return await limiter.check_rate_limit("user:1", 60, 3600)
+
+    allowed, _, _ = asyncio.run(scenario())
+
+    assert allowed
+    assert limiter.redis.calls == 2
+    # 12 leased, 9 refunded, 12 leased again: 15 tokens taken from the budget
+    assert limiter.redis.tat["gcra:user:1"] == pytest.approx((1000 + 15 * interval) * 1000)
+
+
+def test_rejected_key_is_blocked_locally_until_next_allowed_time(leased):
+    limiter, clock = leased
+
+    async def scenario():
+        burst = [await limiter.check_rate_limit("user:1", 20, 60) for _ in range(21)]
+        clock.now += 1
+        early = await limiter.check_rate_limit("user:1", 20, 60)
+        calls_while_blocked = limiter.redis.calls
+        clock.now += 2
+        later = await limiter.check_rate_limit("user:1", 20, 60)
+        return burst, early, calls_while_blocked, later
+
+    burst, early, calls_while_blocked, later = asyncio.run(scenario())
+
+    assert [allowed for allowed, _, _ in burst] == [True] * 20 + [False]
+    assert burst[20][2] == 1003  # one interval (60 / 20 s) after the burst
+    assert early == (False, 0, 1003)
+    assert calls_while_blocked == 6  # 5 leases of 4 tokens + the rejection
+    assert later[0] is True
+    assert limiter.redis.calls == 7
+
+
+def test_lease_cuts_redis_calls_on_a_60_per_minute_route(leased):
+    # prayers.py: rate_limit(60, 60, by_user=True), one request per second
+    limiter, clock = leased
+
+    async def scenario():
+        results = []
+        for _ in range(600):
+            results.append(await limiter.check_user_limit(1, "/api/v1/prayers/log", 60, 60))
+            clock.now += 1
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert all(allowed for allowed, _, _ in results)
+    assert limiter.redis.calls == 50  # 12x fewer than one call per request
+    assert limiter.stats()["local_decisions"] == 550
+
+
+def test_strict_limits_always_ask_redis(leased):
+    # auth.py login: rate_limit(5, 60, by_ip=True)
+    limiter, _ = leased
+
+    async def scenario():
+        return [await limiter.check_ip_limit("1.2.3.4", "/api/v1/auth/login", 5, 60) for _ in range(6)]
+
+    results = asyncio.run(scenario())
+
+    assert [allowed for allowed, _, _ in results] == [True] * 5 + [False]
+    assert limiter.redis.calls == 6
@@ -0,0 +1,30 @@
+import secrets
+
+from app.core.revocation_filter import BloomFilter, RevocationFilter
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(capacity=10000, error_rate=0.01)
+    revoked = [secrets.token_urlsafe(32) for _ in range(10000)]
+    for jti in revoked:
+        bloom.add(jti)
+
+    assert all(jti in bloom for jti in revoked)
+
+    others = [secrets.token_urlsafe(32) for _ in range(10000)]
+    false_positives = sum(1 for jti in others if jti in bloom)
+    assert false_positives < 300  # 1% target, generous margin
+
+
+def test_filter_defers_to_redis_until_ready():
+    revocation_filter = RevocationFilter()
+    assert revocation_filter.might_be_revoked("any-jti")
+
+    # Simulate a completed rebuild
+    revocation_filter._bloom = BloomFilter(1000, 0.001)
+    revocation_filter._ready = True
+    revocation_filter.add("revoked-jti")
+
+    assert revocation_filter.might_be_revoked("revoked-jti")
+    assert not revocation_filter.might_be_revoked("fresh-jti")
+    assert revocation_filter.stats()["redis_checks_skipped"] == 1
@@ -0,0 +1,33 @@
+import time
+
+from app.core.security import VerifiedTokenCache
+
+
+def test_entries_expire_with_the_token():
+    cache = VerifiedTokenCache(max_size=10)
+    cache.put("live", {"sub": "1", "exp": time.time() + 60})
+    cache.put("expired", {"sub": "2", "exp": time.time() - 1})
+
+    assert cache.get("live")["sub"] == "1"
+    assert cache.get("expired") is None
+
+
+def test_least_recently_used_token_is_evicted():
+    cache = VerifiedTokenCache(max_size=2)
+    exp = time.time() + 60
+    cache.put("a", {"sub": "1", "exp": exp})
+    cache.put("b", {"sub": "2", "exp": exp})
+    cache.get("a")
+    cache.put("c", {"sub": "3", "exp": exp})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_callers_cannot_mutate_cached_claims():
+    cache = VerifiedTokenCache(max_size=10)
+    cache.put("t", {"sub": "1", "exp": time.time() + 60})
+    cache.get("t")["sub"] = "2"
+
+    assert cache.get("t")["sub"] == "1"